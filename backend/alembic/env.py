@@ -5,7 +5,7 @@ load_dotenv()  # loads DATABASE_URL from .env
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 from models.base import Base
-from models import user, problem, testcase, submission
+from models import user, problem, testcase, submission, submission_result, rejudge_job, submission_source, similarity, idempotency_key, testcase_stats, submission_timeline
 
 target_metadata = Base.metadata  # ← important: your models' metadata
 
@@ -0,0 +1,28 @@
+"""add user is_admin
+
+Revision ID: 1d6b9e4f2a83
+Revises: e8a27c4f9d31
+Create Date: 2026-10-20 12:03:41.215906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d6b9e4f2a83'
+down_revision: Union[str, Sequence[str], None] = 'e8a27c4f9d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('is_admin', sa.Boolean(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'is_admin')
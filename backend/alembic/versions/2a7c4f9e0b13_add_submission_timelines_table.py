@@ -0,0 +1,38 @@
+"""add submission timelines table
+
+Revision ID: 2a7c4f9e0b13
+Revises: 9d3f5b2c8e61
+Create Date: 2026-10-19 19:12:40.318862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a7c4f9e0b13'
+down_revision: Union[str, Sequence[str], None] = '9d3f5b2c8e61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('submission_timelines',
+    sa.Column('submission_id', sa.Integer(), nullable=False),
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('language', sa.String(length=50), nullable=False),
+    sa.Column('data', sa.LargeBinary(length=65535), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('submission_id')
+    )
+    op.create_index('ix_submission_timelines_problem_language_id', 'submission_timelines', ['problem_id', 'language', 'submission_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_submission_timelines_problem_language_id', table_name='submission_timelines')
+    op.drop_table('submission_timelines')
@@ -0,0 +1,43 @@
+"""add submission_results table
+
+Revision ID: 3f6c2a9d41b7
+Revises: 0031bfe1897c
+Create Date: 2026-10-19 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6c2a9d41b7'
+down_revision: Union[str, Sequence[str], None] = '0031bfe1897c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('submission_results',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('submission_id', sa.Integer(), nullable=False),
+    sa.Column('testcase_id', sa.Integer(), nullable=True),
+    sa.Column('verdict', sa.String(length=50), nullable=False),
+    sa.Column('cpu_ms', sa.Integer(), nullable=True),
+    sa.Column('wall_ms', sa.Integer(), nullable=False),
+    sa.Column('max_rss_kb', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['testcase_id'], ['testcases.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_submission_results_id'), 'submission_results', ['id'], unique=False)
+    op.create_index(op.f('ix_submission_results_submission_id'), 'submission_results', ['submission_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_submission_results_submission_id'), table_name='submission_results')
+    op.drop_index(op.f('ix_submission_results_id'), table_name='submission_results')
+    op.drop_table('submission_results')
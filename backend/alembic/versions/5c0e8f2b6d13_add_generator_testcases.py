@@ -0,0 +1,53 @@
+"""add generator testcases
+
+Revision ID: 5c0e8f2b6d13
+Revises: b7e1d04c9a52
+Create Date: 2026-10-19 12:58:44.270391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e8f2b6d13'
+down_revision: Union[str, Sequence[str], None] = 'b7e1d04c9a52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('testcases', sa.Column('kind', sa.String(length=20), nullable=False, server_default='literal'))
+    op.add_column('testcases', sa.Column('generator_script', sa.Text(), nullable=True))
+    op.add_column('testcases', sa.Column('generator_seed', sa.Integer(), nullable=True))
+    op.add_column('testcases', sa.Column('generator_params', sa.String(length=500), nullable=True))
+    op.add_column('testcases', sa.Column('reference_solution', sa.Text(), nullable=True))
+    op.add_column('testcases', sa.Column('input_sha256', sa.String(length=64), nullable=True))
+    op.add_column('testcases', sa.Column('expected_sha256', sa.String(length=64), nullable=True))
+    op.alter_column('testcases', 'input_data',
+               existing_type=sa.String(length=1000),
+               nullable=True)
+    op.alter_column('testcases', 'expected_output',
+               existing_type=sa.String(length=1000),
+               nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM testcases WHERE kind = 'generator'")
+    op.alter_column('testcases', 'expected_output',
+               existing_type=sa.String(length=1000),
+               nullable=False)
+    op.alter_column('testcases', 'input_data',
+               existing_type=sa.String(length=1000),
+               nullable=False)
+    op.drop_column('testcases', 'expected_sha256')
+    op.drop_column('testcases', 'input_sha256')
+    op.drop_column('testcases', 'reference_solution')
+    op.drop_column('testcases', 'generator_params')
+    op.drop_column('testcases', 'generator_seed')
+    op.drop_column('testcases', 'generator_script')
+    op.drop_column('testcases', 'kind')
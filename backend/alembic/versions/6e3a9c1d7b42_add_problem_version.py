@@ -0,0 +1,28 @@
+"""add problem version
+
+Revision ID: 6e3a9c1d7b42
+Revises: 2a7c4f9e0b13
+Create Date: 2026-10-20 09:14:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e3a9c1d7b42'
+down_revision: Union[str, Sequence[str], None] = '2a7c4f9e0b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('problems', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('problems', 'version')
@@ -0,0 +1,28 @@
+"""restore submission user problem index
+
+Revision ID: 7a4c2e9b5f16
+Revises: 1d6b9e4f2a83
+Create Date: 2026-10-20 12:27:55.603114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4c2e9b5f16'
+down_revision: Union[str, Sequence[str], None] = '1d6b9e4f2a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_submissions_user_problem_id', 'submissions', ['user_id', 'problem_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_submissions_user_problem_id', table_name='submissions')
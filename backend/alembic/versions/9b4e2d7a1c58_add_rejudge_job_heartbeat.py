@@ -0,0 +1,32 @@
+"""add rejudge job heartbeat
+
+Revision ID: 9b4e2d7a1c58
+Revises: 6e3a9c1d7b42
+Create Date: 2026-10-20 10:02:17.318540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2d7a1c58'
+down_revision: Union[str, Sequence[str], None] = '6e3a9c1d7b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('rejudge_jobs', sa.Column('runner', sa.String(length=100), nullable=True))
+    op.add_column('rejudge_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    op.add_column('rejudge_jobs', sa.Column('resume_after', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('rejudge_jobs', 'resume_after')
+    op.drop_column('rejudge_jobs', 'heartbeat_at')
+    op.drop_column('rejudge_jobs', 'runner')
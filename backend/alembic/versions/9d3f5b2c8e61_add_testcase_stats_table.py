@@ -0,0 +1,40 @@
+"""add testcase stats table
+
+Revision ID: 9d3f5b2c8e61
+Revises: 4b8d1e7a9c30
+Create Date: 2026-10-19 18:41:27.095583
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f5b2c8e61'
+down_revision: Union[str, Sequence[str], None] = '4b8d1e7a9c30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('testcase_stats',
+    sa.Column('testcase_id', sa.Integer(), nullable=False),
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('runs', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('failures', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('timeouts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('total_ms', sa.BigInteger(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['testcase_id'], ['testcases.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('testcase_id')
+    )
+    op.create_index(op.f('ix_testcase_stats_problem_id'), 'testcase_stats', ['problem_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_testcase_stats_problem_id'), table_name='testcase_stats')
+    op.drop_table('testcase_stats')
@@ -0,0 +1,32 @@
+"""add submitted_at and submission listing indexes
+
+Revision ID: a93d2f6e1b58
+Revises: 7e29c5a1f804
+Create Date: 2026-10-19 16:02:51.331487
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d2f6e1b58'
+down_revision: Union[str, Sequence[str], None] = '7e29c5a1f804'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('submissions', sa.Column('submitted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_submissions_user_problem_id', 'submissions', ['user_id', 'problem_id', 'id'], unique=False)
+    op.create_index('ix_submissions_problem_status_id', 'submissions', ['problem_id', 'status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_submissions_problem_status_id', table_name='submissions')
+    op.drop_index('ix_submissions_user_problem_id', table_name='submissions')
+    op.drop_column('submissions', 'submitted_at')
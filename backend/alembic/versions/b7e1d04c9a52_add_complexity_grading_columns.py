@@ -0,0 +1,38 @@
+"""add complexity grading columns
+
+Revision ID: b7e1d04c9a52
+Revises: 3f6c2a9d41b7
+Create Date: 2026-10-19 11:40:07.918364
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e1d04c9a52'
+down_revision: Union[str, Sequence[str], None] = '3f6c2a9d41b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('problems', sa.Column('scaling_generator', sa.Text(), nullable=True))
+    op.add_column('problems', sa.Column('scaling_sizes', sa.String(length=200), nullable=True))
+    op.add_column('problems', sa.Column('target_complexity', sa.String(length=20), nullable=True))
+    op.add_column('problems', sa.Column('enforce_complexity', sa.Boolean(), nullable=True))
+    op.add_column('submissions', sa.Column('estimated_complexity', sa.String(length=20), nullable=True))
+    op.add_column('submissions', sa.Column('complexity_report', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('submissions', 'complexity_report')
+    op.drop_column('submissions', 'estimated_complexity')
+    op.drop_column('problems', 'enforce_complexity')
+    op.drop_column('problems', 'target_complexity')
+    op.drop_column('problems', 'scaling_sizes')
+    op.drop_column('problems', 'scaling_generator')
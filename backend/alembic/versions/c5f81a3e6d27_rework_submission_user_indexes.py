@@ -0,0 +1,32 @@
+"""rework submission user indexes
+
+Revision ID: c5f81a3e6d27
+Revises: 9b4e2d7a1c58
+Create Date: 2026-10-20 10:31:45.902216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f81a3e6d27'
+down_revision: Union[str, Sequence[str], None] = '9b4e2d7a1c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_submissions_user_id', 'submissions', ['user_id', 'id'], unique=False)
+    op.create_index('ix_submissions_user_status_id', 'submissions', ['user_id', 'status', 'id'], unique=False)
+    op.drop_index('ix_submissions_user_problem_id', table_name='submissions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_submissions_user_problem_id', 'submissions', ['user_id', 'problem_id', 'id'], unique=False)
+    op.drop_index('ix_submissions_user_status_id', table_name='submissions')
+    op.drop_index('ix_submissions_user_id', table_name='submissions')
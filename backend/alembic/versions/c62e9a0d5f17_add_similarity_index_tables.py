@@ -0,0 +1,49 @@
+"""add similarity index tables
+
+Revision ID: c62e9a0d5f17
+Revises: f1c7b3e94a26
+Create Date: 2026-10-19 17:32:51.208417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c62e9a0d5f17'
+down_revision: Union[str, Sequence[str], None] = 'f1c7b3e94a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('similarity_signatures',
+    sa.Column('submission_id', sa.Integer(), nullable=False),
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(length=1024), nullable=False),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('submission_id')
+    )
+    op.create_index(op.f('ix_similarity_signatures_problem_id'), 'similarity_signatures', ['problem_id'], unique=False)
+    op.create_table('similarity_buckets',
+    sa.Column('problem_id', sa.Integer(), nullable=False),
+    sa.Column('band', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('bucket', sa.String(length=8), nullable=False),
+    sa.Column('submission_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['problem_id'], ['problems.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('problem_id', 'band', 'bucket', 'submission_id')
+    )
+    op.create_index(op.f('ix_similarity_buckets_submission_id'), 'similarity_buckets', ['submission_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_similarity_buckets_submission_id'), table_name='similarity_buckets')
+    op.drop_table('similarity_buckets')
+    op.drop_index(op.f('ix_similarity_signatures_problem_id'), table_name='similarity_signatures')
+    op.drop_table('similarity_signatures')
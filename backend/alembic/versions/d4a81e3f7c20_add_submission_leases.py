@@ -0,0 +1,34 @@
+"""add submission judge leases
+
+Revision ID: d4a81e3f7c20
+Revises: 5c0e8f2b6d13
+Create Date: 2026-10-19 14:06:12.518730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a81e3f7c20'
+down_revision: Union[str, Sequence[str], None] = '5c0e8f2b6d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('submissions', sa.Column('lease_owner', sa.String(length=100), nullable=True))
+    op.add_column('submissions', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('submissions', sa.Column('judge_attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.create_index('ix_submissions_status_lease', 'submissions', ['status', 'lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_submissions_status_lease', table_name='submissions')
+    op.drop_column('submissions', 'judge_attempts')
+    op.drop_column('submissions', 'lease_expires_at')
+    op.drop_column('submissions', 'lease_owner')
@@ -0,0 +1,40 @@
+"""idempotency key binary collation
+
+Revision ID: e8a27c4f9d31
+Revises: c5f81a3e6d27
+Create Date: 2026-10-20 11:12:08.447391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a27c4f9d31'
+down_revision: Union[str, Sequence[str], None] = 'c5f81a3e6d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only MySQL compares strings case-insensitively by default
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.alter_column('idempotency_keys', 'key',
+               existing_type=sa.String(length=255),
+               type_=mysql.VARCHAR(length=255, collation='utf8mb4_bin'),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.alter_column('idempotency_keys', 'key',
+               existing_type=mysql.VARCHAR(length=255, collation='utf8mb4_bin'),
+               type_=sa.String(length=255),
+               existing_nullable=False)
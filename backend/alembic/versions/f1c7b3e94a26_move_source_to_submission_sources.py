@@ -0,0 +1,112 @@
+"""move submission source to content-addressed submission_sources
+
+Revision ID: f1c7b3e94a26
+Revises: a93d2f6e1b58
+Create Date: 2026-10-19 16:48:09.662153
+
+"""
+import hashlib
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7b3e94a26'
+down_revision: Union[str, Sequence[str], None] = 'a93d2f6e1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+submissions = sa.table(
+    'submissions',
+    sa.column('id', sa.Integer),
+    sa.column('code', sa.Text),
+    sa.column('source_hash', sa.String),
+)
+sources = sa.table(
+    'submission_sources',
+    sa.column('hash', sa.String),
+    sa.column('compression', sa.String),
+    sa.column('data', sa.LargeBinary),
+    sa.column('size', sa.Integer),
+)
+
+
+def _backfill_hashes(conn) -> None:
+    """Copy code into submission_sources one id range at a time, storing each source once"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(submissions.c.id, submissions.c.code)
+            .where(submissions.c.id > last_id)
+            .order_by(submissions.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        by_hash = {}
+        for row in rows:
+            raw = row.code.encode()
+            by_hash.setdefault(hashlib.sha256(raw).hexdigest(), (raw, []))[1].append(row.id)
+        existing = {
+            h for (h,) in conn.execute(sa.select(sources.c.hash).where(sources.c.hash.in_(list(by_hash))))
+        }
+        new = [
+            {'hash': h, 'compression': 'zlib', 'data': zlib.compress(raw, 6), 'size': len(raw)}
+            for h, (raw, _) in by_hash.items() if h not in existing
+        ]
+        if new:
+            conn.execute(sources.insert(), new)
+        for h, (_, ids) in by_hash.items():
+            conn.execute(submissions.update().where(submissions.c.id.in_(ids)).values(source_hash=h))
+
+
+def _backfill_code(conn) -> None:
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(submissions.c.id, sources.c.data)
+            .select_from(submissions.join(sources, submissions.c.source_hash == sources.c.hash))
+            .where(submissions.c.id > last_id)
+            .order_by(submissions.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        for row in rows:
+            conn.execute(
+                submissions.update().where(submissions.c.id == row.id).values(code=zlib.decompress(row.data).decode())
+            )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('submission_sources',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('compression', sa.String(length=10), nullable=False),
+    sa.Column('data', sa.LargeBinary(length=16777216), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('submissions', sa.Column('source_hash', sa.String(length=64), nullable=True))
+    _backfill_hashes(op.get_bind())
+    op.alter_column('submissions', 'source_hash', existing_type=sa.String(length=64), nullable=False)
+    op.create_foreign_key('fk_submissions_source_hash', 'submissions', 'submission_sources', ['source_hash'], ['hash'])
+    op.drop_column('submissions', 'code')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('submissions', sa.Column('code', sa.Text(), nullable=True))
+    _backfill_code(op.get_bind())
+    op.alter_column('submissions', 'code', existing_type=sa.Text(), nullable=False)
+    op.drop_constraint('fk_submissions_source_hash', 'submissions', type_='foreignkey')
+    op.drop_column('submissions', 'source_hash')
+    op.drop_table('submission_sources')
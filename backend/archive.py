@@ -0,0 +1,329 @@
+"""Retention: move old judged submissions out of the hot tables into archive files.
+
+Archived rows live under ARCHIVE_DIR in per-month directories of immutable
+segment files. A segment stores each column as its own zlib-compressed JSON
+array behind a small header, so a point lookup only decompresses the id
+column plus the columns it returns. manifest.json lists every segment with
+its id range, sorted by min_id.
+
+MySQL table partitioning would need the foreign keys on submissions dropped,
+so retention is done here instead:
+
+    python archive.py --older-than-days 180
+"""
+import argparse
+import bisect
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from db import SessionLocal
+# Every mapper must be registered before the first query resolves relationships
+from models import user, problem, testcase, rejudge_job  # noqa: F401
+from models.submission import Submission
+from models.submission_result import SubmissionResult
+from models.submission_source import SubmissionSource
+from models.submission_timeline import SubmissionTimeline
+import similarity
+import sources
+
+load_dotenv()
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "archive"))
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "180"))
+ARCHIVE_SEGMENT_ROWS = int(os.getenv("ARCHIVE_SEGMENT_ROWS", "5000"))
+
+_MAGIC = b"AEARC1\n"
+_MANIFEST = "manifest.json"
+_UNDATED = "undated"   # rows from before submitted_at existed
+
+COLUMNS = (
+    "id", "problem_id", "user_id", "language", "status", "estimated_complexity",
+    "complexity_report", "submitted_at", "code", "results",
+)
+
+logger = logging.getLogger("algoengine.archive")
+_manifest_lock = threading.Lock()
+
+
+# -------------------------
+# SEGMENT FILES
+# -------------------------
+def write_segment(path: str, columns: dict[str, list]) -> None:
+    """Write columns (equal-length lists, ids ascending) to ``path`` atomically"""
+    blobs = {name: zlib.compress(json.dumps(values, separators=(",", ":")).encode(), 6) for name, values in columns.items()}
+    offsets = {}
+    position = 0
+    for name, blob in blobs.items():
+        offsets[name] = [position, len(blob)]
+        position += len(blob)
+    header = json.dumps({"count": len(columns["id"]), "columns": offsets}).encode()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + ".partial"
+    with open(partial, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack(">I", len(header)))
+        f.write(header)
+        for blob in blobs.values():
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(partial, path)
+
+
+@lru_cache(maxsize=64)
+def _read_header(path: str) -> tuple[dict, int]:
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError(f"{path} is not an archive segment")
+        (size,) = struct.unpack(">I", f.read(4))
+        return json.loads(f.read(size)), len(_MAGIC) + 4 + size
+
+
+@lru_cache(maxsize=64)
+def read_column(path: str, name: str) -> list:
+    header, base = _read_header(path)
+    offset, length = header["columns"][name]
+    with open(path, "rb") as f:
+        f.seek(base + offset)
+        return json.loads(zlib.decompress(f.read(length)))
+
+
+# -------------------------
+# MANIFEST
+# -------------------------
+def _manifest_path() -> str:
+    return os.path.join(ARCHIVE_DIR, _MANIFEST)
+
+
+def load_manifest() -> list[dict]:
+    try:
+        mtime = os.stat(_manifest_path()).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    return _load_manifest(mtime)
+
+
+@lru_cache(maxsize=1)
+def _load_manifest(mtime: int) -> list[dict]:
+    with open(_manifest_path()) as f:
+        return json.load(f)["segments"]
+
+
+@lru_cache(maxsize=1)
+def _manifest_index(mtime: int) -> tuple[list[int], list[int]]:
+    """min_id of every segment, and the largest max_id up to each segment"""
+    segments = _load_manifest(mtime)
+    reach = []
+    for segment in segments:
+        reach.append(max(segment["max_id"], reach[-1] if reach else segment["max_id"]))
+    return [segment["min_id"] for segment in segments], reach
+
+
+def _add_to_manifest(entries: list[dict]) -> None:
+    """Add ``entries``, replacing any listed under the same file.
+
+    A run that crashed after writing the manifest but before purging archives
+    the same rows into the same file again, so re-adding it is a no-op.
+    """
+    with _manifest_lock:
+        files = {entry["file"] for entry in entries}
+        segments = [segment for segment in load_manifest() if segment["file"] not in files] + entries
+        segments.sort(key=lambda s: (s["min_id"], s["file"]))
+        partial = _manifest_path() + ".partial"
+        with open(partial, "w") as f:
+            json.dump({"segments": segments}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, _manifest_path())
+
+
+# -------------------------
+# LOOKUP
+# -------------------------
+def lookup(submission_id: int) -> Optional[dict]:
+    """Return an archived submission as a dict of COLUMNS, or None"""
+    try:
+        mtime = os.stat(_manifest_path()).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    segments = _load_manifest(mtime)
+    min_ids, reach = _manifest_index(mtime)
+    # Segments of different months overlap in id range, so walk back from the
+    # last one starting at or before the id while any earlier one can reach it
+    position = bisect.bisect_right(min_ids, submission_id) - 1
+    while position >= 0 and reach[position] >= submission_id:
+        segment = segments[position]
+        position -= 1
+        if segment["max_id"] < submission_id:
+            continue
+        path = os.path.join(ARCHIVE_DIR, segment["file"])
+        ids = read_column(path, "id")
+        index = bisect.bisect_left(ids, submission_id)
+        if index < len(ids) and ids[index] == submission_id:
+            return {name: read_column(path, name)[index] for name in COLUMNS}
+    return None
+
+
+# -------------------------
+# ARCHIVING
+# -------------------------
+def _month(submitted_at: Optional[datetime]) -> str:
+    return submitted_at.strftime("%Y-%m") if submitted_at else _UNDATED
+
+
+def _archivable(cutoff: datetime):
+    return (
+        Submission.status.notin_(("pending", "judging")),
+        Submission.lease_expires_at.is_(None),
+        or_(Submission.submitted_at < cutoff, Submission.submitted_at.is_(None)),
+    )
+
+
+def _columns_for(db: Session, rows: list[Submission]) -> dict[str, list]:
+    ids = [row.id for row in rows]
+    results = {submission_id: [] for submission_id in ids}
+    for r in (
+        db.query(SubmissionResult)
+        .filter(SubmissionResult.submission_id.in_(ids))
+        .order_by(SubmissionResult.id)
+    ):
+        results[r.submission_id].append([r.testcase_id, r.verdict, r.cpu_ms, r.wall_ms, r.max_rss_kb])
+    code = {}
+    for row in rows:
+        if row.source_hash not in code:
+            code[row.source_hash] = sources.load(db, row.source_hash)
+    return {
+        "id": ids,
+        "problem_id": [row.problem_id for row in rows],
+        "user_id": [row.user_id for row in rows],
+        "language": [row.language for row in rows],
+        "status": [row.status for row in rows],
+        "estimated_complexity": [row.estimated_complexity for row in rows],
+        "complexity_report": [row.complexity_report for row in rows],
+        "submitted_at": [row.submitted_at.isoformat() if row.submitted_at else None for row in rows],
+        "code": [code[row.source_hash] for row in rows],
+        "results": [results[submission_id] for submission_id in ids],
+    }
+
+
+def _purge(db: Session, rows: list[Submission], cutoff: datetime) -> bool:
+    """Delete archived rows, then any source no remaining submission points to.
+
+    Runs in the caller's transaction and leaves the commit to it. Returns
+    False if any row stopped being archivable since it was selected (a
+    rejudge or a reclaim picked it up); the caller then rolls back, so only
+    rows that really leave the database stay archived.
+
+    The source rows are locked before their references are counted:
+    sources.store share-locks an existing source until the submission that
+    reuses it commits, so a source is never deleted under a new submission.
+    """
+    ids = [row.id for row in rows]
+    hashes = sorted({row.source_hash for row in rows})
+    db.execute(delete(SubmissionResult).where(SubmissionResult.submission_id.in_(ids)))
+    db.execute(delete(SubmissionTimeline).where(SubmissionTimeline.submission_id.in_(ids)))
+    similarity.forget(db, ids)
+    deleted = db.execute(
+        delete(Submission)
+        .where(Submission.id.in_(ids), *_archivable(cutoff))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if deleted != len(ids):
+        return False
+    locked = db.execute(
+        select(SubmissionSource.hash)
+        .where(SubmissionSource.hash.in_(hashes))
+        .order_by(SubmissionSource.hash)
+        .with_for_update()
+    ).scalars().all()
+    # A locking read sees submissions committed after this transaction began
+    in_use = set(
+        db.execute(
+            select(Submission.source_hash).where(Submission.source_hash.in_(locked)).with_for_update(read=True)
+        ).scalars()
+    )
+    orphans = [digest for digest in locked if digest not in in_use]
+    if orphans:
+        db.execute(delete(SubmissionSource).where(SubmissionSource.hash.in_(orphans)))
+    return True
+
+
+def archive(older_than_days: int = ARCHIVE_AFTER_DAYS, batch_size: int = ARCHIVE_SEGMENT_ROWS, dry_run: bool = False) -> int:
+    """Archive judged submissions older than the cutoff; returns how many were moved.
+
+    Each batch is locked when selected, so a rejudge cannot change a row
+    between being archived and being deleted. Segments and the manifest are
+    on disk before the deletes commit, so a crash in between only leaves rows
+    that a later run archives again; lookups read the database first.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            query = (
+                db.query(Submission)
+                .filter(*_archivable(cutoff), Submission.id > last_id)
+                .order_by(Submission.id)
+                .limit(batch_size)
+            )
+            rows = query.all() if dry_run else query.with_for_update().all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            if dry_run:
+                moved += len(rows)
+                continue
+
+            by_month: dict[str, list[Submission]] = {}
+            for row in rows:
+                by_month.setdefault(_month(row.submitted_at), []).append(row)
+            entries = []
+            for month, group in sorted(by_month.items()):
+                name = f"{month}/seg-{group[0].id:012d}-{group[-1].id:012d}.arc"
+                write_segment(os.path.join(ARCHIVE_DIR, name), _columns_for(db, group))
+                entries.append(
+                    {"file": name, "month": month, "min_id": group[0].id, "max_id": group[-1].id, "count": len(group)}
+                )
+            if not _purge(db, rows, cutoff):
+                db.rollback()
+                # Unlisted segments are unreachable; a listed one is a crashed
+                # run's copy of rows that are all still in the database
+                listed = {segment["file"] for segment in load_manifest()}
+                for entry in entries:
+                    if entry["file"] not in listed:
+                        os.remove(os.path.join(ARCHIVE_DIR, entry["file"]))
+                logger.warning("submissions up to id %d changed while being archived; left for a later run", last_id)
+                continue
+            _add_to_manifest(entries)
+            db.commit()
+            moved += len(rows)
+            logger.info("archived %d submissions up to id %d", moved, last_id)
+        return moved
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive old judged submissions")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch", type=int, default=ARCHIVE_SEGMENT_ROWS, help="rows per segment (at most)")
+    parser.add_argument("--dry-run", action="store_true", help="only count what would be archived")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    moved = archive(args.older_than_days, args.batch, args.dry_run)
+    print(f"{'would archive' if args.dry_run else 'archived'} {moved} submissions into {ARCHIVE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
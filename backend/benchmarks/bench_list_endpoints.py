@@ -0,0 +1,101 @@
+"""List endpoint serialization: ORM + pydantic (previous path) vs column rows + orjson.
+
+Builds a throwaway SQLite database with 10k problems and 10k testcases, then
+times both paths end to end (query, build, encode). Run from backend/:
+python benchmarks/bench_list_endpoints.py [rows]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter  # noqa: E402
+from db import SessionLocal, engine  # noqa: E402
+from models.base import Base  # noqa: E402
+from models import user, submission, submission_result, submission_source, rejudge_job  # noqa: E402,F401
+from models.problem import Problem  # noqa: E402
+from models.testcase import TestCase  # noqa: E402
+from routers import problems, testcases  # noqa: E402
+from schemas.problems import ProblemResponse  # noqa: E402
+from schemas.testcases import TestCaseResponse  # noqa: E402
+
+
+def setup() -> None:
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add_all(
+        Problem(id=i, title=f"Problem {i}", description="Find the answer. " * 20, concept="arrays", stars=1 + i % 5)
+        for i in range(1, ROWS + 1)
+    )
+    db.add_all(
+        TestCase(problem_id=1, input_data=" ".join(str(j) for j in range(i % 50)), expected_output=str(i), is_sample=i % 3 == 0)
+        for i in range(ROWS)
+    )
+    db.commit()
+    db.close()
+
+
+def orm_pydantic(model, schema, query_filter=None) -> bytes:
+    """What FastAPI did before: ORM entities, validated and dumped through the response model"""
+    db = SessionLocal()
+    try:
+        query = db.query(model)
+        if query_filter is not None:
+            query = query.filter(query_filter)
+        adapter = TypeAdapter(list[schema])
+        value = adapter.validate_python(query.all(), from_attributes=True)
+        return json.dumps(adapter.dump_python(value, mode="json")).encode()
+    finally:
+        db.close()
+
+
+def rows_orjson(handler, **kwargs) -> bytes:
+    db = SessionLocal()
+    try:
+        return handler(db=db, **kwargs).body
+    finally:
+        db.close()
+
+
+def timed(fn, repeats=5) -> float:
+    fn()   # warm caches and the connection pool
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    setup()
+    cases = [
+        (
+            "problems",
+            lambda: orm_pydantic(Problem, ProblemResponse),
+            lambda: rows_orjson(problems.get_all_problems, concept=None, stars=None, series_id=None, skip=0, limit=ROWS),
+        ),
+        (
+            "testcases/admin",
+            lambda: orm_pydantic(TestCase, TestCaseResponse, TestCase.problem_id == 1),
+            lambda: rows_orjson(testcases.get_problem_testcases_admin, problem_id=1, admin_user=None),
+        ),
+    ]
+    print(f"{ROWS} rows per response, median of 5")
+    print(f"{'endpoint':<18} {'orm+pydantic':>13} {'rows+orjson':>12} {'speed-up':>9}")
+    for name, before, after in cases:
+        if json.loads(before()) != json.loads(after()):
+            raise SystemExit(f"{name}: the two paths disagree")
+        old_ms, new_ms = timed(before), timed(after)
+        print(f"{name:<18} {old_ms:>11.1f}ms {new_ms:>10.1f}ms {old_ms / new_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Queue wait of interactive runs while a big rejudge drains.
+
+Drives the real judge.admission slots (in a throwaway SQLite file) with
+threads standing in for judge work: rejudge workers keep every slot they can
+get busy with multi-second judge runs, submissions trickle in, and a few
+users fire short runs. Each scenario reports the runs' wait for a slot:
+
+    submit-lane   runs queue like submissions (no run lane)
+    run-lane      LANE_RUN priority only, no reserved slot
+    reserved      LANE_RUN plus JUDGE_RUN_RESERVED_SLOTS (the default)
+
+Run from backend/: python benchmarks/bench_run_lane.py [seconds per scenario]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["ADMISSION_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="algoengine-bench-"), "admission.db")
+os.environ.setdefault("JUDGE_MAX_CONCURRENCY", "4")
+
+from judge import admission  # noqa: E402
+
+SEED = 11
+REJUDGE_THREADS = 8
+REJUDGE_SECONDS = (0.8, 2.5)     # one full judge run of an old submission
+SUBMIT_EVERY = 1.0
+SUBMIT_SECONDS = (0.5, 1.5)
+RUN_USERS = 4
+RUN_EVERY = (0.2, 0.6)           # think time between one user's runs
+RUN_SECONDS = (0.02, 0.08)       # a few sample cases of an interpreted solution
+
+
+def hold(stop: threading.Event, owner: str, lane: int, seconds: float, waits: list = None) -> None:
+    started = time.monotonic()
+    try:
+        with admission.judge_slot(owner=owner, lane=lane, max_queue=1000, timeout=60):
+            if waits is not None:
+                waits.append((time.monotonic() - started) * 1000)
+            stop.wait(seconds)
+    except admission.AdmissionRejected:
+        if waits is not None:
+            waits.append(float("inf"))
+
+
+def rejudge(stop: threading.Event, rng: random.Random) -> None:
+    while not stop.is_set():
+        hold(stop, "rejudge:1", admission.LANE_REJUDGE, rng.uniform(*REJUDGE_SECONDS))
+
+
+def submitter(stop: threading.Event, rng: random.Random) -> None:
+    while not stop.wait(rng.expovariate(1 / SUBMIT_EVERY)):
+        threading.Thread(
+            target=hold,
+            args=(stop, f"user:{rng.randrange(100, 200)}", admission.LANE_SUBMIT, rng.uniform(*SUBMIT_SECONDS)),
+            daemon=True,
+        ).start()
+
+
+def runner(stop: threading.Event, rng: random.Random, user: int, lane: int, waits: list) -> None:
+    while not stop.wait(rng.uniform(*RUN_EVERY)):
+        hold(stop, f"user:{user}", lane, rng.uniform(*RUN_SECONDS), waits)
+
+
+def scenario(seconds: float, run_lane: int, reserved: int) -> list[float]:
+    admission.JUDGE_RUN_RESERVED_SLOTS = reserved
+    stop = threading.Event()
+    waits: list[float] = []
+    threads = [threading.Thread(target=rejudge, args=(stop, random.Random(SEED + i))) for i in range(REJUDGE_THREADS)]
+    threads.append(threading.Thread(target=submitter, args=(stop, random.Random(SEED))))
+    # Let the rejudge fill every slot it may before the first run arrives
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    users = [
+        threading.Thread(target=runner, args=(stop, random.Random(SEED * 31 + u), u, run_lane, waits))
+        for u in range(RUN_USERS)
+    ]
+    for thread in users:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads + users:
+        thread.join()
+    return sorted(waits)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    reserved = admission.JUDGE_RUN_RESERVED_SLOTS
+    print(f"{admission.JUDGE_MAX_CONCURRENCY} slots, {REJUDGE_THREADS} rejudge threads, {RUN_USERS} run users, {seconds:.0f}s each")
+    print(f"{'scenario':<12} {'runs':>5} {'wait p50':>9} {'wait p95':>9} {'wait max':>9}")
+    for name, lane, slots in (
+        ("submit-lane", admission.LANE_SUBMIT, 0),
+        ("run-lane", admission.LANE_RUN, 0),
+        ("reserved", admission.LANE_RUN, reserved),
+    ):
+        waits = scenario(seconds, lane, slots)
+        p50 = waits[len(waits) // 2]
+        p95 = waits[max(0, int(len(waits) * 0.95) - 1)]
+        print(f"{name:<12} {len(waits):>5} {p50:>7.1f}ms {p95:>7.1f}ms {waits[-1]:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Mean time to a rejection verdict: primary-key order vs judge.scheduling order.
+
+Simulates a stream of submissions to one problem. Each wrong submission has a
+bug that fails some cases (edge cases are added last, as problem setters
+usually do, and big stress cases sit in the middle). The scheduled order is
+learnt online from the same fail-fast, censored observations the judge
+records, through judge.scheduling.rank. Run from backend/:
+python benchmarks/bench_testcase_order.py [submissions]
+"""
+import os
+import random
+import statistics
+import sys
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from judge import scheduling  # noqa: E402
+
+SEED = 7
+ACCEPTED_SHARE = 0.3
+
+
+@dataclass(frozen=True)
+class Case:
+    id: int
+    is_sample: bool
+    ms: float
+
+
+def build_problem(rng: random.Random) -> list[Case]:
+    cases = [Case(1, True, 4), Case(2, True, 4)]
+    cases += [Case(i, False, rng.uniform(5, 30)) for i in range(3, 13)]        # ordinary random cases
+    cases += [Case(i, False, rng.uniform(200, 600)) for i in range(13, 19)]    # stress cases
+    cases += [Case(i, False, rng.uniform(3, 8)) for i in range(19, 29)]        # edge cases, added last
+    return cases
+
+
+def build_bugs(cases: list[Case]) -> list[tuple[float, set[int]]]:
+    """(weight, failing case ids) for the kinds of wrong answers the problem attracts"""
+    edge = [c.id for c in cases if c.id >= 19]
+    stress = [c.id for c in cases if 13 <= c.id < 19]
+    return [
+        (0.15, {1, 2} | set(range(3, 29))),      # does not even pass the samples
+        (0.30, set(edge[:3])),                   # misses empty / single-element input
+        (0.20, set(edge[5:8])),                  # overflow on extreme values
+        (0.25, set(stress)),                     # too slow: TLE on the stress cases
+        (0.10, {7, edge[-1]}),                   # off-by-one hit by one random and one edge case
+    ]
+
+
+def judge(order: list[Case], failing: set[int]) -> tuple[float, list[tuple[int, bool, float]]]:
+    """Fail-fast run: (elapsed ms, observed (id, failed, ms) per case run)"""
+    elapsed = 0.0
+    observed = []
+    for case in order:
+        elapsed += case.ms
+        failed = case.id in failing
+        observed.append((case.id, failed, case.ms))
+        if failed:
+            break
+    return elapsed, observed
+
+
+def simulate(submissions: int, learn: bool) -> tuple[list[float], list[float]]:
+    rng = random.Random(SEED)
+    cases = build_problem(rng)
+    bugs = build_bugs(cases)
+    stats: dict[int, list] = {}
+    rejected, accepted = [], []
+    for _ in range(submissions):
+        order = scheduling.rank(cases, {k: tuple(v) for k, v in stats.items()}) if learn else cases
+        if rng.random() < ACCEPTED_SHARE:
+            elapsed, observed = judge(order, set())
+            accepted.append(elapsed)
+        else:
+            failing = rng.choices([b for _, b in bugs], weights=[w for w, _ in bugs])[0]
+            elapsed, observed = judge(order, failing)
+            rejected.append(elapsed)
+        for case_id, failed, ms in observed:
+            entry = stats.setdefault(case_id, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += failed
+            entry[2] += ms
+    return rejected, accepted
+
+
+def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    print(f"{submissions} submissions, {ACCEPTED_SHARE:.0%} accepted")
+    print(f"{'order':<10} {'reject mean':>12} {'reject p50':>11} {'reject p95':>11} {'accept mean':>12}")
+    results = {}
+    for name, learn in (("id", False), ("scheduled", True)):
+        rejected, accepted = simulate(submissions, learn)
+        rejected.sort()
+        results[name] = statistics.mean(rejected)
+        print(f"{name:<10} {statistics.mean(rejected):>10.1f}ms {statistics.median(rejected):>9.1f}ms "
+              f"{rejected[int(len(rejected) * 0.95) - 1]:>9.1f}ms {statistics.mean(accepted):>10.1f}ms")
+    print(f"mean time to rejection: {results['id'] / results['scheduled']:.2f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Per-testcase overhead of the native Python runner with and without the zygote.
+
+Runs a trivial solution many times through judge.sandbox in both modes and
+prints wall/CPU time per case. Run from backend/: python benchmarks/bench_zygote.py [cases]
+"""
+import os
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from judge import sandbox  # noqa: E402
+
+SOLUTION = """import sys, heapq, bisect
+from collections import Counter
+nums = list(map(int, sys.stdin.read().split()))
+print(sum(nums))
+"""
+
+
+def bench(zygote: bool, cases: int, solution_path: str) -> tuple[list[float], list[float]]:
+    walls, cpus = [], []
+    # One untimed run so both modes start with a live spawner
+    sandbox.run(["python3", "solution.py"], {"solution.py": solution_path}, input_data=b"1 2", zygote=zygote)
+    for _ in range(cases):
+        result = sandbox.run(["python3", "solution.py"], {"solution.py": solution_path}, input_data=b"1 2 3", zygote=zygote)
+        if result.exit_code != 0 or result.stdout.strip() != "6":
+            raise SystemExit(f"unexpected result: {result}")
+        walls.append(result.wall_ms)
+        cpus.append(result.cpu_ms)
+    return walls, cpus
+
+
+def main():
+    cases = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with tempfile.TemporaryDirectory() as tmp:
+        solution_path = os.path.join(tmp, "solution.py")
+        with open(solution_path, "w") as f:
+            f.write(SOLUTION)
+        print(f"{cases} cases per mode")
+        print(f"{'mode':<8} {'wall p50':>10} {'wall p95':>10} {'cpu p50':>10}")
+        for name, zygote in (("exec", False), ("zygote", True)):
+            walls, cpus = bench(zygote, cases, solution_path)
+            walls.sort()
+            print(f"{name:<8} {statistics.median(walls):>8.1f}ms {walls[int(len(walls) * 0.95) - 1]:>8.1f}ms "
+                  f"{statistics.median(cpus):>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
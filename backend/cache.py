@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from models.problem import Problem
+from models.testcase import TestCase
+
+load_dotenv()
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed TTL.
+
+    Each process holds its own copy. The problem and testcase caches below
+    also check ``problems.version`` on every read, so an edit made through any
+    API worker is seen by every other process on its next fetch.
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL_SECONDS, maxsize: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+
+@dataclass(frozen=True)
+class CachedTestCase:
+    """Session-independent copy of a testcase row used by the judge"""
+    id: int
+    problem_id: int
+    input_data: Optional[str]
+    expected_output: Optional[str]
+    is_sample: bool
+    kind: str = "literal"
+    generator_script: Optional[str] = None
+    generator_seed: Optional[int] = None
+    generator_params: Optional[str] = None
+    reference_solution: Optional[str] = None
+    input_sha256: Optional[str] = None
+    expected_sha256: Optional[str] = None
+
+
+problem_cache = TTLCache()
+testcase_cache = TTLCache()
+
+
+def problem_to_dict(problem: Problem) -> dict:
+    return {column.name: getattr(problem, column.name) for column in Problem.__table__.columns}
+
+
+def current_version(db: Session, problem_id: int) -> Optional[int]:
+    """The problem's version, one primary-key lookup; None if it does not exist"""
+    return db.query(Problem.version).filter(Problem.id == problem_id).scalar()
+
+
+def bump_version(db: Session, problem_id: int) -> None:
+    """Mark every process's cached copy of the problem and its testcases stale (caller commits)"""
+    db.query(Problem).filter(Problem.id == problem_id).update(
+        {Problem.version: Problem.version + 1}, synchronize_session=False
+    )
+    problem_cache.invalidate(problem_id)
+    testcase_cache.invalidate(problem_id)
+
+
+def get_problem(db: Session, problem_id: int) -> Optional[dict]:
+    """Return a problem as a plain dict, reading through the problem cache"""
+    cached = problem_cache.get(problem_id)
+    if cached is not None and cached["version"] == current_version(db, problem_id):
+        return cached
+    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    if problem is None:
+        return None
+    data = problem_to_dict(problem)
+    problem_cache.set(problem_id, data)
+    return data
+
+
+def get_testcases(db: Session, problem_id: int) -> list[CachedTestCase]:
+    """Return a problem's testcases in id order, reading through the testcase cache"""
+    # Read before the rows: an edit committed in between leaves a stale version, never stale rows
+    version = current_version(db, problem_id)
+    cached = testcase_cache.get(problem_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    rows = db.query(TestCase).filter(TestCase.problem_id == problem_id).order_by(TestCase.id).all()
+    testcases = [
+        CachedTestCase(
+            id=tc.id,
+            problem_id=tc.problem_id,
+            input_data=tc.input_data,
+            expected_output=tc.expected_output,
+            is_sample=bool(tc.is_sample),
+            kind=tc.kind or "literal",
+            generator_script=tc.generator_script,
+            generator_seed=tc.generator_seed,
+            generator_params=tc.generator_params,
+            reference_solution=tc.reference_solution,
+            input_sha256=tc.input_sha256,
+            expected_sha256=tc.expected_sha256,
+        )
+        for tc in rows
+    ]
+    testcase_cache.set(problem_id, (version, testcases))
+    return testcases
@@ -1,6 +1,7 @@
+import ipaddress
 import os
 import jwt
-from fastapi import Depends, HTTPException, Header
+from fastapi import Depends, HTTPException, Header, Request
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 from db import SessionLocal
@@ -9,6 +10,12 @@ from models.user import User
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "secret123")
 ALGORITHM = "HS256"
+# Reverse proxies (IPs or CIDRs) whose X-Forwarded-For is believed; others are the client
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(entry.strip(), strict=False)
+    for entry in os.getenv("TRUSTED_PROXIES", "127.0.0.1,::1").split(",")
+    if entry.strip()
+]
 
 def get_db():
     """Database dependency"""
@@ -18,6 +25,27 @@ def get_db():
     finally:
         db.close()
 
+def _trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str:
+    """Address of the real client: the peer, or the nearest untrusted X-Forwarded-For hop behind trusted proxies"""
+    peer = request.client.host if request.client else "unknown"
+    if not _trusted(peer):
+        return peer
+    # Walk right to left: entries left of the first untrusted hop can be forged by the client
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop):
+            return hop
+    if hops:
+        return hops[0]
+    return request.headers.get("x-real-ip", peer)
+
 def get_current_user(authorization: str = Header(None), db: Session = Depends(get_db)):
     """Extract current user from JWT token"""
     if not authorization:
@@ -40,7 +68,7 @@ def get_current_user(authorization: str = Header(None), db: Session = Depends(ge
     return user
 
 def get_current_admin_user(current_user: User = Depends(get_current_user)):
-    """Ensure current user is admin (you can add admin field to User model later)"""
-    # For now, allow all authenticated users to create problems
-    # Later you can add: if not current_user.is_admin: raise HTTPException(403, "Admin required")
-    return current_user
\ No newline at end of file
+    """Ensure current user is admin"""
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin required")
+    return current_user
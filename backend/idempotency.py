@@ -0,0 +1,169 @@
+"""Idempotency-Key support for submission creation.
+
+The first request with a key reserves it before doing any work; retries with
+the same key get the original submission back instead of judging again.
+Keys expire after IDEMPOTENCY_TTL_SECONDS.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from models.idempotency_key import IdempotencyKey
+from judge import admission
+
+load_dotenv()
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# How long a retry waits, in all, for the original request before answering 409 or 202
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "3"))
+# A reservation with no submission after this long belongs to a request that
+# died (a live one gives up within the judge queue timeout), so a retry takes it over
+IDEMPOTENCY_RESERVE_SECONDS = float(
+    os.getenv("IDEMPOTENCY_RESERVE_SECONDS", str(admission.JUDGE_QUEUE_TIMEOUT + 30))
+)
+MAX_KEY_LENGTH = 255
+
+_POLL_SECONDS = 0.25
+_PURGE_INTERVAL_SECONDS = 300
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+
+def request_hash(problem_id: int, language: str, code: str) -> str:
+    digest = hashlib.sha256()
+    for part in (str(problem_id), language, code):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _purge_expired(db: Session) -> None:
+    """Drop expired keys, at most once per interval per process"""
+    global _last_purge
+    now = time.monotonic()
+    with _purge_lock:
+        if now - _last_purge < _PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = now
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.utcnow()))
+    db.commit()
+
+
+def _live(db: Session, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    return (
+        db.query(IdempotencyKey)
+        .filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at >= datetime.utcnow(),
+        )
+        .populate_existing()
+        .first()
+    )
+
+
+def deadline() -> float:
+    """Monotonic deadline shared by every wait of one retried request"""
+    return time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+
+
+def retry_after() -> str:
+    return str(max(1, math.ceil(IDEMPOTENCY_WAIT_SECONDS)))
+
+
+def claim(db: Session, user_id: int, key: str, digest: str, wait_until: float) -> Optional[int]:
+    """Reserve ``key`` for a new request.
+
+    Returns None when the caller should go ahead, or the id of the submission
+    an earlier request with this key created. Raises 422 when the key was used
+    for a different request and 409 when the earlier request is still waiting
+    for a judge slot at ``wait_until``. A reservation older than
+    IDEMPOTENCY_RESERVE_SECONDS that never got a submission is taken over.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters")
+    _purge_expired(db)
+    while True:
+        existing = _live(db, user_id, key)
+        if existing is None:
+            # An expired row would otherwise hold the unique index
+            db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.expires_at < datetime.utcnow(),
+                )
+            )
+            db.add(IdempotencyKey(
+                user_id=user_id,
+                key=key,
+                request_hash=digest,
+                expires_at=datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+            ))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                # A concurrent retry won the insert; treat it as the original
+                db.rollback()
+                continue
+        if existing.request_hash != digest:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different submission")
+        if existing.submission_id is not None:
+            return existing.submission_id
+        if existing.created_at < datetime.utcnow() - timedelta(seconds=IDEMPOTENCY_RESERVE_SECONDS):
+            # The reserving process died before abandon() could run
+            db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.id == existing.id,
+                    IdempotencyKey.submission_id.is_(None),
+                )
+            )
+            db.commit()
+            continue
+        db.rollback()
+        if time.monotonic() >= wait_until:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": retry_after()},
+            )
+        time.sleep(_POLL_SECONDS)
+
+
+def attach(db: Session, user_id: int, key: str, submission_id: int) -> None:
+    """Point a reserved key at its submission (committed with the submission row).
+
+    A request that outlived its reservation and was taken over finds the key
+    already attached and leaves it pointing at the first submission.
+    """
+    db.execute(
+        update(IdempotencyKey)
+        .where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.submission_id.is_(None),
+        )
+        .values(submission_id=submission_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def abandon(db: Session, user_id: int, key: str) -> None:
+    """Release a key whose request failed before creating a submission, so a retry can run"""
+    db.rollback()
+    db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.submission_id.is_(None),
+        )
+    )
+    db.commit()
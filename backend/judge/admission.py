@@ -0,0 +1,224 @@
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+# SQLite file shared by every uvicorn worker on the host; WAL + BEGIN IMMEDIATE
+# serialises the read-modify-write of bucket and slot state across processes.
+ADMISSION_DB_PATH = os.getenv(
+    "ADMISSION_DB_PATH", os.path.join(tempfile.gettempdir(), "algoengine-admission.db")
+)
+USER_RATE_PER_MINUTE = float(os.getenv("MAX_SUBMISSIONS_PER_MINUTE", "5"))
+USER_BURST = float(os.getenv("SUBMISSION_BURST", "3"))
+IP_RATE_PER_MINUTE = float(os.getenv("MAX_SUBMISSIONS_PER_MINUTE_PER_IP", "30"))
+IP_BURST = float(os.getenv("SUBMISSION_BURST_PER_IP", "10"))
+# Slots only the run lane may take, so a run never waits behind a whole judge
+# run. At least one is reserved, and at least one other slot stays open to
+# submissions and rejudges: a smaller JUDGE_MAX_CONCURRENCY is raised to fit
+# both, so a 1-CPU host runs one judge alongside one run.
+JUDGE_RUN_RESERVED_SLOTS = max(1, int(os.getenv("JUDGE_RUN_RESERVED_SLOTS", "1")))
+JUDGE_MAX_CONCURRENCY = max(
+    int(os.getenv("JUDGE_MAX_CONCURRENCY", str(os.cpu_count() or 2))), JUDGE_RUN_RESERVED_SLOTS + 1
+)
+JUDGE_MAX_QUEUE = int(os.getenv("JUDGE_MAX_QUEUE", "32"))
+JUDGE_QUEUE_TIMEOUT = float(os.getenv("JUDGE_QUEUE_TIMEOUT", "30"))
+JUDGE_SLOT_MAX_SECONDS = float(os.getenv("JUDGE_SLOT_MAX_SECONDS", "300"))
+RUN_RATE_PER_MINUTE = float(os.getenv("MAX_RUNS_PER_MINUTE", "30"))
+RUN_BURST = float(os.getenv("RUN_BURST", "10"))
+RUN_IP_RATE_PER_MINUTE = float(os.getenv("MAX_RUNS_PER_MINUTE_PER_IP", "120"))
+RUN_IP_BURST = float(os.getenv("RUN_BURST_PER_IP", "30"))
+RUN_MAX_QUEUE = int(os.getenv("RUN_MAX_QUEUE", "16"))
+RUN_QUEUE_TIMEOUT = float(os.getenv("RUN_QUEUE_TIMEOUT", "5"))
+
+# Lower value is served first when a slot frees up
+LANE_RUN = 0
+LANE_SUBMIT = 10
+LANE_REJUDGE = 50
+
+_POLL_SECONDS = 0.05
+_RUN_POLL_SECONDS = 0.01
+_WAITER_STALE_SECONDS = 5.0
+
+
+class AdmissionRejected(HTTPException):
+    """Raised when a request is shed; carries a Retry-After hint"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(status_code=status_code, detail=detail, headers={"Retry-After": str(self.retry_after)})
+
+
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(ADMISSION_DB_PATH, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS slots ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " state TEXT NOT NULL,"
+            " lane INTEGER NOT NULL,"
+            " owner TEXT NOT NULL,"
+            " pid INTEGER NOT NULL,"
+            " enqueued REAL NOT NULL,"
+            " heartbeat REAL NOT NULL)"
+        )
+        _local.conn = conn
+    return conn
+
+
+@contextmanager
+def _transaction():
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _reap_stale(conn: sqlite3.Connection, now: float) -> None:
+    """Drop slots left behind by crashed workers or abandoned waiters"""
+    rows = conn.execute("SELECT id, state, pid, heartbeat FROM slots").fetchall()
+    for slot_id, state, pid, heartbeat in rows:
+        limit = _WAITER_STALE_SECONDS if state == "waiting" else JUDGE_SLOT_MAX_SECONDS
+        if now - heartbeat > limit or not _pid_alive(pid):
+            conn.execute("DELETE FROM slots WHERE id = ?", (slot_id,))
+
+
+# -------------------------
+# RATE LIMITING
+# -------------------------
+def check_rate(user_id: int, ip: str) -> None:
+    """Take one token from the user's and the IP's bucket, or raise 429"""
+    _take([
+        (f"user:{user_id}", USER_RATE_PER_MINUTE / 60.0, USER_BURST),
+        (f"ip:{ip}", IP_RATE_PER_MINUTE / 60.0, IP_BURST),
+    ], "Too many submissions, slow down")
+
+
+def check_run_rate(user_id: int, ip: str) -> None:
+    """Like check_rate, from separate buckets sized for interactive runs; never spends submission tokens"""
+    _take([
+        (f"run:user:{user_id}", RUN_RATE_PER_MINUTE / 60.0, RUN_BURST),
+        (f"run:ip:{ip}", RUN_IP_RATE_PER_MINUTE / 60.0, RUN_IP_BURST),
+    ], "Too many runs, slow down")
+
+
+def _take(limits: list[tuple[str, float, float]], detail: str) -> None:
+    now = time.time()
+    with _transaction() as conn:
+        refilled = []
+        for key, rate, burst in limits:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens < 1:
+                raise AdmissionRejected(429, detail, (1 - tokens) / rate)
+            refilled.append((key, tokens))
+        # Only charge once every bucket has passed, so a rejection costs nothing
+        for key, tokens in refilled:
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens - 1, now)
+            )
+
+
+# -------------------------
+# CONCURRENCY SLOTS
+# -------------------------
+def _try_grant(conn: sqlite3.Connection, slot_id: int) -> bool:
+    running, shared = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(lane != ?), 0) FROM slots WHERE state = 'running'", (LANE_RUN,)
+    ).fetchone()
+    if running >= JUDGE_MAX_CONCURRENCY:
+        return False
+    # Head of the queue: best lane first, then owners with the fewest running
+    # slots (fair share), then arrival order.
+    head = conn.execute(
+        "SELECT w.id, w.lane FROM slots w WHERE w.state = 'waiting' ORDER BY w.lane,"
+        " (SELECT COUNT(*) FROM slots r WHERE r.state = 'running' AND r.owner = w.owner),"
+        " w.enqueued, w.id LIMIT 1"
+    ).fetchone()
+    if head is None or head[0] != slot_id:
+        return False
+    if head[1] != LANE_RUN and shared >= JUDGE_MAX_CONCURRENCY - JUDGE_RUN_RESERVED_SLOTS:
+        return False
+    conn.execute("UPDATE slots SET state = 'running', heartbeat = ? WHERE id = ?", (time.time(), slot_id))
+    return True
+
+
+@contextmanager
+def judge_slot(owner: str, lane: int = LANE_SUBMIT, max_queue: int = JUDGE_MAX_QUEUE, timeout: float = JUDGE_QUEUE_TIMEOUT):
+    """Hold one of the host-wide judge slots for the duration of the block.
+
+    Waits in a bounded queue; raises 503 with Retry-After if the queue is full
+    or the wait exceeds ``timeout``. Only waiters in the same lane count
+    towards ``max_queue``: each lane has its own bound, so a burst of runs
+    cannot shed submissions and background work never sheds live traffic.
+    """
+    now = time.time()
+    with _transaction() as conn:
+        _reap_stale(conn, now)
+        waiting = conn.execute(
+            "SELECT COUNT(*) FROM slots WHERE state = 'waiting' AND lane = ?", (lane,)
+        ).fetchone()[0]
+        if waiting >= max_queue:
+            raise AdmissionRejected(503, "Judge queue is full, retry later", timeout / 2)
+        slot_id = conn.execute(
+            "INSERT INTO slots (state, lane, owner, pid, enqueued, heartbeat) VALUES ('waiting', ?, ?, ?, ?, ?)",
+            (lane, owner, os.getpid(), now, now),
+        ).lastrowid
+
+    deadline = now + timeout
+    poll_seconds = _RUN_POLL_SECONDS if lane == LANE_RUN else _POLL_SECONDS
+    try:
+        while True:
+            with _transaction() as conn:
+                if _try_grant(conn, slot_id):
+                    break
+                conn.execute("UPDATE slots SET heartbeat = ? WHERE id = ?", (time.time(), slot_id))
+            if time.time() >= deadline:
+                raise AdmissionRejected(503, "Judge is busy, retry later", timeout / 2)
+            time.sleep(poll_seconds)
+        yield slot_id
+    finally:
+        with _transaction() as conn:
+            conn.execute("DELETE FROM slots WHERE id = ?", (slot_id,))
+
+
+def snapshot() -> dict:
+    """Current queue depth and running count, for health and admin views"""
+    conn = _connect()
+    counts = dict(conn.execute("SELECT state, COUNT(*) FROM slots GROUP BY state").fetchall())
+    return {
+        "running": counts.get("running", 0),
+        "waiting": counts.get("waiting", 0),
+        "max_concurrency": JUDGE_MAX_CONCURRENCY,
+        "max_queue": JUDGE_MAX_QUEUE,
+        "reserved_for_runs": JUDGE_RUN_RESERVED_SLOTS,
+    }
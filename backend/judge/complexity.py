@@ -0,0 +1,172 @@
+import logging
+import math
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+from dotenv import load_dotenv
+from judge import sandbox, testdata
+
+load_dotenv()
+SCALING_REPEATS = int(os.getenv("JUDGE_SCALING_REPEATS", "2"))
+# Scaling runs happen inside the submission's judge slot, so the family is bounded
+SCALING_MAX_SIZES = int(os.getenv("JUDGE_SCALING_MAX_SIZES", "8"))
+SCALING_MAX_TOTAL = int(os.getenv("JUDGE_SCALING_MAX_TOTAL", "10000000"))   # sum of all sizes
+# Timing noise per sample below which two fits count as equally good
+NOISE_MS = float(os.getenv("JUDGE_SCALING_NOISE_MS", "2"))
+
+logger = logging.getLogger("algoengine.complexity")
+
+# Ordered from slowest- to fastest-growing; the order doubles as the ranking
+# used to decide whether an estimate exceeds a problem's target.
+CLASSES = [
+    ("1", lambda n: 1.0),
+    ("log n", lambda n: math.log2(n)),
+    ("n", lambda n: float(n)),
+    ("n log n", lambda n: n * math.log2(n)),
+    ("n^2", lambda n: float(n) ** 2),
+    ("n^3", lambda n: float(n) ** 3),
+    ("2^n", lambda n: 2.0 ** n),
+]
+RANK = {name: i for i, (name, _) in enumerate(CLASSES)}
+
+_ALIASES = {"nlogn": "n log n", "logn": "log n", "n2": "n^2", "n3": "n^3", "2n": "2^n", "n²": "n^2", "n³": "n^3"}
+
+
+def normalize_class(text: Optional[str]) -> Optional[str]:
+    """Map user spellings like "O(N log N)" or "n^2" onto a CLASSES name"""
+    if not text:
+        return None
+    key = re.sub(r"\s+", "", text.strip().lower())
+    if key.startswith("o(") and key.endswith(")"):
+        key = key[2:-1]
+    key = key.replace("**", "^")
+    for name in RANK:
+        if key == name.replace(" ", ""):
+            return name
+    return _ALIASES.get(key)
+
+
+def parse_sizes(text: Optional[str]) -> tuple[int, ...]:
+    if not text:
+        return ()
+    return tuple(sorted({int(part) for part in text.split(",") if part.strip()}))
+
+
+def bounded(sizes: tuple[int, ...]) -> tuple[int, ...]:
+    """The smallest sizes that fit within SCALING_MAX_SIZES and SCALING_MAX_TOTAL"""
+    kept = []
+    total = 0
+    for n in sizes[:SCALING_MAX_SIZES]:
+        total += n
+        if total > SCALING_MAX_TOTAL:
+            break
+        kept.append(n)
+    return tuple(kept)
+
+
+@dataclass(frozen=True)
+class ScalingFamily:
+    generator: str           # python script; receives n as argv[1], prints one input
+    sizes: tuple[int, ...]
+    target: Optional[str] = None
+    enforce: bool = False
+
+    @classmethod
+    def from_problem(cls, problem: dict) -> Optional["ScalingFamily"]:
+        # Rows stored before the caps existed are trimmed rather than trusted
+        sizes = bounded(parse_sizes(problem.get("scaling_sizes")))
+        if not problem.get("scaling_generator") or len(sizes) < 3:
+            return None
+        return cls(
+            generator=problem["scaling_generator"],
+            sizes=sizes,
+            target=normalize_class(problem.get("target_complexity")),
+            enforce=bool(problem.get("enforce_complexity")),
+        )
+
+
+@dataclass
+class ComplexityReport:
+    estimate: Optional[str]
+    target: Optional[str]
+    exceeded: bool
+    samples: list[tuple[int, float]] = field(default_factory=list)   # (n, cpu_ms)
+    failed_at: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _residual(xs: list[float], ts: list[float]) -> float:
+    """Sum of squared residuals of t = a + b*x with b clamped to >= 0"""
+    count = len(xs)
+    mean_x = sum(xs) / count
+    mean_t = sum(ts) / count
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    slope = 0.0 if var_x == 0 else sum((x - mean_x) * (t - mean_t) for x, t in zip(xs, ts)) / var_x
+    slope = max(slope, 0.0)
+    intercept = mean_t - slope * mean_x
+    return sum((t - intercept - slope * x) ** 2 for x, t in zip(xs, ts))
+
+
+def fit(samples: list[tuple[int, float]]) -> Optional[str]:
+    """Pick the simplest complexity class whose curve explains the timings.
+
+    Every class is fitted as ``t = a + b*f(n)`` (the intercept soaks up process
+    start-up); among fits within noise of the best one, the slowest-growing
+    class wins so that noise never inflates the estimate.
+    """
+    if len({n for n, _ in samples}) < 3:
+        return None
+    ns = [n for n, _ in samples]
+    ts = [t for _, t in samples]
+    residuals = []
+    for name, f in CLASSES:
+        if name == "2^n" and max(ns) > 64:
+            continue
+        residuals.append((name, _residual([f(n) for n in ns], ts)))
+    best = min(r for _, r in residuals)
+    tolerance = best * 1.1 + len(samples) * NOISE_MS ** 2
+    for name, residual in residuals:
+        if residual <= tolerance:
+            return name
+    return None
+
+
+def measure(workspace, family: ScalingFamily, limits: sandbox.Limits) -> ComplexityReport:
+    """Time a compiled workspace on each generated size and fit the curve.
+
+    Generated inputs come from the shared test-data disk cache, so a family is
+    only generated once per host.
+    """
+    samples = []
+    failed_at = None
+    for n in family.sizes:
+        try:
+            input_path = testdata.generate(family.generator, [str(n)])
+        except testdata.TestDataError as exc:
+            logger.warning("scaling generator failed for n=%s: %s", n, exc)
+            break
+
+        best = None
+        for _ in range(SCALING_REPEATS):
+            result = workspace.run(limits, input_path=input_path)
+            cpu_ms = result.cpu_ms if result.cpu_ms is not None else result.wall_ms
+            if result.timed_out or result.exit_code != 0 or cpu_ms > limits.cpu_seconds * 1000:
+                best = None
+                break
+            best = cpu_ms if best is None else min(best, cpu_ms)
+        if best is None:
+            failed_at = n
+            break
+        samples.append((n, best))
+
+    estimate = fit(samples)
+    exceeded = False
+    if family.target is not None:
+        # Not finishing the family within the CPU limit counts as too slow
+        exceeded = failed_at is not None or (estimate is not None and RANK[estimate] > RANK[family.target])
+    return ComplexityReport(
+        estimate=estimate, target=family.target, exceeded=exceeded, samples=samples, failed_at=failed_at
+    )
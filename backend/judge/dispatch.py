@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from db import SessionLocal
+from models.submission import Submission
+from models.submission_result import SubmissionResult
+from models.submission_timeline import SubmissionTimeline
+import cache
+import similarity
+import sources
+from judge import complexity, runner, scheduling, timeline
+
+load_dotenv()
+# "inline" judges in the API request; "queue" leaves pending rows for judge-workers
+JUDGE_DISPATCH = os.getenv("JUDGE_DISPATCH", "inline").lower()
+JUDGE_LEASE_SECONDS = float(os.getenv("JUDGE_LEASE_SECONDS", "60"))
+# A submission whose judge keeps dying is given up on instead of crash-looping workers
+JUDGE_MAX_ATTEMPTS = int(os.getenv("JUDGE_MAX_ATTEMPTS", "3"))
+
+_HEARTBEAT_SECONDS = JUDGE_LEASE_SECONDS / 3
+_CLAIM_RETRIES = 5
+
+logger = logging.getLogger("algoengine.dispatch")
+
+
+def lease_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_expiry() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=JUDGE_LEASE_SECONDS)
+
+
+def _claimable(now: datetime):
+    return or_(
+        Submission.status == "pending",
+        and_(Submission.status == "judging", Submission.lease_expires_at < now),
+    )
+
+
+def claim(db: Session, owner: str) -> Optional[Submission]:
+    """Lease the oldest pending (or abandoned) submission to ``owner``.
+
+    MySQL skips rows other workers have locked, so concurrent claimers never
+    queue behind each other; elsewhere the conditional UPDATE alone decides
+    the race and a loser simply tries the next row.
+    """
+    skip_locked = db.get_bind().dialect.name in ("mysql", "postgresql")
+    for _ in range(_CLAIM_RETRIES):
+        now = datetime.utcnow()
+        query = select(Submission.id).where(_claimable(now)).order_by(Submission.id).limit(1)
+        if skip_locked:
+            query = query.with_for_update(skip_locked=True)
+        candidate = db.execute(query).scalar()
+        if candidate is None:
+            db.rollback()
+            return None
+        claimed = db.execute(
+            update(Submission)
+            .where(Submission.id == candidate, _claimable(now))
+            .values(
+                status="judging",
+                lease_owner=owner,
+                lease_expires_at=lease_expiry(),
+                judge_attempts=Submission.judge_attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Submission, candidate, populate_existing=True)
+    return None
+
+
+def release(db: Session, submission_id: int, owner: str) -> None:
+    """Hand a leased submission back to the queue without counting the attempt"""
+    db.execute(
+        update(Submission)
+        .where(Submission.id == submission_id, Submission.lease_owner == owner)
+        .values(
+            status="pending",
+            lease_owner=None,
+            lease_expires_at=None,
+            judge_attempts=Submission.judge_attempts - 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def lease_finished(db: Session, submission_id: int, owner: str) -> bool:
+    """Lease an already judged submission for re-judging; False if it is in flight"""
+    leased = db.execute(
+        update(Submission)
+        .where(Submission.id == submission_id, Submission.status.notin_(("pending", "judging")))
+        .values(status="judging", lease_owner=owner, lease_expires_at=lease_expiry(), judge_attempts=1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(leased)
+
+
+@contextmanager
+def heartbeat(submission_id: int, owner: str):
+    """Keep extending a lease from a background thread while the body runs.
+
+    Yields an Event that is set if the lease was lost (reclaimed by another
+    worker after a stall), in which case the caller's verdict is discarded.
+    """
+    stop = threading.Event()
+    lost = threading.Event()
+
+    def beat():
+        while not stop.wait(_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                extended = db.execute(
+                    update(Submission)
+                    .where(Submission.id == submission_id, Submission.lease_owner == owner)
+                    .values(lease_expires_at=lease_expiry())
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                db.commit()
+            except Exception:
+                logger.exception("heartbeat for submission %s failed", submission_id)
+                continue
+            finally:
+                db.close()
+            if not extended:
+                lost.set()
+                return
+
+    thread = threading.Thread(target=beat, name=f"lease-{submission_id}", daemon=True)
+    thread.start()
+    try:
+        yield lost
+    finally:
+        stop.set()
+        thread.join()
+
+
+def record(
+    db: Session, submission_id: int, owner: str, result: runner.JudgeResult, *, problem_id: int, language: str
+) -> bool:
+    """Write a verdict if ``owner`` still holds the lease; returns False if it did not.
+
+    ``problem_id`` and ``language`` label the stored timeline; callers have them at hand.
+    """
+    started = time.time()
+    values = {"status": result.status, "lease_owner": None, "lease_expires_at": None}
+    if result.complexity is not None:
+        values["estimated_complexity"] = result.complexity.estimate
+        values["complexity_report"] = json.dumps(result.complexity.to_dict())
+    updated = db.execute(
+        update(Submission)
+        .where(Submission.id == submission_id, Submission.lease_owner == owner)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        db.rollback()
+        logger.warning("lease on submission %s lost before its verdict was written", submission_id)
+        return False
+    # A reclaimed submission may carry rows from a judge that died half-way
+    db.execute(delete(SubmissionResult).where(SubmissionResult.submission_id == submission_id))
+    db.add_all(
+        SubmissionResult(
+            submission_id=submission_id,
+            testcase_id=case.testcase_id,
+            verdict=case.verdict,
+            cpu_ms=None if case.cpu_ms is None else round(case.cpu_ms),
+            wall_ms=round(case.wall_ms),
+            max_rss_kb=case.max_rss_kb,
+        )
+        for case in result.cases
+    )
+    if result.timeline is not None:
+        _store_timeline(db, submission_id, problem_id, language, result.timeline, started)
+    db.commit()
+    return True
+
+
+def _store_timeline(
+    db: Session, submission_id: int, problem_id: int, language: str, timing: timeline.Timeline, record_started: float
+) -> None:
+    """Save the run's stage timeline, closed by the span of this write (bar the commit)"""
+    data = timing.pack(extra=[(timeline.RECORD, 0, record_started, time.time())])
+    db.execute(delete(SubmissionTimeline).where(SubmissionTimeline.submission_id == submission_id))
+    db.add(SubmissionTimeline(submission_id=submission_id, problem_id=problem_id, language=language, data=data))
+
+
+def _index_similarity(submission_id: int, problem_id: int, language: str, source_hash: str, code: Optional[str]) -> None:
+    """Add a judged submission to the similarity index in its own session"""
+    db = SessionLocal()
+    try:
+        if code is None:
+            code = sources.load(db, source_hash)
+        similarity.index_submission(db, submission_id, problem_id, code, language)
+        db.commit()
+    except Exception:
+        # The verdict is already stored; similarity.py --backfill picks this one up later
+        db.rollback()
+        logger.exception("could not index submission %s for similarity", submission_id)
+    finally:
+        db.close()
+
+
+def judge_leased(db: Session, submission: Submission, owner: str, code: Optional[str] = None) -> Optional[str]:
+    """Judge a submission leased to ``owner`` and store the verdict.
+
+    ``code`` saves a trip to the source store when the caller already has it.
+    Returns the stored status, or None when the lease was lost meanwhile.
+    """
+    problem = cache.get_problem(db, submission.problem_id)
+    testcases = cache.get_testcases(db, submission.problem_id)
+    if submission.judge_attempts > JUDGE_MAX_ATTEMPTS:
+        logger.error("giving up on submission %s after %s attempts", submission.id, submission.judge_attempts - 1)
+        result = runner.JudgeResult(status="judge_error")
+    elif problem is None or not testcases:
+        result = runner.JudgeResult(status="judge_error")
+    else:
+        timing = timeline.Timeline()
+        if submission.submitted_at is not None:
+            timing.add_since(timeline.QUEUE, submission.submitted_at)
+        if code is None:
+            code = sources.load(db, submission.source_hash)
+        with heartbeat(submission.id, owner) as lost:
+            result = runner.judge(
+                code,
+                submission.language,
+                scheduling.order(db, submission.problem_id, testcases),
+                scaling=complexity.ScalingFamily.from_problem(problem),
+                timing=timing,
+            )
+        if lost.is_set():
+            return None
+    if not record(db, submission.id, owner, result, problem_id=submission.problem_id, language=submission.language):
+        return None
+    # Off the request: an inline submit returns without waiting for the signature
+    threading.Thread(
+        target=_index_similarity,
+        args=(submission.id, submission.problem_id, submission.language, submission.source_hash, code),
+        name=f"similarity-{submission.id}",
+        daemon=True,
+    ).start()
+    scheduling.observe(submission.problem_id, result.cases)
+    return result.status
@@ -0,0 +1,46 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Language:
+    name: str
+    source_file: str
+    compile_cmd: Optional[list[str]]
+    run_cmd: list[str]
+    artifact: str          # file the run step needs from the workspace
+    docker_image: str
+    mode: str              # "native", "docker", or "zygote" (python only)
+
+
+LANGUAGES = {
+    "python": Language(
+        name="python",
+        source_file="solution.py",
+        compile_cmd=None,
+        run_cmd=["python3", "solution.py"],
+        artifact="solution.py",
+        docker_image=os.getenv("PYTHON_RUNNER_IMAGE", "algoengine-python-runner"),
+        mode=os.getenv("JUDGE_MODE_PYTHON", "native").lower(),
+    ),
+    "cpp": Language(
+        name="cpp",
+        source_file="solution.cpp",
+        compile_cmd=["g++", "-O2", "-std=c++17", "-o", "solution", "solution.cpp"],
+        run_cmd=["./solution"],
+        artifact="solution",
+        docker_image=os.getenv("CPP_RUNNER_IMAGE", "algoengine-cpp-runner"),
+        mode=os.getenv("JUDGE_MODE_CPP", "native").lower(),
+    ),
+}
+
+_ALIASES = {"python3": "python", "py": "python", "c++": "cpp", "cxx": "cpp"}
+
+
+def get_language(name: str) -> Optional[Language]:
+    key = name.strip().lower()
+    return LANGUAGES.get(_ALIASES.get(key, key))
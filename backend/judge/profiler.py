@@ -0,0 +1,194 @@
+"""Sampling profiler run inside the sandbox in place of a Python solution.
+
+Usage: ``python3 profiler.py <interval_ms> <max_samples> <min_samples> solution.py``
+
+The solution runs as ``__main__`` with its normal stdin and stdout. Every
+``interval_ms`` of CPU time (ITIMER_PROF) the stack is sampled and charged to
+the solution's own functions and lines; time spent in library code counts
+towards the solution frame that called it. Results go to ``profile.json``:
+
+    {"interval_ms": 5, "samples": 120, "outside": 3, "truncated": false,
+     "functions": [[name, first_line, self_samples, total_samples], ...],
+     "lines": [[line, function, samples], ...]}
+
+A run that finishes in fewer than ``min_samples`` samples is too fast to
+sample, so it is run again under cProfile, with stdin rewound and stdout
+discarded. That profile has no lines and reports times, not samples:
+
+    {"deterministic": true, "samples": 2, "truncated": false, "lines": [],
+     "functions": [[name, first_line, self_ms, total_ms, calls], ...]}
+
+Overhead is bounded: one short stack walk (at most MAX_STACK frames) per
+sample, and sampling stops after ``max_samples``. The run keeps the
+sandbox's rlimits; on SIGXCPU the profile is written before the process dies.
+
+Stdlib only: it runs under the sandbox's own python3.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import runpy
+import signal
+import sys
+
+MAX_STACK = 128
+PROFILE_FILE = "profile.json"
+
+
+class Profiler:
+    def __init__(self, filename, interval_ms, max_samples):
+        self.filename = filename
+        self.interval = interval_ms / 1000
+        self.max_samples = max_samples
+        self.samples = 0
+        self.outside = 0          # samples with no solution frame on the stack
+        self.self_counts = {}     # (name, first line) -> samples
+        self.total_counts = {}
+        self.line_counts = {}     # (line, name) -> samples
+        self.written = False
+
+    def sample(self, signum, frame):
+        self.samples += 1
+        if self.samples >= self.max_samples:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+        innermost = None
+        seen = set()
+        depth = 0
+        while frame is not None and depth < MAX_STACK:
+            code = frame.f_code
+            if code.co_filename == self.filename:
+                key = (code.co_name, code.co_firstlineno)
+                if innermost is None:
+                    innermost = key
+                    line = (frame.f_lineno, code.co_name)
+                    self.line_counts[line] = self.line_counts.get(line, 0) + 1
+                if key not in seen:
+                    seen.add(key)
+                    self.total_counts[key] = self.total_counts.get(key, 0) + 1
+            frame = frame.f_back
+            depth += 1
+        if innermost is None:
+            self.outside += 1
+        else:
+            self.self_counts[innermost] = self.self_counts.get(innermost, 0) + 1
+
+    def start(self):
+        signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+
+    def write(self):
+        if self.written:
+            return
+        self.written = True
+        functions = [
+            [name, first_line, self.self_counts.get((name, first_line), 0), total]
+            for (name, first_line), total in self.total_counts.items()
+        ]
+        with open(PROFILE_FILE, "w") as f:
+            json.dump({
+                "interval_ms": self.interval * 1000,
+                "samples": self.samples,
+                "outside": self.outside,
+                "truncated": self.samples >= self.max_samples,
+                "functions": functions,
+                "lines": [[line, name, count] for (line, name), count in self.line_counts.items()],
+            }, f)
+
+    def write_deterministic(self, stats):
+        """Write a cProfile run's solution functions; library time counts towards the direct caller"""
+        own = {}
+        total = {}
+        calls = {}
+        for (filename, first_line, name), (_, count, self_s, total_s, callers) in stats.items():
+            if filename == self.filename:
+                key = (name, first_line)
+                own[key] = own.get(key, 0) + self_s
+                total[key] = total.get(key, 0) + total_s
+                calls[key] = calls.get(key, 0) + count
+                continue
+            for (caller_file, caller_line, caller_name), (_, _, caller_self_s, _) in callers.items():
+                if caller_file == self.filename:
+                    key = (caller_name, caller_line)
+                    own[key] = own.get(key, 0) + caller_self_s
+        with open(PROFILE_FILE, "w") as f:
+            json.dump({
+                "deterministic": True,
+                "samples": self.samples,
+                "truncated": False,
+                "functions": [
+                    [name, first_line, own[(name, first_line)] * 1000, total_s * 1000, calls[(name, first_line)]]
+                    for (name, first_line), total_s in total.items()
+                ],
+                "lines": [],
+            }, f)
+        self.written = True
+
+    def on_cpu_limit(self, signum, frame):
+        # Out of CPU time: keep what was sampled, then die of SIGXCPU as usual
+        self.stop()
+        self.write()
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
+
+def _replay(path, stdin):
+    """Run the solution again on a copy of its stdin (always a file here), output discarded"""
+    # Before opening anything: the first run may have closed fd 0 (open(0)
+    # does), and the next descriptor handed out would land there
+    os.dup2(stdin, 0)
+    os.lseek(0, 0, os.SEEK_SET)
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    sys.stdin = io.TextIOWrapper(io.BufferedReader(io.FileIO(0, "r", closefd=False)), encoding="utf-8")
+    profile = cProfile.Profile()
+    try:
+        profile.runcall(runpy.run_path, path, run_name="__main__")
+    except SystemExit:
+        pass
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(saved)
+    return pstats.Stats(profile).stats
+
+
+def main(argv):
+    interval_ms, max_samples, min_samples, script = float(argv[1]), int(argv[2]), int(argv[3]), argv[4]
+    path = os.path.abspath(script)
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(path)
+    profiler = Profiler(path, interval_ms, max_samples)
+    stdin = os.dup(0)
+    signal.signal(signal.SIGXCPU, profiler.on_cpu_limit)
+    profiler.start()
+    exited = None
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as exc:
+        exited = exc
+    except BaseException:
+        profiler.stop()
+        profiler.write()
+        raise
+    profiler.stop()
+    if profiler.samples < min_samples:
+        try:
+            profiler.write_deterministic(_replay(path, stdin))
+        except Exception:
+            # Behaved differently the second time; the few samples will have to do
+            pass
+    profiler.write()
+    if exited is not None:
+        raise exited
+
+
+if __name__ == "__main__":
+    main(sys.argv)
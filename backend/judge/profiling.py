@@ -0,0 +1,228 @@
+import json
+import os
+import re
+import shutil
+from typing import Optional
+from dotenv import load_dotenv
+from judge import runner, sandbox, testdata
+from judge.languages import Language, get_language
+
+load_dotenv()
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_MAX_SAMPLES = int(os.getenv("PROFILE_MAX_SAMPLES", "10000"))
+# Fewer samples than this and a Python run is profiled again with cProfile
+PROFILE_MIN_SAMPLES = int(os.getenv("PROFILE_MIN_SAMPLES", "10"))
+PROFILE_TOP = 10
+
+_PROFILER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiler.py")
+# Linked into profiled C++ builds: gmon.out is normally only written by exit(),
+# so flush it on SIGXCPU too, where profiling matters most
+_GMON_FLUSH = """#include <signal.h>
+#include <sys/gmon.h>
+static void flush_profile(int sig) { _mcleanup(); signal(sig, SIG_DFL); raise(sig); }
+__attribute__((constructor)) static void install_flush(void) { signal(SIGXCPU, flush_profile); }
+"""
+# gprof -p: "% time  cumulative s  self s  [calls  self ms/call  total ms/call]  name"
+_FLAT_ROW = re.compile(
+    r"^\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s+(?:(\d+)\s+([\d.]+)\s+([\d.]+)\s+)?(.+?)\s*$"
+)
+
+class ProfileUnavailable(Exception):
+    """The submission's language or judge mode cannot be profiled"""
+
+
+def _input_for(tc) -> tuple[bytes, Optional[str], Optional[testdata.Materialized]]:
+    if tc.kind != "generator":
+        return tc.input_data.encode(), None, None
+    data = testdata.materialize(tc)
+    return b"", data.input_path, data
+
+
+def _verdict(result: sandbox.RunResult, tc, data, actual_path: Optional[str]) -> str:
+    if data is None:
+        return runner.verdict_for(result, tc.expected_output, runner.DEFAULT_LIMITS)
+    return runner.compare_files(result, runner.DEFAULT_LIMITS, actual_path, data, tc)
+
+
+def _run(workspace: runner.Workspace, cmd: list[str], files: dict, tc, outputs: dict, zygote: bool = False):
+    input_data, input_path, data = _input_for(tc)
+    actual_path = os.path.join(workspace.path, "actual.out") if data is not None else None
+    result = sandbox.run(
+        cmd,
+        files,
+        runner.DEFAULT_LIMITS,
+        input_data=input_data,
+        input_path=input_path,
+        stdout_path=actual_path,
+        outputs=outputs,
+        zygote=zygote,
+    )
+    return result, _verdict(result, tc, data, actual_path)
+
+
+def _report(result: sandbox.RunResult, verdict: str, tc, profiler: str) -> dict:
+    return {
+        "testcase_id": tc.id,
+        "verdict": verdict,
+        "cpu_ms": result.cpu_ms,
+        "wall_ms": result.wall_ms,
+        "profiler": profiler,
+    }
+
+
+def _profile_python(code: str, language: Language, tc) -> dict:
+    with runner.Workspace(code, language) as workspace:
+        profiler_path = os.path.join(workspace.path, "profiler.py")
+        shutil.copyfile(_PROFILER_PATH, profiler_path)
+        profile_path = os.path.join(workspace.path, "profile.json")
+        result, verdict = _run(
+            workspace,
+            [
+                "python3", "profiler.py",
+                str(PROFILE_INTERVAL_MS), str(PROFILE_MAX_SAMPLES), str(PROFILE_MIN_SAMPLES), language.source_file,
+            ],
+            {language.source_file: workspace.source_path, "profiler.py": profiler_path},
+            tc,
+            {"profile.json": profile_path},
+            zygote=language.mode == "zygote",
+        )
+        report = _report(result, verdict, tc, "sampling")
+        try:
+            with open(profile_path) as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            # Killed before it could write (wall limit), or the solution clobbered the file
+            report.update(samples=0, functions=[], lines=[])
+            return report
+
+    if raw.get("deterministic"):
+        return _deterministic_report(report, raw)
+    interval = raw["interval_ms"]
+    samples = max(1, raw["samples"])
+    functions = sorted(raw["functions"], key=lambda f: (-f[2], -f[3]))[:PROFILE_TOP]
+    lines = sorted(raw["lines"], key=lambda line: -line[2])[:PROFILE_TOP]
+    report.update(
+        interval_ms=interval,
+        samples=raw["samples"],
+        truncated=raw["truncated"],
+        functions=[
+            {
+                "function": name,
+                "line": first_line,
+                "self_ms": round(own * interval, 1),
+                "total_ms": round(total * interval, 1),
+                "self_pct": round(100 * own / samples, 1),
+            }
+            for name, first_line, own, total in functions
+        ],
+        lines=[
+            {"line": line, "function": name, "ms": round(count * interval, 1), "pct": round(100 * count / samples, 1)}
+            for line, name, count in lines
+        ],
+    )
+    if raw["samples"] < PROFILE_MIN_SAMPLES:
+        # The cProfile rerun did not work out, so these few samples are all there is
+        report["note"] = "too fast to sample"
+    return report
+
+
+def _deterministic_report(report: dict, raw: dict) -> dict:
+    """A run too fast to sample, timed call by call under cProfile instead"""
+    functions = sorted(raw["functions"], key=lambda f: (-f[2], -f[3]))[:PROFILE_TOP]
+    spent = sum(f[2] for f in raw["functions"]) or 1
+    report.update(
+        profiler="cprofile",
+        note="too fast to sample",
+        samples=raw["samples"],
+        truncated=False,
+        functions=[
+            {
+                "function": name,
+                "line": first_line,
+                "self_ms": round(own, 3),
+                "total_ms": round(total, 3),
+                "self_pct": round(100 * own / spent, 1),
+                "calls": calls,
+            }
+            for name, first_line, own, total, calls in functions
+        ],
+        lines=[],
+    )
+    return report
+
+
+def parse_flat_profile(text: str) -> list[dict]:
+    functions = []
+    for row in text.splitlines():
+        match = _FLAT_ROW.match(row)
+        if not match:
+            continue
+        pct, _, self_s, calls, _, _, name = match.groups()
+        # The per-call columns switch units (s, ms, us, Ts) with magnitude; only calls is kept
+        entry = {"function": name, "self_ms": round(float(self_s) * 1000, 1), "self_pct": float(pct)}
+        if calls is not None:
+            entry["calls"] = int(calls)
+        functions.append(entry)
+    return functions
+
+
+def _profile_cpp(code: str, language: Language, tc) -> dict:
+    with runner.Workspace(code, language) as workspace:
+        flush_path = os.path.join(workspace.path, "gmon_flush.cc")
+        with open(flush_path, "w") as f:
+            f.write(_GMON_FLUSH)
+        cmd = [*language.compile_cmd, "-pg", "gmon_flush.cc"]
+        compiled = sandbox.run(
+            cmd,
+            {language.source_file: workspace.source_path, "gmon_flush.cc": flush_path},
+            runner.COMPILE_LIMITS,
+            outputs={language.artifact: workspace.artifact_path},
+        )
+        if compiled.exit_code != 0 or not os.path.isfile(workspace.artifact_path):
+            return {"testcase_id": tc.id, "verdict": "compilation_error", "profiler": "gprof", "functions": [], "lines": []}
+
+        gmon_path = os.path.join(workspace.path, "gmon.out")
+        result, verdict = _run(
+            workspace,
+            language.run_cmd,
+            {language.artifact: workspace.artifact_path},
+            tc,
+            {"gmon.out": gmon_path},
+        )
+        report = _report(result, verdict, tc, "gprof")
+        # gprof's line-level mode (-l) is unreliable on -O2 builds, so C++ gets functions only
+        report["lines"] = []
+        if not os.path.isfile(gmon_path):
+            report["functions"] = []
+            return report
+        flat = sandbox.run(
+            ["gprof", "-b", "-p", language.artifact, "gmon.out"],
+            {language.artifact: workspace.artifact_path, "gmon.out": gmon_path},
+            runner.COMPILE_LIMITS,
+        )
+    report["functions"] = parse_flat_profile(flat.stdout)[:PROFILE_TOP]
+    return report
+
+
+def check_available(language_name: str) -> Language:
+    """The language, if this host can profile it; raises ProfileUnavailable otherwise"""
+    language = get_language(language_name)
+    if language is None or language.mode == "docker":
+        raise ProfileUnavailable("Profiling needs a natively judged language")
+    if language.name == "cpp" and shutil.which("gprof", path=sandbox.SANDBOX_PATH) is None:
+        raise ProfileUnavailable("gprof is not installed on the judge host")
+    if language.name not in ("python", "cpp"):
+        raise ProfileUnavailable(f"Profiling is not available for {language.name}")
+    return language
+
+
+def profile(code: str, language_name: str, tc) -> dict:
+    """Run ``code`` on one testcase under a profiler; verdict plus the top functions and lines.
+
+    Uses the normal judge limits, so profiling can never buy a solution
+    more CPU, memory or wall time than judging does.
+    """
+    language = check_available(language_name)
+    if language.name == "python":
+        return _profile_python(code, language, tc)
+    return _profile_cpp(code, language, tc)
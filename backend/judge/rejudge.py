@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from db import SessionLocal
+from models.rejudge_job import RejudgeJob
+from models.submission import Submission
+import cache
+import sources
+from judge import admission, complexity, dispatch, runner, scheduling
+
+load_dotenv()
+REJUDGE_BATCH_SIZE = int(os.getenv("REJUDGE_BATCH_SIZE", "200"))
+REJUDGE_PARALLELISM = int(os.getenv("REJUDGE_PARALLELISM", str(max(1, admission.JUDGE_MAX_CONCURRENCY // 2))))
+# Rejudge waits in the low lane for as long as live traffic keeps the slots busy
+_SLOT_TIMEOUT_SECONDS = 3600
+_PROGRESS_SECONDS = 2.0
+# A running job whose heartbeat is older than this is taken over by another process
+REJUDGE_STALE_SECONDS = int(os.getenv("REJUDGE_STALE_SECONDS", "60"))
+
+logger = logging.getLogger("algoengine.rejudge")
+
+
+def _filtered(query, filters: dict):
+    if filters.get("problem_id") is not None:
+        query = query.filter(Submission.problem_id == filters["problem_id"])
+    if filters.get("user_id") is not None:
+        query = query.filter(Submission.user_id == filters["user_id"])
+    if filters.get("from_id") is not None:
+        query = query.filter(Submission.id >= filters["from_id"])
+    if filters.get("to_id") is not None:
+        query = query.filter(Submission.id <= filters["to_id"])
+    # Rows still queued or being judged will see the new test data anyway
+    return query.filter(Submission.status.notin_(("pending", "judging")))
+
+
+def progress(job: RejudgeJob) -> dict:
+    data = {column.name: getattr(job, column.name) for column in RejudgeJob.__table__.columns}
+    data["filters"] = json.loads(job.filters)
+    elapsed = None
+    eta = None
+    if job.started_at is not None:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        if job.status == "running" and job.processed:
+            eta = round(elapsed / job.processed * (job.total - job.processed - job.skipped), 1)
+    data["elapsed_seconds"] = None if elapsed is None else round(elapsed, 1)
+    data["eta_seconds"] = eta
+    return data
+
+
+def start(db: Session, filters: dict, created_by: int) -> RejudgeJob:
+    """Create a job for the matching submissions and run it on a background thread"""
+    total = _filtered(db.query(Submission), filters).count()
+    job = RejudgeJob(created_by=created_by, filters=json.dumps(filters), status="queued", total=total)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    threading.Thread(target=_run, args=(job.id,), name=f"rejudge-{job.id}", daemon=True).start()
+    return job
+
+
+def cancel(db: Session, job_id: int) -> Optional[RejudgeJob]:
+    job = db.get(RejudgeJob, job_id)
+    if job is None:
+        return None
+    if job.status in ("queued", "running"):
+        job.cancel_requested = True
+        db.commit()
+    return job
+
+
+def _judge(submission, code: str, problem: dict, testcases, cancelled: threading.Event) -> Optional[runner.JudgeResult]:
+    if cancelled.is_set():
+        return None
+    while True:
+        try:
+            with admission.judge_slot(
+                owner=f"rejudge:{submission.problem_id}",
+                lane=admission.LANE_REJUDGE,
+                timeout=_SLOT_TIMEOUT_SECONDS,
+            ):
+                if cancelled.is_set():
+                    return None
+                return runner.judge(
+                    code,
+                    submission.language,
+                    testcases,
+                    scaling=complexity.ScalingFamily.from_problem(problem),
+                )
+        except admission.AdmissionRejected as exc:
+            # Shed while live traffic fills the queue: back off instead of failing the job
+            logger.info("rejudge slot shed for submission %s, retrying in %ss", submission.id, exc.retry_after)
+            if cancelled.wait(exc.retry_after):
+                return None
+
+
+def _claim(db: Session, job_id: int, runner_was: Optional[str], heartbeat_was: Optional[datetime]) -> bool:
+    """Take over the job if nobody has touched it since it was read"""
+    now = datetime.utcnow()
+    claimed = db.execute(
+        update(RejudgeJob)
+        .where(
+            RejudgeJob.id == job_id,
+            RejudgeJob.status.in_(("queued", "running")),
+            RejudgeJob.runner == runner_was,
+            RejudgeJob.heartbeat_at == heartbeat_was,
+        )
+        .values(status="running", runner=dispatch.lease_owner(), heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return claimed == 1
+
+
+def _run(job_id: int, runner_was: Optional[str] = None, heartbeat_was: Optional[datetime] = None) -> None:
+    db = SessionLocal()
+    owner = f"rejudge:{job_id}:{dispatch.lease_owner()}"
+    cancelled = threading.Event()
+    # Same source for the same problem and language gets the same verdict
+    verdicts: dict[tuple, runner.JudgeResult] = {}
+    job = None
+    try:
+        if not _claim(db, job_id, runner_was, heartbeat_was):
+            return
+        job = db.get(RejudgeJob, job_id)
+        if job.started_at is None:
+            job.started_at = datetime.utcnow()
+        db.commit()
+        filters = json.loads(job.filters)
+        columns = (Submission.id, Submission.problem_id, Submission.language, Submission.source_hash, Submission.status)
+
+        # A resumed job picks up after the last batch it fully recorded
+        last_id = job.resume_after
+        with ThreadPoolExecutor(max_workers=REJUDGE_PARALLELISM, thread_name_prefix=f"rejudge-{job_id}") as pool:
+            while not cancelled.is_set():
+                # Keyset pagination keeps each batch an index range scan
+                batch = (
+                    _filtered(db.query(*columns), filters)
+                    .filter(Submission.id > last_id)
+                    .order_by(Submission.id)
+                    .limit(REJUDGE_BATCH_SIZE)
+                    .all()
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                futures = {}
+                queued = set()
+                for row in batch:
+                    key = (row.problem_id, row.language, row.source_hash)
+                    if key in verdicts or key in queued:
+                        continue
+                    queued.add(key)
+                    problem = cache.get_problem(db, row.problem_id)
+                    testcases = cache.get_testcases(db, row.problem_id)
+                    if problem is None or not testcases:
+                        verdicts[key] = runner.JudgeResult(status="judge_error")
+                        continue
+                    testcases = scheduling.order(db, row.problem_id, testcases)
+                    code = sources.load(db, row.source_hash)
+                    futures[pool.submit(_judge, row, code, problem, testcases, cancelled)] = key
+
+                remaining = set(futures)
+                while remaining:
+                    done, remaining = wait(remaining, timeout=_PROGRESS_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = future.result()
+                        if result is not None:
+                            verdicts[futures[future]] = result
+                            job.judged += 1
+                            # Once per distinct run, however many rows share the verdict
+                            scheduling.observe(futures[future][0], result.cases)
+                    _beat(db, job, cancelled)
+
+                for row in batch:
+                    result = verdicts.get((row.problem_id, row.language, row.source_hash))
+                    if result is None:
+                        continue
+                    if dispatch.lease_finished(db, row.id, owner) and dispatch.record(
+                        db, row.id, owner, result, problem_id=row.problem_id, language=row.language
+                    ):
+                        job.processed += 1
+                        job.changed += result.status != row.status
+                    else:
+                        job.skipped += 1
+                job.resume_after = last_id
+                _beat(db, job, cancelled)
+
+        if job.runner != dispatch.lease_owner():
+            # Taken over after a missed heartbeat; the new runner finishes it
+            job = None
+            return
+        job.status = "cancelled" if cancelled.is_set() else "done"
+    except Exception as exc:
+        logger.exception("rejudge job %s failed", job_id)
+        db.rollback()
+        job = db.get(RejudgeJob, job_id)
+        job.status = "failed"
+        job.runner = None
+        job.error = str(exc)[:2000]
+    finally:
+        if job is not None:
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        db.close()
+
+
+def _beat(db: Session, job: RejudgeJob, cancelled: threading.Event) -> None:
+    db.refresh(job, ["cancel_requested", "runner"])
+    if job.cancel_requested or job.runner != dispatch.lease_owner():
+        cancelled.set()
+    else:
+        job.heartbeat_at = datetime.utcnow()
+    db.commit()
+
+
+def _runner_dead(runner_name: Optional[str]) -> bool:
+    """True when ``runner_name`` is a process on this host that no longer exists"""
+    if runner_name is None:
+        return False
+    host, _, pid = runner_name.rpartition(":")
+    if host != socket.gethostname():
+        return False
+    if int(pid) == os.getpid():
+        # Left by an earlier life of this process id (e.g. a restarted container)
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def recover() -> int:
+    """Resume jobs left queued or running by a process that died.
+
+    A job is taken over when its runner is a dead process on this host or
+    its heartbeat is older than REJUDGE_STALE_SECONDS; _claim makes sure only
+    one process resumes it. Returns how many jobs were resumed here.
+    """
+    db = SessionLocal()
+    try:
+        stale_before = datetime.utcnow() - timedelta(seconds=REJUDGE_STALE_SECONDS)
+        jobs = (
+            db.query(RejudgeJob.id, RejudgeJob.runner, RejudgeJob.heartbeat_at, RejudgeJob.created_at)
+            .filter(RejudgeJob.status.in_(("queued", "running")))
+            .order_by(RejudgeJob.id)
+            .all()
+        )
+    finally:
+        db.close()
+    resumed = 0
+    for job in jobs:
+        last_seen = job.heartbeat_at or job.created_at
+        if last_seen >= stale_before and not _runner_dead(job.runner):
+            continue
+        logger.warning("resuming rejudge job %s left by %s", job.id, job.runner or "a process that never started it")
+        threading.Thread(
+            target=_run, args=(job.id, job.runner, job.heartbeat_at), name=f"rejudge-{job.id}", daemon=True
+        ).start()
+        resumed += 1
+    return resumed
+
+
+def watch(stop: threading.Event) -> None:
+    """Run recover() at startup and every REJUDGE_STALE_SECONDS until ``stop`` is set"""
+    while True:
+        try:
+            recover()
+        except Exception:
+            logger.exception("rejudge recovery failed")
+        if stop.wait(REJUDGE_STALE_SECONDS):
+            return
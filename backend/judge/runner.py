@@ -0,0 +1,259 @@
+import logging
+import os
+import signal
+import tempfile
+from dataclasses import dataclass, field, replace
+from typing import Optional, Sequence
+from dotenv import load_dotenv
+from judge import complexity, sandbox, testdata, timeline
+from judge.languages import Language, get_language
+
+load_dotenv()
+DEFAULT_LIMITS = sandbox.Limits(
+    cpu_seconds=float(os.getenv("JUDGE_CPU_SECONDS", "2")),
+    wall_seconds=float(os.getenv("JUDGE_WALL_SECONDS", "6")),
+    memory_mb=int(os.getenv("JUDGE_MEMORY_MB", "256")),
+)
+# g++ forks cc1plus/as/ld and needs far more address space than a solution
+COMPILE_LIMITS = sandbox.Limits(cpu_seconds=30, wall_seconds=60, memory_mb=2048, file_size_mb=64, max_processes=512)
+
+logger = logging.getLogger("algoengine.judge")
+
+
+@dataclass
+class CaseResult:
+    testcase_id: int
+    verdict: str
+    wall_ms: float
+    cpu_ms: Optional[float] = None
+    max_rss_kb: Optional[int] = None
+
+
+@dataclass
+class JudgeResult:
+    status: str
+    cases: list[CaseResult] = field(default_factory=list)
+    compile_output: str = ""
+    complexity: Optional["complexity.ComplexityReport"] = None
+    timeline: Optional["timeline.Timeline"] = None
+
+
+def outputs_match(output: str, expected: str) -> bool:
+    return output.strip() == expected.strip()
+
+
+def _failure(result: sandbox.RunResult, limits: sandbox.Limits) -> Optional[str]:
+    """Verdict for a run that did not finish cleanly, None if it did"""
+    # CPU time is the limit that counts; the wall clock only catches sleepers
+    over_cpu = result.cpu_ms is not None and result.cpu_ms > limits.cpu_seconds * 1000
+    if result.timed_out or over_cpu or result.signal == signal.SIGXCPU:
+        return "time_limit_exceeded"
+    if result.signal == signal.SIGXFSZ:
+        return "output_limit_exceeded"
+    if result.exit_code != 0:
+        if "MemoryError" in result.stderr or "std::bad_alloc" in result.stderr:
+            return "memory_limit_exceeded"
+        return "runtime_error"
+    return None
+
+
+def verdict_for(result: sandbox.RunResult, expected: str, limits: sandbox.Limits) -> str:
+    """Verdict of one native run against ``expected`` output"""
+    failure = _failure(result, limits)
+    if failure is not None:
+        return failure
+    return "passed" if outputs_match(result.stdout, expected) else "wrong_answer"
+
+
+def docker_compile_failed(result: sandbox.RunResult) -> bool:
+    """True when a runner image reported that the source did not compile"""
+    return result.stdout.startswith("COMPILATION_ERROR")
+
+
+def docker_verdict_for(result: sandbox.RunResult, expected: str) -> str:
+    """Verdict of one runner-image run against ``expected`` output"""
+    if docker_compile_failed(result):
+        return "compilation_error"
+    if result.timed_out:
+        return "time_limit_exceeded"
+    if result.exit_code != 0:
+        return "runtime_error"
+    return "passed" if outputs_match(result.stdout, expected) else "wrong_answer"
+
+
+def _finish(cases: list[CaseResult]) -> JudgeResult:
+    status = "passed" if cases and all(c.verdict == "passed" for c in cases) else "failed"
+    return JudgeResult(status=status, cases=cases)
+
+
+def _judge_docker(
+    code: str, language: Language, testcases: Sequence, limits: sandbox.Limits, timing: timeline.Timeline
+) -> JudgeResult:
+    cases = []
+    for tc in testcases:
+        input_data = tc.input_data
+        if tc.kind == "generator":
+            data = testdata.materialize(tc)
+            with open(data.input_path) as f:
+                input_data = f.read()
+            if data.expected_path:
+                with open(data.expected_path) as f:
+                    tc = replace(tc, expected_output=f.read())
+        with timing.span(timeline.RUN, tc.id):
+            result = sandbox.run_docker(language.docker_image, code, input_data, limits)
+        with timing.span(timeline.COMPARE, tc.id):
+            verdict = docker_verdict_for(result, tc.expected_output)
+        if verdict == "compilation_error":
+            return JudgeResult(status="compilation_error", compile_output=result.stderr)
+        cases.append(CaseResult(tc.id, verdict, result.wall_ms))
+        if verdict != "passed":
+            break
+    return _finish(cases)
+
+
+class Workspace:
+    """Temporary directory holding one submission's source and build artifact"""
+
+    def __init__(self, code: str, language: Language):
+        self.language = language
+        self._tmp = tempfile.TemporaryDirectory(prefix="algoengine-ws-")
+        self.path = self._tmp.name
+        self.source_path = os.path.join(self.path, language.source_file)
+        self.artifact_path = os.path.join(self.path, language.artifact)
+        with open(self.source_path, "w") as f:
+            f.write(code)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._tmp.cleanup()
+
+    def compile(self) -> Optional[str]:
+        """Build the artifact; returns compiler output on failure, None on success"""
+        if not self.language.compile_cmd:
+            return None
+        compiled = sandbox.run(
+            self.language.compile_cmd,
+            {self.language.source_file: self.source_path},
+            COMPILE_LIMITS,
+            outputs={self.language.artifact: self.artifact_path},
+        )
+        if compiled.exit_code != 0 or not os.path.isfile(self.artifact_path):
+            return compiled.stderr
+        return None
+
+    def run(
+        self,
+        limits: sandbox.Limits,
+        input_data: bytes = b"",
+        input_path: Optional[str] = None,
+        stdout_path: Optional[str] = None,
+    ) -> sandbox.RunResult:
+        return sandbox.run(
+            self.language.run_cmd,
+            {self.language.artifact: self.artifact_path},
+            limits,
+            input_data=input_data,
+            input_path=input_path,
+            stdout_path=stdout_path,
+            zygote=self.language.mode == "zygote",
+        )
+
+
+def _run_case(workspace: Workspace, tc, limits: sandbox.Limits, timing: timeline.Timeline) -> CaseResult:
+    if tc.kind != "generator":
+        with timing.span(timeline.RUN, tc.id):
+            result = workspace.run(limits, tc.input_data.encode())
+        with timing.span(timeline.COMPARE, tc.id):
+            verdict = verdict_for(result, tc.expected_output, limits)
+        return CaseResult(tc.id, verdict, result.wall_ms, result.cpu_ms, result.max_rss_kb)
+
+    # Generated data is streamed from the disk cache and compared as files
+    data = testdata.materialize(tc)
+    actual_path = os.path.join(workspace.path, "actual.out")
+    with timing.span(timeline.RUN, tc.id):
+        result = workspace.run(limits, input_path=data.input_path, stdout_path=actual_path)
+    with timing.span(timeline.COMPARE, tc.id):
+        verdict = compare_files(result, limits, actual_path, data, tc)
+    return CaseResult(tc.id, verdict, result.wall_ms, result.cpu_ms, result.max_rss_kb)
+
+
+def compare_files(result: sandbox.RunResult, limits: sandbox.Limits, actual_path: str, data, tc) -> str:
+    """Verdict of a run on generated data, its output written to ``actual_path``"""
+    verdict = _failure(result, limits)
+    if verdict is None:
+        with open(actual_path, "rb") as f:
+            actual = f.read()
+        if data.expected_path:
+            with open(data.expected_path, "rb") as f:
+                expected = f.read()
+        else:
+            expected = (tc.expected_output or "").encode()
+        verdict = "passed" if actual.strip() == expected.strip() else "wrong_answer"
+    return verdict
+
+
+def _judge_native(
+    code: str, language: Language, testcases: Sequence, limits: sandbox.Limits, scaling, timing: timeline.Timeline
+) -> JudgeResult:
+    with Workspace(code, language) as workspace:
+        compile_error = None
+        if language.compile_cmd:
+            with timing.span(timeline.COMPILE):
+                compile_error = workspace.compile()
+        if compile_error is not None:
+            return JudgeResult(status="compilation_error", compile_output=compile_error)
+
+        cases = []
+        for tc in testcases:
+            case = _run_case(workspace, tc, limits, timing)
+            cases.append(case)
+            if case.verdict != "passed":
+                break
+        outcome = _finish(cases)
+
+        # Growth is only meaningful for solutions that are already correct
+        if outcome.status == "passed" and scaling is not None:
+            with timing.span(timeline.COMPLEXITY):
+                outcome.complexity = complexity.measure(workspace, scaling, limits)
+            if outcome.complexity.exceeded and scaling.enforce:
+                outcome.status = "complexity_exceeded"
+        return outcome
+
+
+def judge(
+    code: str,
+    language_name: str,
+    testcases: Sequence,
+    limits: sandbox.Limits = DEFAULT_LIMITS,
+    scaling: Optional[complexity.ScalingFamily] = None,
+    timing: Optional[timeline.Timeline] = None,
+) -> JudgeResult:
+    """Run ``code`` against ``testcases`` in order, stopping at the first failure.
+
+    With a ``scaling`` family, passing native-mode solutions are also timed on
+    generated inputs of growing size to estimate their complexity class.
+    Stage spans are added to ``timing`` (a new one if not given), which is
+    returned as the result's ``timeline``.
+    """
+    timing = timing or timeline.Timeline()
+    language = get_language(language_name)
+    if language is None:
+        result = JudgeResult(status="unsupported_language")
+    else:
+        try:
+            if language.mode == "docker":
+                result = _judge_docker(code, language, testcases, limits, timing)
+            else:
+                result = _judge_native(code, language, testcases, limits, scaling, timing)
+        except testdata.TestDataError as exc:
+            # A broken generator is the problem author's fault, not the submitter's
+            logger.error("test data unavailable: %s", exc)
+            result = JudgeResult(status="judge_error")
+        except sandbox.SandboxError as exc:
+            # Never retried without isolation; the host has to be fixed
+            logger.error("sandbox unavailable: %s", exc)
+            result = JudgeResult(status="judge_error")
+    result.timeline = timing
+    return result
@@ -0,0 +1,65 @@
+import os
+from dataclasses import dataclass
+from typing import Optional, Sequence
+from dotenv import load_dotenv
+from judge import runner, sandbox
+from judge.languages import Language, get_language
+
+load_dotenv()
+RUN_MAX_INPUTS = int(os.getenv("RUN_MAX_INPUTS", "5"))
+RUN_MAX_INPUT_BYTES = int(os.getenv("RUN_MAX_INPUT_BYTES", str(256 * 1024)))
+RUN_MAX_SAMPLES = int(os.getenv("RUN_MAX_SAMPLES", "5"))
+RUN_OUTPUT_CHARS = int(os.getenv("RUN_OUTPUT_CHARS", "8192"))
+
+
+@dataclass(frozen=True)
+class RunInput:
+    input_data: str
+    expected_output: Optional[str] = None   # None for custom input: nothing to compare against
+    testcase_id: Optional[int] = None
+
+
+def _case(result: sandbox.RunResult, item: RunInput, limits: sandbox.Limits, language: Language) -> dict:
+    if language.mode == "docker":
+        verdict = runner.docker_verdict_for(result, item.expected_output or "")
+    else:
+        verdict = runner.verdict_for(result, item.expected_output or "", limits)
+    if item.expected_output is None and verdict in ("passed", "wrong_answer"):
+        verdict = "ok"
+    return {
+        "testcase_id": item.testcase_id,
+        "verdict": verdict,
+        "stdout": result.stdout[:RUN_OUTPUT_CHARS],
+        "stderr": result.stderr[-RUN_OUTPUT_CHARS:],
+        "truncated": len(result.stdout) > RUN_OUTPUT_CHARS,
+        "cpu_ms": result.cpu_ms,
+        "wall_ms": result.wall_ms,
+        "max_rss_kb": result.max_rss_kb,
+    }
+
+
+def run(code: str, language_name: str, inputs: Sequence[RunInput], limits: sandbox.Limits = runner.DEFAULT_LIMITS) -> dict:
+    """Compile once and run ``code`` on every input; nothing is judged or stored.
+
+    Unlike runner.judge every input is run, not just up to the first failure,
+    so the caller sees all outputs.
+    """
+    language = get_language(language_name)
+    if language is None:
+        return {"status": "unsupported_language", "cases": []}
+
+    if language.mode == "docker":
+        cases = []
+        for item in inputs:
+            result = sandbox.run_docker(language.docker_image, code, item.input_data, limits)
+            if runner.docker_compile_failed(result):
+                return {"status": "compilation_error", "compile_output": result.stderr, "cases": []}
+            cases.append(_case(result, item, limits, language))
+        return {"status": "finished", "cases": cases}
+
+    with runner.Workspace(code, language) as workspace:
+        compile_error = workspace.compile()
+        if compile_error is not None:
+            return {"status": "compilation_error", "compile_output": compile_error, "cases": []}
+        cases = [_case(workspace.run(limits, item.input_data.encode()), item, limits, language) for item in inputs]
+    return {"status": "finished", "cases": cases}
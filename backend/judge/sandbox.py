@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+# Native runs need user/mount/network namespaces and fail with SandboxError
+# where the kernel refuses them. "unsafe-off" runs without any isolation
+# beyond rlimits; only for trusted code on a development machine.
+SANDBOX_NAMESPACES = os.getenv("SANDBOX_NAMESPACES", "required").lower() != "unsafe-off"
+# Solutions run as this user when the judge itself runs as root
+SANDBOX_UID = int(os.getenv("SANDBOX_UID", "65534"))
+SANDBOX_GID = int(os.getenv("SANDBOX_GID", "65534"))
+SANDBOX_PATH = "/usr/local/bin:/usr/bin:/bin"
+MAX_CAPTURE_BYTES = 1024 * 1024
+
+_SPAWNER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "spawner.py")
+
+logger = logging.getLogger("algoengine.judge")
+if not SANDBOX_NAMESPACES:
+    logger.warning("SANDBOX_NAMESPACES=unsafe-off: submissions run without namespace isolation")
+
+
+class SandboxError(RuntimeError):
+    """The sandbox could not run the command safely; nothing was executed"""
+
+
+@dataclass(frozen=True)
+class Limits:
+    cpu_seconds: float = 2.0
+    wall_seconds: float = 6.0
+    memory_mb: int = 256
+    file_size_mb: int = 16
+    max_processes: int = 1
+    nice: int = 0
+
+
+@dataclass
+class RunResult:
+    exit_code: Optional[int]
+    signal: Optional[int]
+    timed_out: bool
+    stdout: str
+    stderr: str
+    wall_ms: float
+    cpu_ms: Optional[float] = None
+    max_rss_kb: Optional[int] = None
+
+
+class _Spawner:
+    """Handle to one fork-server process (see judge/spawner.py).
+
+    A zygote spawner runs under the sandbox's own ``python3`` with the same
+    environment a solution gets, so the interpreter it forks solutions from
+    matches what ``python3 solution.py`` would have started.
+    """
+
+    def __init__(self, zygote: bool = False):
+        if zygote:
+            cmd = [shutil.which("python3", path=SANDBOX_PATH) or "python3", "-u", _SPAWNER_PATH, "--zygote"]
+            env = {"PATH": SANDBOX_PATH, "LANG": "C.UTF-8", "PYTHONDONTWRITEBYTECODE": "1", "PYTHONHASHSEED": "0"}
+        else:
+            cmd = [sys.executable, "-S", "-u", _SPAWNER_PATH]
+            env = None
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, env=env)
+
+    def request(self, payload: dict) -> dict:
+        self.proc.stdin.write(json.dumps(payload) + "\n")
+        self.proc.stdin.flush()
+        line = self.proc.stdout.readline()
+        if not line:
+            raise RuntimeError("sandbox spawner exited")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise SandboxError(reply["error"])
+        return reply
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def close(self):
+        self.proc.kill()
+        self.proc.wait()
+
+
+_idle_spawners: dict[bool, "queue.LifoQueue[_Spawner]"] = {False: queue.LifoQueue(), True: queue.LifoQueue()}
+
+
+def spawner_request(payload: dict) -> dict:
+    """Send one request to an idle spawner, starting a new one if none is free"""
+    idle = _idle_spawners[payload.get("kind") == "zygote"]
+    try:
+        spawner = idle.get_nowait()
+    except queue.Empty:
+        spawner = _Spawner(zygote=payload.get("kind") == "zygote")
+    try:
+        reply = spawner.request(payload)
+    except Exception:
+        spawner.close()
+        raise
+    if spawner.alive():
+        idle.put(spawner)
+    return reply
+
+
+def _read_capped(path: str) -> str:
+    with open(path, "rb") as f:
+        return f.read(MAX_CAPTURE_BYTES).decode(errors="replace")
+
+
+def run(
+    cmd: list[str],
+    files: dict[str, str],
+    limits: Limits = Limits(),
+    input_data: bytes = b"",
+    input_path: Optional[str] = None,
+    outputs: Optional[dict[str, str]] = None,
+    stdout_path: Optional[str] = None,
+    zygote: bool = False,
+) -> RunResult:
+    """Run ``cmd`` natively under rlimits in a private, throwaway directory.
+
+    ``files`` maps names inside the sandbox to host paths; they are hard-linked
+    (or copied) in so each run starts from a clean directory. ``outputs`` maps
+    names the command produces to host paths they are moved to afterwards.
+    When ``stdout_path`` is given, stdout goes there in full instead of being
+    captured into the result. With ``zygote``, ``cmd`` must be a ``python3``
+    command line and is served by a fork of a pre-warmed interpreter instead.
+    """
+    run_dir = tempfile.mkdtemp(prefix="algoengine-run-")
+    box = os.path.join(run_dir, "box")
+    os.mkdir(box, 0o700)
+    os.mkdir(os.path.join(run_dir, "root"), 0o700)   # mount point of the box's minimal root
+    try:
+        for name, source in files.items():
+            target = os.path.join(box, name)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+        if input_path is None:
+            input_path = os.path.join(run_dir, "stdin")
+            with open(input_path, "wb") as f:
+                f.write(input_data)
+        capture_stdout = stdout_path is None
+        if capture_stdout:
+            stdout_path = os.path.join(run_dir, "stdout")
+        stderr_path = os.path.join(run_dir, "stderr")
+        # Inside the namespaces the box is mounted at /tmp and its host path does not exist
+        home = "/tmp" if SANDBOX_NAMESPACES else box
+        env = {"PATH": SANDBOX_PATH, "HOME": home, "TMPDIR": home, "LANG": "C.UTF-8", "PYTHONDONTWRITEBYTECODE": "1",
+               "PYTHONHASHSEED": "0"}
+
+        reply = spawner_request({
+            "kind": "zygote" if zygote else "exec",
+            "cmd": cmd,
+            "env": env,
+            "box": box,
+            "root": os.path.join(run_dir, "root"),
+            "uid": SANDBOX_UID,
+            "gid": SANDBOX_GID,
+            "stdin": input_path,
+            "stdout": stdout_path,
+            "stderr": stderr_path,
+            "namespaces": SANDBOX_NAMESPACES,
+            "limits": asdict(limits),
+        })
+        for name, target in (outputs or {}).items():
+            produced = os.path.join(box, name)
+            if os.path.isfile(produced):
+                shutil.move(produced, target)
+
+        return RunResult(
+            exit_code=reply["exit_code"],
+            signal=reply["signal"],
+            timed_out=reply["timed_out"],
+            stdout=_read_capped(stdout_path) if capture_stdout else "",
+            stderr=_read_capped(stderr_path),
+            wall_ms=reply["wall_ms"],
+            cpu_ms=reply["cpu_ms"],
+            max_rss_kb=reply["max_rss_kb"],
+        )
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def run_docker(image: str, source: str, input_data: str, limits: Limits = Limits()) -> RunResult:
+    """Run source through one of the runners/ images.
+
+    Both go in on stdin as ``<source bytes>\n<source><input>`` (see the images'
+    run.sh), so input size is not bounded by the kernel's argv limit.
+    """
+    code = source.encode()
+    cmd = [
+        "docker", "run", "--rm", "-i",
+        "--network", "none",
+        f"--memory={limits.memory_mb}m",
+        "--cpus=0.5",
+        "--pids-limit=64",
+        image,
+    ]
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            cmd,
+            input=b"%d\n" % len(code) + code + input_data.encode(),
+            capture_output=True,
+            timeout=limits.wall_seconds + 30,
+        )
+    except subprocess.TimeoutExpired as exc:
+        return RunResult(None, None, True, (exc.stdout or b"").decode(errors="replace"), "", (time.perf_counter() - started) * 1000)
+    except OSError as exc:
+        # docker missing or not runnable: nothing was executed
+        raise SandboxError(f"docker run failed: {exc}") from exc
+    return RunResult(
+        exit_code=proc.returncode,
+        signal=None,
+        # run.sh wraps the solution in coreutils timeout, which exits with 124
+        timed_out=proc.returncode == 124,
+        stdout=proc.stdout[:MAX_CAPTURE_BYTES].decode(errors="replace"),
+        stderr=proc.stderr[:MAX_CAPTURE_BYTES].decode(errors="replace"),
+        wall_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
@@ -0,0 +1,115 @@
+"""Testcase order for fail-fast judging.
+
+The judge stops at the first failing case, so a wrong answer costs the time
+of every case run before it. With per-case fail probability p and runtime t,
+running cases by descending p / t minimises the expected time to the first
+failure. Both are estimated from testcase_stats, smoothed towards a prior so
+new or rarely reached cases are neither starved nor trusted on one run.
+Samples always go first: they are the cheapest, most often failed checks and
+users expect their verdict to mention them. Accepted submissions run every
+case either way.
+"""
+import logging
+import os
+from typing import Sequence
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from db import SessionLocal
+from models.testcase_stats import TestCaseStats
+import cache
+
+load_dotenv()
+# "failure" orders by statistics; "id" keeps the historical primary-key order
+TESTCASE_ORDER = os.getenv("TESTCASE_ORDER", "failure").lower()
+
+# Beta-style prior: PRIOR_RUNS pseudo-runs failing at PRIOR_FAIL_RATE, lasting PRIOR_MS
+PRIOR_RUNS = 10
+PRIOR_FAIL_RATE = 0.1
+PRIOR_MS = 50.0
+
+order_cache = cache.TTLCache()
+
+logger = logging.getLogger("algoengine.scheduling")
+
+
+def priority(runs: int = 0, failures: int = 0, total_ms: float = 0) -> float:
+    """Smoothed fail probability per millisecond of runtime"""
+    fail_rate = (failures + PRIOR_FAIL_RATE * PRIOR_RUNS) / (runs + PRIOR_RUNS)
+    mean_ms = (total_ms + PRIOR_MS) / (runs + 1)
+    return fail_rate / max(mean_ms, 1.0)
+
+
+def rank(testcases: Sequence, stats: dict[int, tuple[int, int, float]]) -> list:
+    """Samples in id order, then the rest by descending priority (ties keep id order)"""
+    samples = [tc for tc in testcases if tc.is_sample]
+    rest = [tc for tc in testcases if not tc.is_sample]
+    rest.sort(key=lambda tc: -priority(*stats.get(tc.id, ())))
+    return samples + rest
+
+
+def order(db: Session, problem_id: int, testcases: Sequence) -> list:
+    """``testcases`` in judging order; the order is cached per problem for one TTL"""
+    if TESTCASE_ORDER == "id":
+        return list(testcases)
+    by_id = {tc.id: tc for tc in testcases}
+    ids = order_cache.get(problem_id)
+    if ids is None or len(ids) != len(by_id) or not all(i in by_id for i in ids):
+        stats = {
+            row.testcase_id: (row.runs, row.failures, row.total_ms)
+            for row in db.query(TestCaseStats).filter(TestCaseStats.problem_id == problem_id)
+        }
+        ids = [tc.id for tc in rank(testcases, stats)]
+        order_cache.set(problem_id, ids)
+    return [by_id[i] for i in ids]
+
+
+def observe(problem_id: int, cases: Sequence) -> None:
+    """Add one judge run's per-case outcomes to the statistics.
+
+    Runs in a transaction of its own: the statistics only steer the order, so
+    a failed write is logged and dropped, never raised into the verdict path.
+    Rows are written in testcase_id order, so concurrent judges of the same
+    problem lock them in the same order and cannot deadlock.
+    """
+    if not cases:
+        return
+    cases = sorted(cases, key=lambda case: case.testcase_id)
+    table = TestCaseStats.__table__
+    db = SessionLocal()
+    try:
+        db.execute(
+            insert(table)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite"),
+            [
+                {"testcase_id": case.testcase_id, "problem_id": problem_id, "runs": 0, "failures": 0, "timeouts": 0, "total_ms": 0}
+                for case in cases
+            ],
+        )
+        # Relative increments, so concurrent judges never lose each other's counts
+        db.execute(
+            update(table)
+            .where(table.c.testcase_id == bindparam("case_id"))
+            .values(
+                runs=table.c.runs + 1,
+                failures=table.c.failures + bindparam("failed"),
+                timeouts=table.c.timeouts + bindparam("timed_out"),
+                total_ms=table.c.total_ms + bindparam("ms"),
+            ),
+            [
+                {
+                    "case_id": case.testcase_id,
+                    "failed": int(case.verdict != "passed"),
+                    "timed_out": int(case.verdict == "time_limit_exceeded"),
+                    "ms": round(case.cpu_ms if case.cpu_ms is not None else case.wall_ms),
+                }
+                for case in cases
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("could not update testcase statistics for problem %s", problem_id)
+    finally:
+        db.close()
@@ -0,0 +1,358 @@
+"""Small fork server used by the native sandbox.
+
+The API process is large, and ``ru_maxrss`` of an exec'd child includes the
+resident size of the address space it was forked from. Forking from this
+small, stdlib-only process keeps the per-testcase peak-memory figure honest.
+
+With ``--zygote`` it also serves Python solutions without an exec: common
+modules are imported once, and each request forks a child that runs the
+script in a fresh ``__main__``, skipping interpreter start-up per testcase.
+
+Protocol: one JSON request per line on stdin, one JSON reply per line on
+stdout. Run with ``python3 -S spawner.py`` or ``python3 spawner.py --zygote``.
+"""
+import ctypes
+import ctypes.util
+import gc
+import io
+import json
+import os
+import resource
+import runpy
+import select
+import signal
+import sys
+import time
+import traceback
+import types
+
+_CLONE_NEWNS = 0x00020000
+_CLONE_NEWUSER = 0x10000000
+_CLONE_NEWNET = 0x40000000
+_MS_RDONLY = 1
+_MS_NOSUID = 2
+_MS_NODEV = 4
+_MS_NOEXEC = 8
+_MS_REMOUNT = 32
+_MS_NOATIME = 1024
+_MS_NODIRATIME = 2048
+_MS_BIND = 4096
+_MS_REC = 16384
+_MS_PRIVATE = 1 << 18
+_MS_RELATIME = 1 << 21
+# statvfs f_flag bit -> mount flag a read-only remount must keep (the kernel locks them)
+_LOCKED_FLAGS = {2: _MS_NOSUID, 4: _MS_NODEV, 8: _MS_NOEXEC, 1024: _MS_NOATIME, 2048: _MS_NODIRATIME, 4096: _MS_RELATIME}
+_PR_SET_DUMPABLE = 4
+_PR_SET_NO_NEW_PRIVS = 38
+_CAP_VERSION_3 = 0x20080522
+
+# Host directories the solution sees, read-only; everything else (the
+# application, its .env, /proc, /home) is absent from its root
+ROOT_DIRS = ("/usr", "/bin", "/sbin", "/lib", "/lib32", "/lib64", "/libx32", "/etc")
+ROOT_DEVICES = ("null", "zero", "random", "urandom")
+
+_libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+
+class SandboxSetupError(Exception):
+    """The box could not be isolated; the command must not run"""
+
+
+class _CapHeader(ctypes.Structure):
+    _fields_ = [("version", ctypes.c_uint32), ("pid", ctypes.c_int)]
+
+
+class _CapData(ctypes.Structure):
+    _fields_ = [("effective", ctypes.c_uint32), ("permitted", ctypes.c_uint32), ("inheritable", ctypes.c_uint32)]
+
+
+def _check(result, what):
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise SandboxSetupError(f"{what}: {os.strerror(errno)}")
+
+
+def _mount(source, target, fstype, flags, data=None):
+    _check(
+        _libc.mount(source and source.encode(), target.encode(), fstype and fstype.encode(), flags, data),
+        f"mount {source or fstype} on {target}",
+    )
+
+
+def _bind_read_only(source, target):
+    _mount(source, target, None, _MS_BIND | _MS_REC)
+    host_flags = os.statvfs(target).f_flag
+    keep = 0
+    for bit, flag in _LOCKED_FLAGS.items():
+        if host_flags & bit:
+            keep |= flag
+    _mount(None, target, None, _MS_BIND | _MS_REMOUNT | _MS_RDONLY | keep)
+
+
+def _write_id_map(path, inside, outside):
+    with open(path, "w") as f:
+        f.write(f"{inside} {outside} 1")
+
+
+def drop_privileges(request):
+    """As root, hand the box to the unprivileged sandbox user and become it"""
+    if os.geteuid() != 0:
+        return
+    uid, gid = request["uid"], request["gid"]
+    os.chmod(os.path.dirname(request["box"]), 0o711)
+    os.chown(request["box"], uid, gid)
+    os.setgroups([])
+    os.setresgid(gid, gid, gid)
+    os.setresuid(uid, uid, uid)
+    # setuid cleared it, which would leave /proc/self/*_map owned by root
+    _libc.prctl(_PR_SET_DUMPABLE, 1, 0, 0, 0)
+
+
+def enter_namespaces(box, root):
+    """Detach into fresh user/mount/net namespaces and chroot into a minimal root.
+
+    The new root is a read-only tmpfs holding read-only binds of ROOT_DIRS,
+    a few device nodes and the box, the only writable place, at /tmp. There
+    is no network. Raises SandboxSetupError if any step fails.
+    """
+    uid, gid = os.getuid(), os.getgid()
+    _check(_libc.unshare(_CLONE_NEWUSER | _CLONE_NEWNS | _CLONE_NEWNET), "unshare")
+    try:
+        with open("/proc/self/setgroups", "w") as f:
+            f.write("deny")
+        # Map to the same (never root) ids so the namespace grants no host access
+        _write_id_map("/proc/self/uid_map", uid, uid)
+        _write_id_map("/proc/self/gid_map", gid, gid)
+    except OSError as exc:
+        raise SandboxSetupError(f"id map: {exc}")
+    _mount(None, "/", None, _MS_REC | _MS_PRIVATE)
+    _mount("tmpfs", root, "tmpfs", _MS_NOSUID | _MS_NODEV, b"size=64k,mode=755")
+    for path in ROOT_DIRS:
+        target = root + path
+        if os.path.islink(path):
+            os.symlink(os.readlink(path), target)
+        elif os.path.isdir(path):
+            os.mkdir(target)
+            _bind_read_only(path, target)
+    os.mkdir(root + "/dev")
+    for name in ROOT_DEVICES:
+        target = f"{root}/dev/{name}"
+        open(target, "w").close()
+        _mount(f"/dev/{name}", target, None, _MS_BIND)
+    os.mkdir(root + "/tmp")
+    _mount(box, root + "/tmp", None, _MS_BIND | _MS_REC)
+    _mount(None, root, None, _MS_REMOUNT | _MS_RDONLY | _MS_NOSUID | _MS_NODEV)
+    os.chroot(root)
+    os.chdir("/tmp")
+
+
+def drop_capabilities():
+    """Clear the capabilities the new user namespace granted; a zygote child never execs to lose them"""
+    header = _CapHeader(_CAP_VERSION_3, 0)
+    data = (_CapData * 2)()
+    _check(_libc.capset(ctypes.byref(header), data), "capset")
+    _check(_libc.prctl(_PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0), "no_new_privs")
+
+
+def apply_limits(limits):
+    if limits.get("nice"):
+        os.nice(limits["nice"])
+    cpu = max(1, int(limits["cpu_seconds"] + 0.999))
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    memory = limits["memory_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    fsize = limits["file_size_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+    resource.setrlimit(resource.RLIMIT_NPROC, (limits["max_processes"], limits["max_processes"]))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def enter_box(request):
+    """Child-side setup shared by every request kind; raises if the box cannot be entered"""
+    os.setsid()
+    for fd, path, flags in (
+        (0, request["stdin"], os.O_RDONLY),
+        (1, request["stdout"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+        (2, request["stderr"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC),
+    ):
+        opened = os.open(path, flags, 0o600)
+        os.dup2(opened, fd)
+        os.close(opened)
+    drop_privileges(request)
+    os.chdir(request["box"])
+    if request["namespaces"]:
+        enter_namespaces(request["box"], request["root"])
+        drop_capabilities()
+    apply_limits(request["limits"])
+
+
+def wait_child(pid, wall_seconds):
+    """Reap ``pid`` with wait4, killing its process group at the wall limit"""
+    timed_out = False
+    deadline = time.monotonic() + wall_seconds
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        pidfd = None
+    try:
+        while True:
+            reaped, status, rusage = os.wait4(pid, os.WNOHANG)
+            if reaped:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and not timed_out:
+                timed_out = True
+                try:
+                    os.killpg(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                remaining = 1.0
+            if pidfd is not None:
+                select.select([pidfd], [], [], max(remaining, 0))
+            else:
+                time.sleep(min(0.005, max(remaining, 0)))
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+    return status, rusage, timed_out
+
+
+def reply_for(status, rusage, timed_out, started):
+    return {
+        "exit_code": os.WEXITSTATUS(status) if os.WIFEXITED(status) else None,
+        "signal": os.WTERMSIG(status) if os.WIFSIGNALED(status) else None,
+        "timed_out": timed_out,
+        "wall_ms": round((time.perf_counter() - started) * 1000, 3),
+        "cpu_ms": round((rusage.ru_utime + rusage.ru_stime) * 1000, 3),
+        "max_rss_kb": rusage.ru_maxrss,
+    }
+
+
+def _setup_failed(errors, exc):
+    """Child side: report why the box could not be entered, then die without running anything"""
+    os.write(errors, f"{type(exc).__name__}: {exc}".encode()[:512])
+    os._exit(127)
+
+
+def _collect(pid, errors, request, started):
+    status, rusage, timed_out = wait_child(pid, request["limits"]["wall_seconds"])
+    with os.fdopen(errors, "rb") as f:
+        setup_error = f.read().decode(errors="replace")
+    if setup_error:
+        return {"error": f"sandbox setup failed: {setup_error}"}
+    return reply_for(status, rusage, timed_out, started)
+
+
+def handle_exec(request):
+    started = time.perf_counter()
+    # Setup failures come back through a pipe: an exit code could be the command's own
+    errors_read, errors = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(errors_read)
+        try:
+            enter_box(request)
+        except BaseException as exc:
+            _setup_failed(errors, exc)
+        try:
+            # The pipe is close-on-exec, so a successful exec reports nothing
+            os.execvpe(request["cmd"][0], request["cmd"], request["env"])
+        except BaseException as exc:
+            os.write(2, f"sandbox: {exc}\n".encode())
+        os._exit(127)
+    os.close(errors)
+    return _collect(pid, errors_read, request, started)
+
+
+# Stateless modules only: anything seeded at import (e.g. random) would hand
+# every child the same state.
+ZYGOTE_PRELOAD = ("collections", "heapq", "bisect", "itertools", "math", "functools", "operator", "string", "re", "typing")
+
+
+def _fresh_stream(fd, mode):
+    raw = io.FileIO(fd, mode, closefd=False)
+    if mode == "r":
+        return io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8")
+    return io.TextIOWrapper(io.BufferedWriter(raw), encoding="utf-8", errors="backslashreplace")
+
+
+def run_script(argv, env):
+    """Run ``argv[0]`` as ``__main__`` the way ``python3 argv...`` would; returns the exit code"""
+    os.environ.clear()
+    os.environ.update(env)
+    sys.argv = list(argv)
+    sys.path[0] = os.getcwd()
+    sys.stdin = sys.__stdin__ = _fresh_stream(0, "r")
+    sys.stdout = sys.__stdout__ = _fresh_stream(1, "w")
+    sys.stderr = sys.__stderr__ = _fresh_stream(2, "w")
+    main = sys.modules["__main__"] = types.ModuleType("__main__")
+    code = 0
+    try:
+        if argv[0] == "-c":
+            sys.argv = ["-c", *argv[2:]]
+            exec(compile(argv[1], "<string>", "exec"), main.__dict__)
+        else:
+            runpy.run_path(os.path.abspath(argv[0]), run_name="__main__")
+    except SystemExit as exc:
+        if exc.code is None:
+            code = 0
+        elif isinstance(exc.code, int):
+            code = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    try:
+        sys.stdout.flush()
+    except BaseException:
+        traceback.print_exc()
+        code = code or 1
+    sys.stderr.flush()
+    return code
+
+
+def handle_zygote(request):
+    started = time.perf_counter()
+    errors_read, errors = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(errors_read)
+        try:
+            enter_box(request)
+        except BaseException as exc:
+            _setup_failed(errors, exc)
+        os.close(errors)
+        code = 127
+        try:
+            code = run_script(request["cmd"][1:], request["env"])
+        except BaseException as exc:
+            os.write(2, f"sandbox: {exc}\n".encode())
+        os._exit(code & 0xFF)
+    os.close(errors)
+    return _collect(pid, errors_read, request, started)
+
+
+HANDLERS = {"exec": handle_exec, "zygote": handle_zygote}
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    for line in stdin:
+        request = json.loads(line)
+        try:
+            reply = HANDLERS[request.get("kind", "exec")](request)
+        except Exception as exc:
+            reply = {"error": f"{type(exc).__name__}: {exc}"}
+        stdout.write(json.dumps(reply) + "\n")
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    if "--zygote" in sys.argv[1:]:
+        # pkgutil is what runpy.run_path would otherwise import in every child
+        for name in ZYGOTE_PRELOAD + ("pkgutil",):
+            __import__(name)
+        # Keep the collector from touching (and so copying) inherited objects
+        gc.freeze()
+    serve()
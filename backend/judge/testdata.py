@@ -0,0 +1,151 @@
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+from judge import sandbox
+
+load_dotenv()
+TESTDATA_CACHE_DIR = os.getenv("TESTDATA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "algoengine-testdata"))
+TESTDATA_CACHE_MAX_MB = int(os.getenv("TESTDATA_CACHE_MAX_MB", "1024"))
+# Entries used this recently are never evicted, so a judge that has just been
+# handed a path can still open it.
+_EVICT_GRACE_SECONDS = 120
+
+GENERATOR_LIMITS = sandbox.Limits(cpu_seconds=10, wall_seconds=20, memory_mb=512, file_size_mb=64)
+REFERENCE_LIMITS = sandbox.Limits(cpu_seconds=20, wall_seconds=40, memory_mb=1024, file_size_mb=64)
+
+
+class TestDataError(Exception):
+    """A generator or reference solution failed or stopped being deterministic"""
+
+
+@dataclass(frozen=True)
+class Materialized:
+    input_path: str
+    input_sha256: str
+    expected_path: Optional[str] = None
+    expected_sha256: Optional[str] = None
+
+
+def _key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+def _entry_path(key: str, suffix: str) -> str:
+    return os.path.join(TESTDATA_CACHE_DIR, key[:2], key + suffix)
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _locked(path: str):
+    """Exclusive cross-process lock so each entry is produced only once"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _evict() -> None:
+    """Drop least recently used entries until the cache fits its budget"""
+    entries = []
+    total = 0
+    for root, _, names in os.walk(TESTDATA_CACHE_DIR):
+        for name in names:
+            if name.endswith(".lock") or name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    budget = TESTDATA_CACHE_MAX_MB * 1024 * 1024
+    if total <= budget:
+        return
+    cutoff = time.time() - _EVICT_GRACE_SECONDS
+    for mtime, size, path in sorted(entries):
+        if total <= budget * 0.9 or mtime > cutoff:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def _produce(key: str, suffix: str, script: str, args: list[str], limits: sandbox.Limits, input_path: Optional[str] = None) -> str:
+    """Return the cached stdout of ``python3 script args``, running it on a miss"""
+    path = _entry_path(key, suffix)
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+    with _locked(path):
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+        with tempfile.TemporaryDirectory(prefix="algoengine-gen-") as tmp:
+            script_path = os.path.join(tmp, "script.py")
+            with open(script_path, "w") as f:
+                f.write(script)
+            partial = os.path.join(os.path.dirname(path), f".{key}{suffix}.{os.getpid()}")
+            result = sandbox.run(
+                ["python3", "script.py", *args],
+                {"script.py": script_path},
+                limits,
+                input_path=input_path,
+                stdout_path=partial,
+            )
+            if result.exit_code != 0:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise TestDataError(f"script exited with {result.exit_code or result.signal}: {result.stderr[-500:]}")
+            os.replace(partial, path)
+    _evict()
+    return path
+
+
+def generate(script: str, args: list[str]) -> str:
+    """Path to the (cached) output of a deterministic generator run with ``args``"""
+    return _produce(_key("gen", script, args), ".in", script, args, GENERATOR_LIMITS)
+
+
+def materialize(testcase, verify: bool = True) -> Materialized:
+    """Produce a generator testcase's input and, with a reference, its expected output.
+
+    When ``verify`` is set and the testcase carries digests, regenerated data
+    must match them byte for byte.
+    """
+    args = [str(testcase.generator_seed or 0), testcase.generator_params or "{}"]
+    input_path = generate(testcase.generator_script, args)
+    input_sha256 = sha256_file(input_path)
+    if verify and testcase.input_sha256 and input_sha256 != testcase.input_sha256:
+        os.remove(input_path)
+        raise TestDataError(f"generator for testcase {testcase.id} is not deterministic")
+
+    if not testcase.reference_solution:
+        return Materialized(input_path=input_path, input_sha256=input_sha256)
+
+    key = _key("ref", testcase.reference_solution, input_sha256)
+    expected_path = _produce(key, ".out", testcase.reference_solution, [], REFERENCE_LIMITS, input_path=input_path)
+    expected_sha256 = sha256_file(expected_path)
+    if verify and testcase.expected_sha256 and expected_sha256 != testcase.expected_sha256:
+        os.remove(expected_path)
+        raise TestDataError(f"reference solution for testcase {testcase.id} is not deterministic")
+    return Materialized(input_path, input_sha256, expected_path, expected_sha256)
@@ -0,0 +1,118 @@
+"""Stage timeline of one judge run, packed into a small blob.
+
+A timeline is a list of spans (stage, testcase id or 0, start, duration)
+relative to a base wall-clock time. Packed, each span is 17 bytes after a
+9-byte header, so a 100-case run is under 2 KB. Past MAX_SPANS the rest of a
+run is folded into one span per stage (testcase id 0), which keeps the blob
+under 35 KB and the per-stage totals exact however many cases a problem has:
+
+    header  <Bd   version, base (unix seconds)
+    span    <BIQI stage, ref, start offset (us), duration (us)
+"""
+import struct
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+QUEUE = 1        # submitted_at until a judge picked the submission up
+COMPILE = 2
+RUN = 3          # one testcase in the sandbox; ref = testcase id
+COMPARE = 4      # output check of one testcase; ref = testcase id
+COMPLEXITY = 5   # growth measurement of a passing solution
+RECORD = 6       # writing the verdict and results to the database
+
+STAGES = {QUEUE: "queue", COMPILE: "compile", RUN: "run", COMPARE: "compare", COMPLEXITY: "complexity", RECORD: "record"}
+
+_VERSION = 1
+_HEADER = struct.Struct("<Bd")
+_SPAN = struct.Struct("<BIQI")
+_MAX_US = (1 << 32) - 1
+MAX_SPANS = 2048
+
+
+def _epoch(moment: datetime) -> float:
+    """Naive datetimes in this repo are UTC (datetime.utcnow)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class Timeline:
+    def __init__(self, base: Optional[float] = None):
+        self.base = time.time() if base is None else base
+        self.spans: list[tuple[int, int, float, float]] = []   # stage, ref, start, end (unix seconds)
+
+    def add(self, stage: int, start: float, end: float, ref: int = 0) -> None:
+        self.spans.append((stage, ref or 0, start, end))
+
+    def add_since(self, stage: int, started: datetime, ref: int = 0) -> None:
+        """A span from a stored (naive UTC) datetime until now"""
+        start = _epoch(started)
+        self.base = min(self.base, start)
+        self.add(stage, start, time.time(), ref)
+
+    @contextmanager
+    def span(self, stage: int, ref: int = 0):
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(stage, start, time.time(), ref)
+
+    def pack(self, extra: Iterable[tuple[int, int, float, float]] = ()) -> bytes:
+        parts = [_HEADER.pack(_VERSION, self.base)]
+        for stage, ref, start, end in _capped([*self.spans, *extra]):
+            offset = max(0, round((start - self.base) * 1e6))
+            duration = min(_MAX_US, max(0, round((end - start) * 1e6)))
+            parts.append(_SPAN.pack(stage, ref, offset, duration))
+        return b"".join(parts)
+
+
+def _capped(spans: list[tuple[int, int, float, float]]) -> list[tuple[int, int, float, float]]:
+    """The first spans as they are, the ones past MAX_SPANS summed per stage"""
+    if len(spans) <= MAX_SPANS:
+        return spans
+    keep = MAX_SPANS - len(STAGES)
+    folded: dict[int, tuple[float, float]] = {}
+    for stage, _, start, end in spans[keep:]:
+        first, total = folded.get(stage, (start, 0.0))
+        folded[stage] = (min(first, start), total + max(0.0, end - start))
+    return spans[:keep] + [(stage, 0, first, first + total) for stage, (first, total) in folded.items()]
+
+
+def unpack(blob: bytes) -> tuple[float, list[dict]]:
+    """(base unix time, spans as dicts with times in ms relative to base)"""
+    version, base = _HEADER.unpack_from(blob)
+    if version != _VERSION:
+        raise ValueError(f"unknown timeline version {version}")
+    spans = []
+    for stage, ref, offset, duration in _SPAN.iter_unpack(blob[_HEADER.size:]):
+        spans.append({
+            "stage": STAGES.get(stage, str(stage)),
+            "testcase_id": ref or None,
+            "start_ms": round(offset / 1000, 3),
+            "duration_ms": round(duration / 1000, 3),
+        })
+    return base, spans
+
+
+def stage_totals(spans: list[dict]) -> dict[str, float]:
+    """Milliseconds per stage, summed over testcases, plus end-to-end ``total``"""
+    totals: dict[str, float] = {}
+    for span in spans:
+        totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["duration_ms"]
+    if spans:
+        totals["total"] = max(s["start_ms"] + s["duration_ms"] for s in spans) - min(s["start_ms"] for s in spans)
+    return {stage: round(ms, 3) for stage, ms in totals.items()}
+
+
+def percentiles(values: list[float], points: Iterable[int] = (50, 90, 99)) -> dict[str, float]:
+    """Nearest-rank percentiles of ``values`` as {"p50": ..., "max": ...}"""
+    ordered = sorted(values)
+    report = {}
+    for point in points:
+        index = max(0, -(-len(ordered) * point // 100) - 1)
+        report[f"p{point}"] = round(ordered[index], 3)
+    report["max"] = round(ordered[-1], 3)
+    return report
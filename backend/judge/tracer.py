@@ -0,0 +1,185 @@
+"""Line tracer run inside the sandbox in place of a Python solution.
+
+Usage: ``python3 tracer.py <max_steps> <max_bytes> solution.py``
+
+The solution runs as ``__main__`` with its normal stdin and stdout; the trace
+goes to ``trace.ndjson`` in the working directory, one JSON object per line:
+
+    {"t": "start", "max_steps": ..., "max_bytes": ...}
+    {"t": "step", "n": 1, "line": 3, "fn": "<module>", "depth": 0, "set": {"lo": 0}}
+    {"t": "step", "n": 2, "line": 4, "patch": {"arr": [[2, 7]]}, "del": ["tmp"]}
+    {"t": "end", "steps": 2, "truncated": null}
+
+Steps are deltas against the previous state of the same frame: ``set`` holds
+new or replaced values, ``patch`` lists ``[index, value]`` changes to a list of
+unchanged length, ``del`` names that went away. ``fn`` and ``depth`` appear
+only when the frame changes. A ``return`` step carries the returned value in
+``ret``. Containers are cut to MAX_ITEMS entries (``{"head": [...], "len": n}``)
+and strings to MAX_STRING characters, so one step stays small however big the
+data is. Past either cap tracing stops and the solution runs on untraced.
+
+Stdlib only: it runs under the sandbox's own python3.
+"""
+import json
+import os
+import runpy
+import sys
+import types
+
+MAX_ITEMS = 64
+MAX_STRING = 80
+MAX_DEPTH = 2
+TRACE_FILE = "trace.ndjson"
+
+_SKIP = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, type)
+
+
+def encode(value, depth=0):
+    """JSON-safe, size-bounded rendering of a variable's value"""
+    if value is None or isinstance(value, (bool, int)):
+        # Huge ints would blow the step size as easily as huge lists
+        return value if not isinstance(value, int) or abs(value) < 1 << 63 else {"int": str(value)[:MAX_STRING]}
+    if isinstance(value, float):
+        return value if value == value and abs(value) != float("inf") else {"float": repr(value)}
+    if isinstance(value, str):
+        return value if len(value) <= MAX_STRING else {"str": value[:MAX_STRING], "len": len(value)}
+    if depth >= MAX_DEPTH:
+        return {"type": type(value).__name__}
+    if isinstance(value, (list, tuple)):
+        items = [encode(v, depth + 1) for v in value[:MAX_ITEMS]]
+        if len(value) > MAX_ITEMS:
+            return {"head": items, "len": len(value)}
+        return items if isinstance(value, list) else {"tuple": items}
+    if isinstance(value, (set, frozenset)):
+        try:
+            items = sorted(value)[:MAX_ITEMS]
+        except TypeError:
+            items = list(value)[:MAX_ITEMS]
+        return {"set": [encode(v, depth + 1) for v in items], "len": len(value)}
+    if isinstance(value, dict):
+        items = [[encode(k, depth + 1), encode(v, depth + 1)] for k, v in list(value.items())[:MAX_ITEMS]]
+        return {"dict": items, "len": len(value)}
+    return {"type": type(value).__name__}
+
+
+def snapshot(frame):
+    return {
+        name: encode(value)
+        for name, value in frame.f_locals.items()
+        if not name.startswith("__") and not isinstance(value, _SKIP)
+    }
+
+
+def diff(before, after):
+    """(set, patch, deleted) turning ``before`` into ``after``"""
+    changed = {}
+    patch = {}
+    for name, value in after.items():
+        old = before.get(name)
+        if name in before and old == value:
+            continue
+        if isinstance(old, list) and isinstance(value, list) and len(old) == len(value):
+            edits = [[i, v] for i, (o, v) in enumerate(zip(old, value)) if o != v]
+            if len(edits) * 2 < len(value):
+                patch[name] = edits
+                continue
+        changed[name] = value
+    return changed, patch, [name for name in before if name not in after]
+
+
+class Tracer:
+    def __init__(self, out, filename, max_steps, max_bytes):
+        self.out = out
+        self.filename = filename
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self.steps = 0
+        self.written = 0
+        self.truncated = None
+        self.states = {}          # id(frame) -> last snapshot
+        self.depths = {}
+        self.current = None       # (fn, depth) of the last step written
+
+    def emit(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self.out.write(line)
+        self.written += len(line)
+
+    def finish(self):
+        self.emit({"t": "end", "steps": self.steps, "truncated": self.truncated})
+        self.out.flush()
+
+    def stop(self, reason):
+        # Written now: a solution that loops forever is killed, not unwound
+        self.truncated = reason
+        sys.settrace(None)
+        self.finish()
+
+    def step(self, frame, extra=None):
+        if self.truncated:
+            return
+        if self.steps >= self.max_steps:
+            return self.stop("steps")
+        if self.written >= self.max_bytes:
+            return self.stop("bytes")
+        self.steps += 1
+        state = snapshot(frame)
+        changed, patch, deleted = diff(self.states.get(id(frame), {}), state)
+        self.states[id(frame)] = state
+        record = {"t": "step", "n": self.steps, "line": frame.f_lineno}
+        where = (frame.f_code.co_name, self.depths.get(id(frame), 0))
+        if where != self.current:
+            record["fn"], record["depth"] = where
+            self.current = where
+        if changed:
+            record["set"] = changed
+        if patch:
+            record["patch"] = patch
+        if deleted:
+            record["del"] = deleted
+        if extra:
+            record.update(extra)
+        self.emit(record)
+
+    def global_trace(self, frame, event, arg):
+        if self.truncated or frame.f_code.co_filename != self.filename:
+            return None
+        parent = frame.f_back
+        self.depths[id(frame)] = self.depths.get(id(parent), -1) + 1 if parent is not None else 0
+        return self.local_trace
+
+    def local_trace(self, frame, event, arg):
+        if self.truncated:
+            return None
+        if event == "line":
+            self.step(frame)
+        elif event == "return":
+            self.step(frame, {"ret": encode(arg)})
+            # Frame ids are reused once the frame is freed
+            self.states.pop(id(frame), None)
+            self.depths.pop(id(frame), None)
+        elif event == "exception":
+            exc_type, exc, _ = arg
+            self.step(frame, {"exc": f"{exc_type.__name__}: {exc}"[:MAX_STRING * 2]})
+        return self.local_trace
+
+
+def main(argv):
+    max_steps, max_bytes, script = int(argv[1]), int(argv[2]), argv[3]
+    path = os.path.abspath(script)
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(path)
+    with open(TRACE_FILE, "w", buffering=1 << 16) as out:
+        tracer = Tracer(out, path, max_steps, max_bytes)
+        tracer.emit({"t": "start", "max_steps": max_steps, "max_bytes": max_bytes})
+        sys.settrace(tracer.global_trace)
+        try:
+            runpy.run_path(path, run_name="__main__")
+        finally:
+            sys.settrace(None)
+            if not tracer.truncated:
+                tracer.finish()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
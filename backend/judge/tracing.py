@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+from typing import Iterator, Optional
+from dotenv import load_dotenv
+from judge import runner, sandbox
+from judge.languages import get_language
+
+load_dotenv()
+TRACE_MAX_STEPS = int(os.getenv("TRACE_MAX_STEPS", "20000"))
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(4 * 1024 * 1024)))
+# settrace slows Python down by an order of magnitude; the cap above is what bounds the work
+TRACE_LIMITS = sandbox.Limits(
+    cpu_seconds=float(os.getenv("TRACE_CPU_SECONDS", "5")),
+    wall_seconds=float(os.getenv("TRACE_WALL_SECONDS", "10")),
+    memory_mb=runner.DEFAULT_LIMITS.memory_mb,
+    file_size_mb=max(1, TRACE_MAX_BYTES // (1024 * 1024) + 1),
+)
+
+_TRACER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tracer.py")
+_CHUNK_BYTES = 64 * 1024
+_EXCERPT_CHARS = 4096
+
+
+class Trace:
+    """A finished traced run whose NDJSON trace is still on disk.
+
+    ``chunks()`` streams the file and removes it when done, so the trace is
+    never held in memory as a whole; call ``close()`` if it is not consumed.
+    """
+
+    def __init__(self, workspace: runner.Workspace, path: str, result: sandbox.RunResult, verdict: str):
+        self._workspace = workspace
+        self.path = path
+        self.result = result
+        self.verdict = verdict
+
+    def summary(self) -> dict:
+        return {
+            "t": "result",
+            "verdict": self.verdict,
+            "stdout": self.result.stdout[:_EXCERPT_CHARS],
+            "stderr": self.result.stderr[-_EXCERPT_CHARS:],
+            "wall_ms": self.result.wall_ms,
+            "cpu_ms": self.result.cpu_ms,
+        }
+
+    def chunks(self) -> Iterator[bytes]:
+        """The trace lines in whole-line chunks, then one ``result`` line"""
+        try:
+            sent = 0
+            if os.path.isfile(self.path):
+                with open(self.path, "rb") as f:
+                    pending = b""
+                    while sent < TRACE_MAX_BYTES:
+                        block = f.read(_CHUNK_BYTES)
+                        if not block:
+                            break
+                        pending += block
+                        cut = pending.rfind(b"\n") + 1
+                        if cut:
+                            yield pending[:cut]
+                            sent += cut
+                            pending = pending[cut:]
+            yield json.dumps(self.summary(), separators=(",", ":")).encode() + b"\n"
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._workspace.__exit__(None, None, None)
+
+
+def trace(code: str, input_data: str, expected_output: Optional[str] = None) -> Trace:
+    """Run a Python solution on one input under the tracer (see judge/tracer.py)"""
+    language = get_language("python")
+    workspace = runner.Workspace(code, language)
+    try:
+        tracer_path = os.path.join(workspace.path, "tracer.py")
+        shutil.copyfile(_TRACER_PATH, tracer_path)
+        trace_path = os.path.join(workspace.path, "trace.ndjson")
+        result = sandbox.run(
+            ["python3", "tracer.py", str(TRACE_MAX_STEPS), str(TRACE_MAX_BYTES), language.source_file],
+            {language.source_file: workspace.source_path, "tracer.py": tracer_path},
+            TRACE_LIMITS,
+            input_data=(input_data or "").encode(),
+            outputs={"trace.ndjson": trace_path},
+            zygote=language.mode == "zygote",
+        )
+    except BaseException:
+        workspace.__exit__(None, None, None)
+        raise
+    if expected_output is None:
+        verdict = "finished" if result.exit_code == 0 and not result.timed_out else "runtime_error"
+    else:
+        verdict = runner.verdict_for(result, expected_output, TRACE_LIMITS)
+    return Trace(workspace, trace_path, result, verdict)
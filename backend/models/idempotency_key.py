@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.dialects import mysql
+from datetime import datetime
+from .base import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Client's Idempotency-Key header; keys differing only in case are different keys
+    key = Column(String(255).with_variant(mysql.VARCHAR(255, collation="utf8mb4_bin"), "mysql"), nullable=False)
+    request_hash = Column(String(64), nullable=False)         # sha256 of problem, language and code
+    # Null while the first request waits for a judge slot
+    submission_id = Column(Integer, ForeignKey("submissions.id", ondelete="CASCADE"), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
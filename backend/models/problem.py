@@ -12,3 +12,12 @@ class Problem(Base):
     series_id = Column(Integer, nullable=True)     # group ID for related problems
     series_index = Column(Integer, nullable=True)  # order inside series
     is_daily_candidate = Column(Boolean, default=True)
+
+    # Optional scaling family for empirical complexity grading
+    scaling_generator = Column(Text, nullable=True)          # python script, gets n as argv[1]
+    scaling_sizes = Column(String(200), nullable=True)       # e.g., "1000,2000,4000,8000"
+    target_complexity = Column(String(20), nullable=True)    # e.g., "n log n"
+    enforce_complexity = Column(Boolean, default=False)
+
+    # Bumped on every edit of the problem or its testcases; cached copies check it
+    version = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text, DateTime
+from datetime import datetime
+from .base import Base
+
+class RejudgeJob(Base):
+    __tablename__ = "rejudge_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    filters = Column(Text, nullable=False)                 # JSON: problem_id, user_id, from_id, to_id
+    status = Column(String(20), nullable=False, default="queued")   # queued, running, done, cancelled, failed
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)  # submissions with a stored verdict
+    judged = Column(Integer, nullable=False, default=0)     # distinct sources actually run
+    changed = Column(Integer, nullable=False, default=0)    # verdicts that differ from before
+    skipped = Column(Integer, nullable=False, default=0)    # in flight elsewhere, left alone
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+    runner = Column(String(100), nullable=True)             # host:pid of the process running it
+    heartbeat_at = Column(DateTime, nullable=True)          # bumped by the runner while it works
+    resume_after = Column(Integer, nullable=False, default=0, server_default="0")   # last submission id of the last recorded batch
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, ForeignKey
+from .base import Base
+
+class SimilaritySignature(Base):
+    __tablename__ = "similarity_signatures"
+
+    submission_id = Column(Integer, ForeignKey("submissions.id", ondelete="CASCADE"), primary_key=True)
+    problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), nullable=False, index=True)
+    signature = Column(LargeBinary(length=1024), nullable=False)   # packed MinHash values, see similarity.py
+
+
+class SimilarityBucket(Base):
+    __tablename__ = "similarity_buckets"
+
+    # The primary key doubles as the per-problem LSH index: (problem, band, bucket) -> submissions
+    problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(Integer, primary_key=True, autoincrement=False)
+    bucket = Column(String(8), primary_key=True)                   # crc32 of the band's rows, hex
+    submission_id = Column(
+        Integer, ForeignKey("submissions.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
@@ -1,16 +1,35 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Index
 from sqlalchemy.orm import relationship
+from datetime import datetime
 from .base import Base
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        # Serves the judge-worker claim query (pending rows and expired leases)
+        Index("ix_submissions_status_lease", "status", "lease_expires_at"),
+        # Keyset-paginated listings, newest first: a user's submissions (optionally
+        # by status or by problem), a problem's submissions
+        Index("ix_submissions_user_id", "user_id", "id"),
+        Index("ix_submissions_user_status_id", "user_id", "status", "id"),
+        Index("ix_submissions_user_problem_id", "user_id", "problem_id", "id"),
+        Index("ix_submissions_problem_status_id", "problem_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    code = Column(Text, nullable=False)
+    source_hash = Column(String(64), ForeignKey("submission_sources.hash"), nullable=False)   # see sources.py
     language = Column(String(50), nullable=False)
     status = Column(String(50), default="pending")
+    estimated_complexity = Column(String(20), nullable=True)   # e.g., "n log n"
+    complexity_report = Column(Text, nullable=True)            # JSON: samples, target, verdict
+    submitted_at = Column(DateTime, nullable=True, default=datetime.utcnow)   # null for rows predating the column
+
+    # Judge lease: set while a worker (or the API, inline) is judging the row
+    lease_owner = Column(String(100), nullable=True)           # "host:pid"
+    lease_expires_at = Column(DateTime, nullable=True)         # UTC
+    judge_attempts = Column(Integer, nullable=False, default=0, server_default="0")
 
     problem = relationship("Problem", backref="submissions")
     user = relationship("User", backref="submissions")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship
+from .base import Base
+
+class SubmissionResult(Base):
+    __tablename__ = "submission_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    submission_id = Column(Integer, ForeignKey("submissions.id", ondelete="CASCADE"), nullable=False, index=True)
+    testcase_id = Column(Integer, ForeignKey("testcases.id", ondelete="SET NULL"), nullable=True)
+    verdict = Column(String(50), nullable=False)   # e.g., "passed", "time_limit_exceeded"
+    cpu_ms = Column(Integer, nullable=True)        # user + sys time from wait4; null in docker mode
+    wall_ms = Column(Integer, nullable=False)
+    max_rss_kb = Column(Integer, nullable=True)
+
+    submission = relationship("Submission", backref="results")
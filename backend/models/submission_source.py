@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, LargeBinary
+from .base import Base
+
+class SubmissionSource(Base):
+    __tablename__ = "submission_sources"
+
+    # Content-addressed: identical code from any user or resubmit is one row
+    hash = Column(String(64), primary_key=True)           # sha256 of the UTF-8 source
+    compression = Column(String(10), nullable=False)      # "zlib"
+    data = Column(LargeBinary(length=16 * 1024 * 1024), nullable=False)
+    size = Column(Integer, nullable=False)                # uncompressed bytes
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, ForeignKey, DateTime, Index
+from datetime import datetime
+from .base import Base
+
+class SubmissionTimeline(Base):
+    __tablename__ = "submission_timelines"
+    __table_args__ = (
+        # Latest timelines of one problem and language, for the percentile report
+        Index("ix_submission_timelines_problem_language_id", "problem_id", "language", "submission_id"),
+    )
+
+    submission_id = Column(Integer, ForeignKey("submissions.id", ondelete="CASCADE"), primary_key=True)
+    problem_id = Column(Integer, nullable=False)
+    language = Column(String(50), nullable=False)
+    data = Column(LargeBinary(length=65535), nullable=False)     # packed spans, see judge/timeline.py
+    recorded_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,6 +1,6 @@
 import requests
 
-url = "http://127.0.0.1:8000/register"
+url = "http://127.0.0.1:8000/auth/register"
 
 data = {
     "username": "soham",
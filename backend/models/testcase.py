@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -7,8 +7,17 @@ class TestCase(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     problem_id = Column(Integer, ForeignKey("problems.id"), nullable=False)
-    input_data = Column(String(1000), nullable=False)
-    expected_output = Column(String(1000), nullable=False)
+    input_data = Column(String(1000), nullable=True)        # null for generator testcases
+    expected_output = Column(String(1000), nullable=True)   # null when a reference solution is given
     is_sample = Column(Boolean, default=False)
 
+    # Generator testcases: data is produced on first use into the disk cache
+    kind = Column(String(20), nullable=False, default="literal", server_default="literal")  # or "generator"
+    generator_script = Column(Text, nullable=True)    # python; argv[1] = seed, argv[2] = params JSON
+    generator_seed = Column(Integer, nullable=True)
+    generator_params = Column(String(500), nullable=True)   # JSON object
+    reference_solution = Column(Text, nullable=True)  # python; stdin = generated input
+    input_sha256 = Column(String(64), nullable=True)  # pins regeneration to identical bytes
+    expected_sha256 = Column(String(64), nullable=True)
+
     problem = relationship("Problem", backref="testcases")
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey
+from .base import Base
+
+class TestCaseStats(Base):
+    __tablename__ = "testcase_stats"
+
+    # Outcome counters used to order a problem's testcases fail-fast (judge/scheduling.py)
+    testcase_id = Column(Integer, ForeignKey("testcases.id", ondelete="CASCADE"), primary_key=True)
+    problem_id = Column(Integer, ForeignKey("problems.id", ondelete="CASCADE"), nullable=False, index=True)
+    runs = Column(Integer, nullable=False, default=0, server_default="0")
+    failures = Column(Integer, nullable=False, default=0, server_default="0")   # any verdict but passed
+    timeouts = Column(Integer, nullable=False, default=0, server_default="0")   # time_limit_exceeded only
+    total_ms = Column(BigInteger, nullable=False, default=0, server_default="0")  # cpu time where measured, else wall
@@ -15,3 +15,5 @@ class User(Base):
     github_url = Column(String(255), nullable=True)
     portfolio_url = Column(String(255), nullable=True)
     is_private = Column(Boolean, default=False)
+    # Set by hand (see README); required for problem/testcase edits and /admin
+    is_admin = Column(Boolean, nullable=False, default=False, server_default="0")
@@ -0,0 +1,134 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from typing import Optional
+from dependencies import get_db, get_current_admin_user
+from models.rejudge_job import RejudgeJob
+from models.submission import Submission
+from models.submission_timeline import SubmissionTimeline
+from judge import rejudge, timeline
+import similarity
+from routers.submissions import LIST_COLUMNS, list_page
+from schemas.admin import RejudgeRequest, RejudgeJobResponse
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+# -------------------------
+# SUBMISSIONS
+# -------------------------
+@router.get("/problems/{problem_id}/submissions")
+def list_problem_submissions(
+    problem_id: int,
+    status: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    admin_user = Depends(get_current_admin_user)
+):
+    """All users' submissions to a problem, newest first (admin only)"""
+    query = db.query(*LIST_COLUMNS).filter(Submission.problem_id == problem_id)
+    if status is not None:
+        query = query.filter(Submission.status == status)
+    return list_page(query, cursor, limit)
+
+
+@router.get("/problems/{problem_id}/similar")
+def similar_submissions(
+    problem_id: int,
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0),
+    db: Session = Depends(get_db),
+    admin_user = Depends(get_current_admin_user)
+):
+    """Clusters of near-identical submissions from different users (admin only)"""
+    return {"problem_id": problem_id, "clusters": similarity.clusters(db, problem_id, threshold)}
+
+
+# -------------------------
+# TIMELINES
+# -------------------------
+@router.get("/submissions/{submission_id}/timeline")
+def submission_timeline(submission_id: int, db: Session = Depends(get_db), admin_user = Depends(get_current_admin_user)):
+    """Stage-by-stage timing of a submission's last judge run (admin only)"""
+    row = db.get(SubmissionTimeline, submission_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="No timeline for this submission")
+    base, spans = timeline.unpack(row.data)
+    return {
+        "submission_id": submission_id,
+        "started_at": datetime.fromtimestamp(base, timezone.utc).isoformat(),
+        "stages_ms": timeline.stage_totals(spans),
+        "spans": spans,
+    }
+
+
+@router.get("/problems/{problem_id}/timeline-stats")
+def problem_timeline_stats(
+    problem_id: int,
+    language: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    admin_user = Depends(get_current_admin_user)
+):
+    """Per-stage latency percentiles over a problem's latest judged submissions, by language (admin only)"""
+    query = db.query(SubmissionTimeline.language, SubmissionTimeline.data).filter(
+        SubmissionTimeline.problem_id == problem_id
+    )
+    if language is not None:
+        query = query.filter(SubmissionTimeline.language == language)
+    samples: dict[str, dict[str, list[float]]] = {}
+    counts: dict[str, int] = {}
+    for row in query.order_by(SubmissionTimeline.submission_id.desc()).limit(limit):
+        counts[row.language] = counts.get(row.language, 0) + 1
+        by_stage = samples.setdefault(row.language, {})
+        for stage, ms in timeline.stage_totals(timeline.unpack(row.data)[1]).items():
+            by_stage.setdefault(stage, []).append(ms)
+    return {
+        "problem_id": problem_id,
+        "languages": {
+            name: {
+                "submissions": counts[name],
+                "stages_ms": {stage: timeline.percentiles(values) for stage, values in by_stage.items()},
+            }
+            for name, by_stage in samples.items()
+        },
+    }
+
+
+# -------------------------
+# REJUDGE
+# -------------------------
+@router.post("/rejudge", response_model=RejudgeJobResponse, status_code=202)
+def start_rejudge(
+    request: RejudgeRequest,
+    db: Session = Depends(get_db),
+    admin_user = Depends(get_current_admin_user)
+):
+    """Re-run finished submissions against the current testcases (admin only)"""
+    job = rejudge.start(db, request.model_dump(), admin_user.id)
+    return rejudge.progress(job)
+
+
+@router.get("/rejudge", response_model=list[RejudgeJobResponse])
+def list_rejudges(limit: int = 20, db: Session = Depends(get_db), admin_user = Depends(get_current_admin_user)):
+    """Most recent rejudge jobs first (admin only)"""
+    jobs = db.query(RejudgeJob).order_by(RejudgeJob.id.desc()).limit(min(limit, 100)).all()
+    return [rejudge.progress(job) for job in jobs]
+
+
+@router.get("/rejudge/{job_id}", response_model=RejudgeJobResponse)
+def get_rejudge(job_id: int, db: Session = Depends(get_db), admin_user = Depends(get_current_admin_user)):
+    """Progress and ETA of a rejudge job (admin only)"""
+    job = db.get(RejudgeJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Rejudge job not found")
+    return rejudge.progress(job)
+
+
+@router.post("/rejudge/{job_id}/cancel", response_model=RejudgeJobResponse)
+def cancel_rejudge(job_id: int, db: Session = Depends(get_db), admin_user = Depends(get_current_admin_user)):
+    """Stop a rejudge job; verdicts already written are kept (admin only)"""
+    job = rejudge.cancel(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Rejudge job not found")
+    return rejudge.progress(job)
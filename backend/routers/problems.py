@@ -1,13 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import Optional
 from dependencies import get_db, get_current_admin_user
 from models.problem import Problem
-from schemas.problems import ProblemCreate, ProblemResponse, ProblemUpdate
+import cache
+from schemas.problems import ProblemAdminResponse, ProblemCreate, ProblemResponse, ProblemUpdate
 
 router = APIRouter(prefix="/problems", tags=["problems"])
 
-@router.post("/", response_model=ProblemResponse)
+# The list selects exactly the response fields and encodes rows with orjson,
+# skipping ORM entities and per-row pydantic validation.
+LIST_COLUMNS = [getattr(Problem, name) for name in ProblemResponse.model_fields]
+
+@router.post("/", response_model=ProblemAdminResponse)
 def create_problem(
     problem: ProblemCreate, 
     db: Session = Depends(get_db),
@@ -30,7 +36,7 @@ def get_all_problems(
     db: Session = Depends(get_db)
 ):
     """Get all problems with optional filtering and pagination"""
-    query = db.query(Problem)
+    query = db.query(*LIST_COLUMNS)
     
     if concept:
         query = query.filter(Problem.concept.ilike(f"%{concept}%"))
@@ -39,17 +45,30 @@ def get_all_problems(
     if series_id:
         query = query.filter(Problem.series_id == series_id)
     
-    return query.offset(skip).limit(limit).all()
+    rows = query.order_by(Problem.id).offset(skip).limit(limit)
+    return ORJSONResponse([row._asdict() for row in rows])
 
 @router.get("/{problem_id}", response_model=ProblemResponse)
 def get_problem(problem_id: int, db: Session = Depends(get_db)):
     """Get a single problem by ID"""
-    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    problem = cache.get_problem(db, problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    return problem
+
+@router.get("/{problem_id}/admin", response_model=ProblemAdminResponse)
+def get_problem_admin(
+    problem_id: int,
+    db: Session = Depends(get_db),
+    admin_user = Depends(get_current_admin_user)
+):
+    """Get a single problem including its scaling generator (admin only)"""
+    problem = cache.get_problem(db, problem_id)
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
     return problem
 
-@router.put("/{problem_id}", response_model=ProblemResponse)
+@router.put("/{problem_id}", response_model=ProblemAdminResponse)
 def update_problem(
     problem_id: int,
     problem_update: ProblemUpdate,
@@ -64,6 +83,7 @@ def update_problem(
     for field, value in problem_update.dict(exclude_unset=True).items():
         setattr(problem, field, value)
     
+    cache.bump_version(db, problem_id)
     db.commit()
     db.refresh(problem)
     return problem
@@ -81,9 +101,11 @@ def delete_problem(
     
     db.delete(problem)
     db.commit()
+    cache.problem_cache.invalidate(problem_id)
+    cache.testcase_cache.invalidate(problem_id)
     return {"message": "Problem deleted successfully"}
 
-@router.get("/daily-challenge/today")
+@router.get("/daily-challenge/today", response_model=ProblemResponse)
 def get_daily_challenge(db: Session = Depends(get_db)):
     """Get today's daily challenge problem"""
     # Simple implementation - get a random daily candidate
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+import time
+
+from models.user import User
+from dependencies import client_ip, get_db, get_current_user
+import cache
+from judge import admission, runs
+
+router = APIRouter(prefix="/problems", tags=["runs"])
+
+
+# -------------------------
+# Pydantic model
+# -------------------------
+class RunCreate(BaseModel):
+    code: str
+    language: str
+    inputs: list[str] = []      # custom stdin, each run as given
+    samples: bool = True        # also run the problem's sample testcases
+
+
+# -------------------------
+# RUN CODE
+# -------------------------
+@router.post("/{problem_id}/run")
+def run_code(
+    problem_id: int,
+    run: RunCreate,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Run code on custom input and the problem's samples; nothing is stored"""
+    problem = cache.get_problem(db, problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+    if len(run.inputs) > runs.RUN_MAX_INPUTS:
+        raise HTTPException(status_code=400, detail=f"At most {runs.RUN_MAX_INPUTS} custom inputs per run")
+    if any(len(text.encode()) > runs.RUN_MAX_INPUT_BYTES for text in run.inputs):
+        raise HTTPException(status_code=413, detail="Custom input is too large")
+
+    items = [runs.RunInput(text) for text in run.inputs]
+    if run.samples:
+        # Hidden cases never go through here: their outputs would be shown back
+        samples = [tc for tc in cache.get_testcases(db, problem_id) if tc.is_sample and tc.kind == "literal"]
+        items += [runs.RunInput(tc.input_data, tc.expected_output, tc.id) for tc in samples[:runs.RUN_MAX_SAMPLES]]
+    if not items:
+        raise HTTPException(status_code=400, detail="Nothing to run: give custom inputs or include the samples")
+
+    admission.check_run_rate(current_user.id, client_ip(request))
+    waited_from = time.monotonic()
+    with admission.judge_slot(
+        owner=f"user:{current_user.id}",
+        lane=admission.LANE_RUN,
+        max_queue=admission.RUN_MAX_QUEUE,
+        timeout=admission.RUN_QUEUE_TIMEOUT,
+    ):
+        queued_ms = (time.monotonic() - waited_from) * 1000
+        result = runs.run(run.code, run.language, items)
+    result["queued_ms"] = round(queued_ms, 1)
+    return result
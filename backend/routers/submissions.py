@@ -1,37 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
-import tempfile
-import subprocess
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+import json
+import logging
+import time
+from datetime import datetime
 
-from db import SessionLocal
 from models.submission import Submission
-from models.problem import Problem
-from models.testcase import TestCase
+from models.submission_result import SubmissionResult
 from models.user import User
-from dependencies import get_current_user
- # import your auth dependency
+from dependencies import client_ip, get_db, get_current_user
+import archive
+import cache
+import idempotency
+import sources
+from judge import admission, dispatch, profiling, tracing
+from judge.languages import get_language
 
-router = APIRouter(prefix="/submissions", tags=["submissions"])
+logger = logging.getLogger("algoengine.submissions")
 
+router = APIRouter(prefix="/submissions", tags=["submissions"])
 
-# -------------------------
-# DATABASE DEPENDENCY
-# -------------------------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Everything a listing shows; never the source
+LIST_COLUMNS = (
+    Submission.id,
+    Submission.problem_id,
+    Submission.user_id,
+    Submission.language,
+    Submission.status,
+    Submission.estimated_complexity,
+    Submission.submitted_at,
+)
 
 
 # -------------------------
 # Pydantic model
 # -------------------------
 class SubmissionCreate(BaseModel):
-    code: str
+    code: str = Field(..., max_length=sources.MAX_SOURCE_CHARS)
     language: str
+    mode: Literal["judge", "profile"] = "judge"     # "profile" also returns a hot-spot report
+    profile_testcase_id: Optional[int] = None       # default: the failing case, else the slowest
 
 
 # -------------------------
@@ -41,60 +52,207 @@ class SubmissionCreate(BaseModel):
 def create_submission(
     problem_id: int,
     submission: SubmissionCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    problem = cache.get_problem(db, problem_id)
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
+    if idempotency_key is None:
+        return _submit(problem_id, submission, request, current_user, db, None)
 
-    db_submission = Submission(
-        problem_id=problem_id,
-        user_id=current_user.id,
-        code=submission.code,
-        language=submission.language,
-        status="pending"
-    )
-    db.add(db_submission)
-    db.commit()
-    db.refresh(db_submission)
+    # A retried request gets the original submission instead of a second judge run
+    digest = idempotency.request_hash(problem_id, submission.language, submission.code)
+    wait_until = idempotency.deadline()
+    original = idempotency.claim(db, current_user.id, idempotency_key, digest, wait_until)
+    if original is not None:
+        return _replay(db, original, wait_until)
+    try:
+        return _submit(problem_id, submission, request, current_user, db, idempotency_key)
+    except BaseException:
+        idempotency.abandon(db, current_user.id, idempotency_key)
+        raise
+
+
+def _replay(db: Session, submission_id: int, wait_until: float):
+    """The original submission's result, or 202 if its inline judge is still running at ``wait_until``"""
+    while True:
+        row = db.query(Submission.id, Submission.status, Submission.estimated_complexity).filter(
+            Submission.id == submission_id
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Submission not found")
+        body = {"id": row.id, "status": row.status, "estimated_complexity": row.estimated_complexity}
+        if dispatch.JUDGE_DISPATCH == "queue" or row.status not in ("pending", "judging"):
+            return body
+        if time.monotonic() >= wait_until:
+            # Poll GET /submissions/{id}, or retry with the same key later
+            return JSONResponse(status_code=202, content=body, headers={"Retry-After": idempotency.retry_after()})
+        db.rollback()
+        time.sleep(0.25)
+
+
+def _submit(
+    problem_id: int,
+    submission: SubmissionCreate,
+    request: Request,
+    current_user: User,
+    db: Session,
+    idempotency_key: Optional[str],
+) -> dict:
+    if submission.mode == "profile" and dispatch.JUDGE_DISPATCH != "queue":
+        # Rejected before anything is judged or stored
+        _check_profile(db, problem_id, submission.language, submission.profile_testcase_id)
+    admission.check_rate(current_user.id, client_ip(request))
+    # Taken before any slot wait so the judge timeline's queue stage includes it
+    received_at = datetime.utcnow()
+
+    if dispatch.JUDGE_DISPATCH == "queue":
+        if submission.mode == "profile":
+            raise HTTPException(
+                status_code=400,
+                detail="Profile mode needs inline judging; use POST /submissions/{id}/profile once it is judged",
+            )
+        # A judge-worker picks the row up; clients poll GET /submissions/{id}
+        if not cache.get_testcases(db, problem_id):
+            raise HTTPException(status_code=400, detail="No testcases for this problem")
+        db_submission = Submission(
+            problem_id=problem_id,
+            user_id=current_user.id,
+            source_hash=sources.store(db, submission.code),
+            language=submission.language,
+            status="pending",
+            submitted_at=received_at,
+        )
+        db.add(db_submission)
+        db.flush()
+        if idempotency_key is not None:
+            idempotency.attach(db, current_user.id, idempotency_key, db_submission.id)
+        db.commit()
+        db.refresh(db_submission)
+        return {"id": db_submission.id, "status": db_submission.status, "estimated_complexity": None}
+
+    # The slot bounds judge processes host-wide; waiting happens before the
+    # submission row exists so shed requests leave nothing behind.
+    with admission.judge_slot(owner=f"user:{current_user.id}"):
+        if not cache.get_testcases(db, problem_id):
+            raise HTTPException(status_code=400, detail="No testcases for this problem")
+
+        # Inserted already leased so judge-workers leave it alone
+        owner = dispatch.lease_owner()
+        db_submission = Submission(
+            problem_id=problem_id,
+            user_id=current_user.id,
+            source_hash=sources.store(db, submission.code),
+            language=submission.language,
+            status="judging",
+            submitted_at=received_at,
+            lease_owner=owner,
+            lease_expires_at=dispatch.lease_expiry(),
+            judge_attempts=1,
+        )
+        db.add(db_submission)
+        db.flush()
+        if idempotency_key is not None:
+            idempotency.attach(db, current_user.id, idempotency_key, db_submission.id)
+        db.commit()
+        db.refresh(db_submission)
+
+        dispatch.judge_leased(db, db_submission, owner, code=submission.code)
+        db.refresh(db_submission)
+        response = {
+            "id": db_submission.id,
+            "status": db_submission.status,
+            "estimated_complexity": db_submission.estimated_complexity,
+        }
+        if submission.mode == "profile":
+            # Still inside the slot: the profiled run is judge work like any other
+            try:
+                response["profile"] = _profile(db, db_submission, submission.code, submission.profile_testcase_id)
+            except Exception as exc:
+                # The verdict is stored either way; only the report is missing
+                logger.exception("profiling submission %s failed", db_submission.id)
+                detail = exc.detail if isinstance(exc, HTTPException) else "Profiling failed"
+                response["profile"] = {"error": detail}
+        return response
 
-    testcases = db.query(TestCase).filter(TestCase.problem_id == problem_id).all()
+
+def _check_profile(db: Session, problem_id: int, language: str, testcase_id: Optional[int]) -> None:
+    try:
+        profiling.check_available(language)
+    except profiling.ProfileUnavailable as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if testcase_id is not None and all(tc.id != testcase_id for tc in cache.get_testcases(db, problem_id)):
+        raise HTTPException(status_code=404, detail="Testcase not found for this problem")
+
+
+def _profile_testcase(db: Session, submission: Submission, testcase_id: Optional[int]):
+    testcases = cache.get_testcases(db, submission.problem_id)
+    by_id = {tc.id: tc for tc in testcases}
+    if testcase_id is not None:
+        if testcase_id not in by_id:
+            raise HTTPException(status_code=404, detail="Testcase not found for this problem")
+        return by_id[testcase_id]
+    results = (
+        db.query(SubmissionResult)
+        .filter(SubmissionResult.submission_id == submission.id)
+        .order_by(SubmissionResult.id)
+        .all()
+    )
+    failing = [r for r in results if r.verdict != "passed"]
+    if failing:
+        chosen = failing[-1]
+    elif results:
+        chosen = max(results, key=lambda r: r.cpu_ms if r.cpu_ms is not None else r.wall_ms)
+    else:
+        chosen = None
+    if chosen is not None and chosen.testcase_id in by_id:
+        return by_id[chosen.testcase_id]
     if not testcases:
         raise HTTPException(status_code=400, detail="No testcases for this problem")
+    return testcases[0]
 
-    all_passed = True
-
-    if submission.language.lower() == "python":
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".py") as tmpfile:
-            tmpfile.write(submission.code.encode())
-            tmpfile.flush()
-
-            for tc in testcases:
-                try:
-                    result = subprocess.run(
-                        ["python3", tmpfile.name],
-                        input=tc.input_data.encode(),
-                        capture_output=True,
-                        text=True,
-                        timeout=2
-                    )
-                    output = result.stdout.strip()
-                    if output != tc.expected_output.strip():
-                        all_passed = False
-                        break
-                except subprocess.TimeoutExpired:
-                    all_passed = False
-                    break
-    else:
-        db_submission.status = "unsupported_language"
-        db.commit()
-        return {"id": db_submission.id, "status": db_submission.status}
 
-    db_submission.status = "passed" if all_passed else "failed"
-    db.commit()
-    db.refresh(db_submission)
-    return {"id": db_submission.id, "status": db_submission.status}
+def _profile(db: Session, submission: Submission, code: str, testcase_id: Optional[int]) -> dict:
+    testcase = _profile_testcase(db, submission, testcase_id)
+    try:
+        return profiling.profile(code, submission.language, testcase)
+    except profiling.ProfileUnavailable as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+# -------------------------
+# LIST SUBMISSIONS
+# -------------------------
+def list_page(query, cursor: Optional[int], limit: int) -> dict:
+    """Newest-first keyset page: rows with id < cursor, plus the cursor for the next page"""
+    if cursor is not None:
+        query = query.filter(Submission.id < cursor)
+    rows = query.order_by(Submission.id.desc()).limit(limit + 1).all()
+    return {
+        "items": [row._asdict() for row in rows[:limit]],
+        "next_cursor": rows[limit - 1].id if len(rows) > limit else None,
+    }
+
+
+@router.get("/")
+def list_submissions(
+    problem_id: Optional[int] = None,
+    status: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Current user's submissions, newest first"""
+    query = db.query(*LIST_COLUMNS).filter(Submission.user_id == current_user.id)
+    if problem_id is not None:
+        query = query.filter(Submission.problem_id == problem_id)
+    if status is not None:
+        query = query.filter(Submission.status == status)
+    return list_page(query, cursor, limit)
 
 
 # -------------------------
@@ -104,13 +262,122 @@ def create_submission(
 def get_submission(submission_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     submission = db.query(Submission).filter(Submission.id == submission_id).first()
     if not submission:
-        raise HTTPException(status_code=404, detail="Submission not found")
+        return _get_archived(submission_id, current_user)
     if submission.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed to view this submission")
     return {
         "problem_id": submission.problem_id,
         "user_id": submission.user_id,
-        "code": submission.code,
+        "code": sources.load(db, submission.source_hash),
         "language": submission.language,
-        "status": submission.status
+        "status": submission.status,
+        "submitted_at": submission.submitted_at,
+        "estimated_complexity": submission.estimated_complexity,
+        "complexity": json.loads(submission.complexity_report) if submission.complexity_report else None,
+        "results": [
+            {
+                "testcase_id": r.testcase_id,
+                "verdict": r.verdict,
+                "cpu_ms": r.cpu_ms,
+                "wall_ms": r.wall_ms,
+                "max_rss_kb": r.max_rss_kb,
+            }
+            for r in db.query(SubmissionResult)
+            .filter(SubmissionResult.submission_id == submission.id)
+            .order_by(SubmissionResult.id)
+        ],
+    }
+
+
+# -------------------------
+# TRACE SUBMISSION
+# -------------------------
+@router.get("/{submission_id}/trace")
+def trace_submission(
+    submission_id: int,
+    request: Request,
+    testcase_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Re-run a Python submission on a sample testcase and stream its execution trace as NDJSON"""
+    submission = db.query(Submission).filter(Submission.id == submission_id).first()
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    if submission.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to view this submission")
+    language = get_language(submission.language)
+    if language is None or language.name != "python":
+        raise HTTPException(status_code=400, detail="Tracing is only available for Python submissions")
+
+    # Only samples: a trace shows every value the solution reads
+    samples = [
+        tc for tc in cache.get_testcases(db, submission.problem_id)
+        if tc.is_sample and tc.kind == "literal" and (testcase_id is None or tc.id == testcase_id)
+    ]
+    if not samples:
+        raise HTTPException(status_code=404, detail="No sample testcase to trace")
+    testcase = samples[0]
+
+    admission.check_rate(current_user.id, client_ip(request))
+    with admission.judge_slot(owner=f"user:{current_user.id}"):
+        trace = tracing.trace(sources.load(db, submission.source_hash), testcase.input_data, testcase.expected_output)
+    return StreamingResponse(
+        trace.chunks(),
+        media_type="application/x-ndjson",
+        headers={"X-Testcase-Id": str(testcase.id)},
+    )
+
+
+# -------------------------
+# PROFILE SUBMISSION
+# -------------------------
+@router.post("/{submission_id}/profile")
+def profile_submission(
+    submission_id: int,
+    request: Request,
+    testcase_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Re-run a judged submission on one testcase under a profiler and report its hot spots"""
+    submission = db.query(Submission).filter(Submission.id == submission_id).first()
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    if submission.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to view this submission")
+    if submission.status in ("pending", "judging"):
+        raise HTTPException(status_code=409, detail="Submission is still being judged")
+
+    admission.check_rate(current_user.id, client_ip(request))
+    with admission.judge_slot(owner=f"user:{current_user.id}"):
+        report = _profile(db, submission, sources.load(db, submission.source_hash), testcase_id)
+    return {
+        "id": submission.id,
+        "status": submission.status,
+        "estimated_complexity": submission.estimated_complexity,
+        "profile": report,
+    }
+
+
+def _get_archived(submission_id: int, current_user: User) -> dict:
+    row = archive.lookup(submission_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    if row["user_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to view this submission")
+    return {
+        "problem_id": row["problem_id"],
+        "user_id": row["user_id"],
+        "code": row["code"],
+        "language": row["language"],
+        "status": row["status"],
+        "submitted_at": row["submitted_at"],
+        "estimated_complexity": row["estimated_complexity"],
+        "complexity": json.loads(row["complexity_report"]) if row["complexity_report"] else None,
+        "results": [
+            {"testcase_id": t, "verdict": v, "cpu_ms": cpu, "wall_ms": wall, "max_rss_kb": rss}
+            for t, v, cpu, wall, rss in row["results"]
+        ],
+        "archived": True,
     }
@@ -1,12 +1,40 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import case, func, null, true
 from sqlalchemy.orm import Session
+import orjson
 from dependencies import get_db, get_current_admin_user, get_current_user
 from models.problem import Problem
 from models.testcase import TestCase
-from schemas.testcases import TestCaseCreate, TestCaseResponse, TestCasePublicResponse, TestCaseUpdate
+import cache
+import json
+from judge import testdata
+from schemas.testcases import TestCaseCreate, TestCaseResponse, TestCasePublicResponse, TestCaseUpdate, check_kind
 
 router = APIRouter(prefix="/problems", tags=["testcases"])
 
+# List endpoints select exactly the response fields and encode rows with orjson,
+# skipping ORM entities and per-row pydantic validation.
+ADMIN_COLUMNS = [getattr(TestCase, name) for name in TestCaseResponse.model_fields]
+
+GENERATOR_FIELDS = {"generator_script", "generator_seed", "generator_params", "reference_solution"}
+
+def _row_fields(data: dict) -> dict:
+    if data.get("generator_params") is not None:
+        data["generator_params"] = json.dumps(data["generator_params"], sort_keys=True)
+    return data
+
+def _pin_generated_data(db_testcase: TestCase) -> None:
+    """Generate once up front to validate the scripts and record content digests"""
+    db_testcase.input_sha256 = None
+    db_testcase.expected_sha256 = None
+    try:
+        data = testdata.materialize(db_testcase, verify=False)
+    except testdata.TestDataError as exc:
+        raise HTTPException(status_code=400, detail=f"Generator failed: {exc}")
+    db_testcase.input_sha256 = data.input_sha256
+    db_testcase.expected_sha256 = data.expected_sha256
+
 @router.post("/{problem_id}/testcases", response_model=TestCaseResponse)
 def create_testcase(
     problem_id: int,
@@ -19,8 +47,11 @@ def create_testcase(
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
 
-    db_testcase = TestCase(problem_id=problem_id, **testcase.dict())
+    db_testcase = TestCase(problem_id=problem_id, **_row_fields(testcase.dict()))
+    if db_testcase.kind == "generator":
+        _pin_generated_data(db_testcase)
     db.add(db_testcase)
+    cache.bump_version(db, problem_id)
     db.commit()
     db.refresh(db_testcase)
     return db_testcase
@@ -32,25 +63,19 @@ def get_problem_testcases(
     current_user = Depends(get_current_user)
 ):
     """Get testcases for a problem (hides expected output for non-sample cases)"""
-    problem = db.query(Problem).filter(Problem.id == problem_id).first()
-    if not problem:
+    if not cache.get_problem(db, problem_id):
         raise HTTPException(status_code=404, detail="Problem not found")
-    
-    testcases = db.query(TestCase).filter(TestCase.problem_id == problem_id).all()
-    
-    # Convert to public response format
-    public_testcases = []
-    for tc in testcases:
-        public_tc = TestCasePublicResponse(
-            id=tc.id,
-            problem_id=tc.problem_id,
-            input_data=tc.input_data,
-            is_sample=tc.is_sample,
-            expected_output=tc.expected_output if tc.is_sample else None
-        )
-        public_testcases.append(public_tc)
-    
-    return public_testcases
+
+    # Only the public columns, with expected output masked in SQL
+    rows = db.query(
+        TestCase.id,
+        TestCase.problem_id,
+        TestCase.input_data,
+        func.coalesce(TestCase.is_sample, False).label("is_sample"),
+        func.coalesce(TestCase.kind, "literal").label("kind"),
+        case((TestCase.is_sample == true(), TestCase.expected_output), else_=null()).label("expected_output"),
+    ).filter(TestCase.problem_id == problem_id).order_by(TestCase.id)
+    return ORJSONResponse([row._asdict() for row in rows])
 
 @router.get("/{problem_id}/testcases/admin", response_model=list[TestCaseResponse])
 def get_problem_testcases_admin(
@@ -59,11 +84,17 @@ def get_problem_testcases_admin(
     admin_user = Depends(get_current_admin_user)
 ):
     """Get all testcases for a problem with expected outputs (admin only)"""
-    problem = db.query(Problem).filter(Problem.id == problem_id).first()
-    if not problem:
+    if not cache.get_problem(db, problem_id):
         raise HTTPException(status_code=404, detail="Problem not found")
-    
-    return db.query(TestCase).filter(TestCase.problem_id == problem_id).all()
+
+    rows = db.query(*ADMIN_COLUMNS).filter(TestCase.problem_id == problem_id).order_by(TestCase.id)
+    items = []
+    for row in rows:
+        item = row._asdict()
+        if item["generator_params"] is not None:
+            item["generator_params"] = orjson.loads(item["generator_params"])
+        items.append(item)
+    return ORJSONResponse(items)
 
 @router.get("/testcases/{testcase_id}", response_model=TestCaseResponse)
 def get_testcase(
@@ -89,9 +120,19 @@ def update_testcase(
     if not testcase:
         raise HTTPException(status_code=404, detail="TestCase not found")
     
-    for field, value in testcase_update.dict(exclude_unset=True).items():
+    changes = _row_fields(testcase_update.dict(exclude_unset=True))
+    for field, value in changes.items():
         setattr(testcase, field, value)
+    # An explicit null can leave the row without what its kind needs
+    try:
+        check_kind(testcase)
+    except ValueError as exc:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=str(exc))
+    if testcase.kind == "generator" and GENERATOR_FIELDS & changes.keys():
+        _pin_generated_data(testcase)
     
+    cache.bump_version(db, testcase.problem_id)
     db.commit()
     db.refresh(testcase)
     return testcase
@@ -108,5 +149,6 @@ def delete_testcase(
         raise HTTPException(status_code=404, detail="TestCase not found")
     
     db.delete(testcase)
+    cache.bump_version(db, testcase.problem_id)
     db.commit()
     return {"message": "TestCase deleted successfully"}
\ No newline at end of file
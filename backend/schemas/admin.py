@@ -0,0 +1,35 @@
+from pydantic import BaseModel, model_validator
+from typing import Optional
+from datetime import datetime
+
+class RejudgeRequest(BaseModel):
+    problem_id: Optional[int] = None
+    user_id: Optional[int] = None
+    from_id: Optional[int] = None     # submission id range, inclusive
+    to_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_scope(self):
+        if all(value is None for value in (self.problem_id, self.user_id, self.from_id, self.to_id)):
+            raise ValueError("give at least one of problem_id, user_id, from_id, to_id")
+        if self.from_id is not None and self.to_id is not None and self.from_id > self.to_id:
+            raise ValueError("from_id must not be greater than to_id")
+        return self
+
+class RejudgeJobResponse(BaseModel):
+    id: int
+    created_by: int
+    filters: dict
+    status: str
+    total: int
+    processed: int
+    judged: int
+    changed: int
+    skipped: int
+    cancel_requested: bool
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: Optional[float] = None
+    eta_seconds: Optional[float] = None
@@ -1,5 +1,28 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
+from judge.complexity import SCALING_MAX_SIZES, SCALING_MAX_TOTAL, normalize_class
+
+
+def _check_complexity(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    normalized = normalize_class(value)
+    if normalized is None:
+        raise ValueError("unknown complexity class; use e.g. 'n', 'n log n', 'n^2'")
+    return normalized
+
+
+def _check_sizes(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    sizes = sorted({int(part) for part in value.split(",") if part.strip()})
+    if len(sizes) < 3 or sizes[0] < 1:
+        raise ValueError("need at least three distinct positive sizes")
+    if len(sizes) > SCALING_MAX_SIZES:
+        raise ValueError(f"at most {SCALING_MAX_SIZES} sizes")
+    if sum(sizes) > SCALING_MAX_TOTAL:
+        raise ValueError(f"sizes may add up to at most {SCALING_MAX_TOTAL}")
+    return ",".join(str(n) for n in sizes)
 
 class ProblemBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
@@ -9,9 +32,15 @@ class ProblemBase(BaseModel):
     series_id: Optional[int] = None
     series_index: Optional[int] = None
     is_daily_candidate: bool = True
+    scaling_sizes: Optional[str] = Field(None, max_length=200)
+    target_complexity: Optional[str] = Field(None, max_length=20)
+    enforce_complexity: bool = False
+
+    _target = field_validator("target_complexity")(_check_complexity)
+    _sizes = field_validator("scaling_sizes")(_check_sizes)
 
 class ProblemCreate(ProblemBase):
-    pass
+    scaling_generator: Optional[str] = None
 
 class ProblemUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=100)
@@ -21,9 +50,21 @@ class ProblemUpdate(BaseModel):
     series_id: Optional[int] = None
     series_index: Optional[int] = None
     is_daily_candidate: Optional[bool] = None
+    scaling_generator: Optional[str] = None
+    scaling_sizes: Optional[str] = Field(None, max_length=200)
+    target_complexity: Optional[str] = Field(None, max_length=20)
+    enforce_complexity: Optional[bool] = None
+
+    _target = field_validator("target_complexity")(_check_complexity)
+    _sizes = field_validator("scaling_sizes")(_check_sizes)
 
 class ProblemResponse(ProblemBase):
     id: int
+    enforce_complexity: Optional[bool] = False
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProblemAdminResponse(ProblemResponse):
+    """Includes the scaling generator, which would let users rebuild the hidden scaling inputs"""
+    scaling_generator: Optional[str] = None
\ No newline at end of file
@@ -1,22 +1,55 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Literal, Optional
+import json
 
 class TestCaseBase(BaseModel):
-    input_data: str = Field(..., max_length=1000)
-    expected_output: str = Field(..., max_length=1000)
+    input_data: Optional[str] = Field(None, max_length=1000)
+    expected_output: Optional[str] = Field(None, max_length=1000)
     is_sample: bool = False
+    kind: Literal["literal", "generator"] = "literal"
+    generator_script: Optional[str] = None
+    generator_seed: Optional[int] = None
+    generator_params: Optional[dict] = None
+    reference_solution: Optional[str] = None
+
+    @field_validator("generator_params", mode="before")
+    @classmethod
+    def decode_params(cls, value):
+        # Stored as a JSON string on the row
+        return json.loads(value) if isinstance(value, str) else value
+
+def check_kind(testcase) -> None:
+    """Raise ValueError unless ``testcase`` (a schema or a stored row) has the fields its kind needs"""
+    kind = testcase.kind or "literal"
+    if kind == "literal" and (testcase.input_data is None or testcase.expected_output is None):
+        raise ValueError("literal testcases need input_data and expected_output")
+    if kind == "generator":
+        if not testcase.generator_script:
+            raise ValueError("generator testcases need generator_script")
+        if testcase.expected_output is None and not testcase.reference_solution:
+            raise ValueError("generator testcases need expected_output or reference_solution")
 
 class TestCaseCreate(TestCaseBase):
-    pass
+    @model_validator(mode="after")
+    def check_kind(self):
+        check_kind(self)
+        return self
 
 class TestCaseUpdate(BaseModel):
+    """Partial update; the router re-checks the merged row with check_kind"""
     input_data: Optional[str] = Field(None, max_length=1000)
     expected_output: Optional[str] = Field(None, max_length=1000)
     is_sample: Optional[bool] = None
+    generator_script: Optional[str] = None
+    generator_seed: Optional[int] = None
+    generator_params: Optional[dict] = None
+    reference_solution: Optional[str] = None
 
 class TestCaseResponse(TestCaseBase):
     id: int
     problem_id: int
+    input_sha256: Optional[str] = None
+    expected_sha256: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -25,9 +58,10 @@ class TestCasePublicResponse(BaseModel):
     """Public testcase response (hides expected output for non-sample cases)"""
     id: int
     problem_id: int
-    input_data: str
+    input_data: Optional[str] = None       # None for generator testcases
     is_sample: bool
+    kind: str = "literal"
     expected_output: Optional[str] = None  # Only shown for sample cases
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
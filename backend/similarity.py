@@ -0,0 +1,322 @@
+"""Near-duplicate detection for submissions to the same problem.
+
+Source is reduced to identifier-normalised tokens, shingled, and summarised
+by a MinHash signature. Signatures are split into LSH bands; submissions
+sharing a band bucket are candidates, and only candidates are compared, so
+clustering a problem is roughly linear in its number of submissions. Judged
+submissions just add their own rows (see judge.dispatch); nothing is ever
+rebuilt.
+
+Submissions from before the index existed are added with:
+
+    python similarity.py --backfill
+"""
+import argparse
+import builtins
+import keyword
+import logging
+import os
+import random
+import re
+import struct
+import zlib
+from collections import defaultdict
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from db import SessionLocal
+# Every mapper must be registered before the first query resolves relationships
+from models import user, problem, testcase, rejudge_job  # noqa: F401
+from models.similarity import SimilarityBucket, SimilaritySignature
+from models.submission import Submission
+import sources
+
+load_dotenv()
+SIMILARITY_THRESHOLD = float(os.getenv("SIMILARITY_THRESHOLD", "0.8"))
+
+logger = logging.getLogger("algoengine.similarity")
+
+SHINGLE_SIZE = 5
+NUM_PERM = 64
+BANDS = 16                 # 16 bands of 4 rows: pairs above ~0.5 similarity usually share a bucket
+ROWS = NUM_PERM // BANDS
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = random.Random(20240601)   # fixed so signatures are comparable across processes and restarts
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_PACK = struct.Struct(f">{NUM_PERM}Q")
+_BACKFILL_BATCH = 500
+_STREAM_ROWS = 1000
+
+_TOKEN = re.compile(
+    r"""(?P<str>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')"""
+    r"|(?P<num>\b\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?[a-zA-Z]*)"
+    r"|(?P<name>[A-Za-z_]\w*)"
+    r"|(?P<op><<=|>>=|\*\*=|//=|->|::|<<|>>|<=|>=|==|!=|&&|\|\||\+\+|--|\+=|-=|\*=|/=|%=|\*\*|//|\S)"
+)
+_PY_COMMENTS = re.compile(r"#[^\n]*|\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''")
+_CPP_COMMENTS = re.compile(r"//[^\n]*|/\*[\s\S]*?\*/|^\s*#[^\n]*", re.MULTILINE)
+
+# Names kept verbatim; everything else a user can rename becomes ID
+_PY_KEEP = set(keyword.kwlist) | set(dir(builtins)) | {"sys", "stdin", "readline", "split", "append", "self"}
+_CPP_KEEP = {
+    "alignas", "auto", "bool", "break", "case", "catch", "char", "class", "const", "constexpr", "continue",
+    "default", "delete", "do", "double", "else", "enum", "false", "float", "for", "friend", "goto", "if",
+    "inline", "int", "long", "namespace", "new", "nullptr", "operator", "private", "protected", "public",
+    "return", "short", "signed", "sizeof", "static", "struct", "switch", "template", "this", "throw", "true",
+    "try", "typedef", "typename", "unsigned", "using", "virtual", "void", "while",
+    "std", "cin", "cout", "endl", "vector", "string", "map", "set", "unordered_map", "unordered_set", "pair",
+    "queue", "stack", "deque", "priority_queue", "sort", "min", "max", "swap", "push_back", "size", "begin", "end",
+}
+
+
+def tokenize(code: str, language: str) -> list[str]:
+    """Tokens with comments dropped and literals and user identifiers normalised"""
+    if language.lower().startswith("py"):
+        code, keep = _PY_COMMENTS.sub(" ", code), _PY_KEEP
+    else:
+        code, keep = _CPP_COMMENTS.sub(" ", code), _CPP_KEEP
+    tokens = []
+    for match in _TOKEN.finditer(code):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == "str":
+            tokens.append("STR")
+        elif kind == "num":
+            tokens.append("NUM")
+        elif kind == "name":
+            tokens.append(text if text in keep else "ID")
+        else:
+            tokens.append(text)
+    return tokens
+
+
+def shingles(tokens: list[str]) -> set[int]:
+    if len(tokens) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(tokens).encode())} if tokens else set()
+    return {zlib.crc32(" ".join(tokens[i:i + SHINGLE_SIZE]).encode()) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+
+def signature(code: str, language: str) -> tuple[int, ...]:
+    """MinHash signature of the submission's token shingles"""
+    values = shingles(tokenize(code, language))
+    if not values:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(min((a * x + b) % _PRIME for x in values) & _MAX_HASH for a, b in _PERMUTATIONS)
+
+
+def estimate(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the underlying shingle sets"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_keys(sig: tuple[int, ...]) -> list[str]:
+    """One bucket key per band; equal keys in the same band make two submissions candidates"""
+    packed = _PACK.pack(*sig)
+    width = ROWS * 8
+    return [format(zlib.crc32(packed[band * width:(band + 1) * width]), "08x") for band in range(BANDS)]
+
+
+# -------------------------
+# INDEX
+# -------------------------
+def index_submission(db: Session, submission_id: int, problem_id: int, code: str, language: str) -> None:
+    """Add one submission to its problem's LSH index (within the caller's transaction); no-op if indexed"""
+    indexed = select(SimilaritySignature.submission_id).where(SimilaritySignature.submission_id == submission_id)
+    if db.execute(indexed).first() is not None:
+        return
+    sig = signature(code, language)
+    db.add(SimilaritySignature(submission_id=submission_id, problem_id=problem_id, signature=_PACK.pack(*sig)))
+    db.add_all(
+        SimilarityBucket(problem_id=problem_id, band=band, bucket=key, submission_id=submission_id)
+        for band, key in enumerate(band_keys(sig))
+    )
+
+
+def forget(db: Session, submission_ids: list[int]) -> None:
+    db.execute(delete(SimilarityBucket).where(SimilarityBucket.submission_id.in_(submission_ids)))
+    db.execute(delete(SimilaritySignature).where(SimilaritySignature.submission_id.in_(submission_ids)))
+
+
+def backfill(problem_id: Optional[int] = None) -> int:
+    """Index submissions created before the similarity tables existed; returns how many"""
+    indexed = 0
+    last_id = 0
+    db = SessionLocal()
+    try:
+        while True:
+            query = (
+                db.query(Submission.id, Submission.problem_id, Submission.language, Submission.source_hash)
+                .outerjoin(SimilaritySignature, SimilaritySignature.submission_id == Submission.id)
+                .filter(SimilaritySignature.submission_id.is_(None), Submission.id > last_id)
+            )
+            if problem_id is not None:
+                query = query.filter(Submission.problem_id == problem_id)
+            rows = query.order_by(Submission.id).limit(_BACKFILL_BATCH).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            code = {}
+            for row in rows:
+                if row.source_hash not in code:
+                    code[row.source_hash] = sources.load(db, row.source_hash)
+                index_submission(db, row.id, row.problem_id, code[row.source_hash], row.language)
+            db.commit()
+            indexed += len(rows)
+            logger.info("indexed %d submissions up to id %d", indexed, last_id)
+        return indexed
+    finally:
+        db.close()
+
+
+# -------------------------
+# CLUSTERS
+# -------------------------
+def _shared_buckets(db: Session, problem_id: int) -> list[list[int]]:
+    """Submission ids of every bucket that holds more than one, in id order.
+
+    Rows stream in bucket order, so only the bucket being read is held. The
+    result is linear in bucket rows; pairs are never listed.
+    """
+    shared = []
+    current = None
+    members: list[int] = []
+    rows = (
+        db.query(SimilarityBucket.band, SimilarityBucket.bucket, SimilarityBucket.submission_id)
+        .filter(SimilarityBucket.problem_id == problem_id)
+        .order_by(SimilarityBucket.band, SimilarityBucket.bucket, SimilarityBucket.submission_id)
+        .yield_per(_STREAM_ROWS)
+    )
+    for band, key, submission_id in rows:
+        if (band, key) != current:
+            if len(members) > 1:
+                shared.append(members)
+            current = (band, key)
+            members = []
+        members.append(submission_id)
+    if len(members) > 1:
+        shared.append(members)
+    return shared
+
+
+def clusters(db: Session, problem_id: int, threshold: Optional[float] = None) -> list[dict]:
+    """Groups of submissions by different users whose sources look alike.
+
+    Submissions with identical signatures (the same code up to renaming) are
+    joined outright, and the smallest id stands in for the rest. Within a
+    bucket, a representative is compared with the others until it matches one
+    member of each cluster, never with its own cluster, and a pair below the
+    threshold is compared once. A bucket full of copies therefore costs about
+    one comparison per member instead of one per pair. The clusters are the
+    same as if every pair were compared; max_similarity only covers the pairs
+    that were. Joins use union-find, so a cluster does not depend on which
+    member a bucket happens to list first. Only candidates' signatures are
+    kept while the problem's signatures stream past.
+    """
+    threshold = SIMILARITY_THRESHOLD if threshold is None else threshold
+    shared = _shared_buckets(db, problem_id)
+    if not shared:
+        return []
+    candidates = {submission_id for members in shared for submission_id in members}
+
+    signatures = {}
+    owners = {}
+    representative = {}
+    first_with = {}
+    for submission_id, packed, user_id in (
+        db.query(SimilaritySignature.submission_id, SimilaritySignature.signature, Submission.user_id)
+        .join(Submission, Submission.id == SimilaritySignature.submission_id)
+        .filter(SimilaritySignature.problem_id == problem_id)
+        .order_by(SimilaritySignature.submission_id)
+        .yield_per(_STREAM_ROWS)
+    ):
+        if submission_id in candidates:
+            owners[submission_id] = user_id
+            representative[submission_id] = first_with.setdefault(packed, submission_id)
+            if representative[submission_id] == submission_id:
+                signatures[submission_id] = _PACK.unpack(packed)
+
+    parent = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    def union(a, b):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            # The smaller id stays the root, so the grouping is the same on every call
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    best = defaultdict(float)
+    for submission_id, rep in representative.items():
+        if rep != submission_id:
+            union(rep, submission_id)
+            best[rep] = best[submission_id] = 1.0
+
+    below = set()
+    for members in shared:
+        # This bucket's representatives so far, by the cluster they were in
+        seen = defaultdict(list)
+        for b in sorted({representative[m] for m in members if m in representative}):
+            for key in sorted(seen):
+                if find(key) == find(b):
+                    continue
+                for a in seen[key]:
+                    if (a, b) in below:
+                        continue
+                    score = estimate(signatures[a], signatures[b])
+                    if score < threshold:
+                        below.add((a, b))
+                        continue
+                    # One match joins the whole cluster; the rest need no check
+                    union(a, b)
+                    best[a] = max(best[a], score)
+                    best[b] = max(best[b], score)
+                    break
+            seen[find(b)].append(b)
+
+    groups = defaultdict(list)
+    for submission_id in best:
+        groups[find(submission_id)].append(submission_id)
+    report = []
+    for members in groups.values():
+        users = {owners[m] for m in members}
+        # A user's own resubmissions are not plagiarism
+        if len(users) < 2:
+            continue
+        members.sort()
+        report.append({
+            "submission_ids": members,
+            "user_ids": sorted(users),
+            "max_similarity": round(max(best[m] for m in members), 3),
+        })
+    report.sort(key=lambda c: (-len(c["user_ids"]), -c["max_similarity"], c["submission_ids"][0]))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Submission similarity index")
+    parser.add_argument("--backfill", action="store_true", help="index submissions that have no signature yet")
+    parser.add_argument("--problem", type=int, help="limit to one problem")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.backfill:
+        print(f"indexed {backfill(args.problem)} submissions")
+        return
+    if args.problem is None:
+        parser.error("--problem is required to list clusters")
+    db = SessionLocal()
+    try:
+        for cluster in clusters(db, args.problem):
+            print(cluster)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
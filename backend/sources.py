@@ -0,0 +1,47 @@
+import hashlib
+import os
+import zlib
+from sqlalchemy import select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from models.submission_source import SubmissionSource
+
+_COMPRESSION_LEVEL = 6
+# Longest source accepted, in characters; keeps even 4-byte UTF-8 far below
+# the 16 MiB data column, so an insert can never be truncated
+MAX_SOURCE_CHARS = int(os.getenv("SUBMISSION_MAX_CODE_CHARS", str(64 * 1024)))
+
+
+def source_hash(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+def store(db: Session, code: str) -> str:
+    """Save ``code`` once under its hash (no-op if already stored) and return the hash.
+
+    Runs inside the caller's transaction; the insert skips only a duplicate
+    key (unlike INSERT IGNORE, which would also let MySQL truncate a value), so
+    two users submitting the same source at once cannot collide. An existing
+    row stays share-locked until the caller commits, so archive purging cannot
+    delete it before the submission that points to it is in.
+    """
+    raw = code.encode()
+    digest = hashlib.sha256(raw).hexdigest()
+    # Key-only lookup: skips compressing a source that is already stored
+    # without pulling its blob into the session
+    stored = select(SubmissionSource.hash).where(SubmissionSource.hash == digest).with_for_update(read=True)
+    if db.execute(stored).first() is None:
+        values = dict(hash=digest, compression="zlib", data=zlib.compress(raw, _COMPRESSION_LEVEL), size=len(raw))
+        if db.get_bind().dialect.name == "mysql":
+            stmt = mysql.insert(SubmissionSource).values(**values).on_duplicate_key_update(hash=SubmissionSource.hash)
+        else:
+            stmt = sqlite.insert(SubmissionSource).values(**values).on_conflict_do_nothing(index_elements=["hash"])
+        db.execute(stmt)
+    return digest
+
+
+def load(db: Session, digest: str) -> str:
+    row = db.get(SubmissionSource, digest)
+    if row is None:
+        raise LookupError(f"source {digest} is missing")
+    return zlib.decompress(row.data).decode()
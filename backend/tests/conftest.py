@@ -0,0 +1,24 @@
+import os
+import tempfile
+
+# db.py builds its engine at import; point it at a throwaway SQLite file first
+_DB_DIR = tempfile.mkdtemp(prefix="algoengine-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.setdefault("ADMISSION_DB_PATH", os.path.join(_DB_DIR, "admission.db"))
+
+import pytest  # noqa: E402
+from db import SessionLocal, engine  # noqa: E402
+from models.base import Base  # noqa: E402
+# Every mapper must be registered before create_all and the first query
+from models import user, problem, testcase, submission, submission_result, rejudge_job, submission_source, similarity, idempotency_key, testcase_stats, submission_timeline  # noqa: E402,F401
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,85 @@
+import threading
+import time
+import uuid
+
+import pytest
+
+from judge import admission
+
+
+@pytest.fixture
+def one_slot(monkeypatch):
+    monkeypatch.setattr(admission, "JUDGE_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(admission, "JUDGE_RUN_RESERVED_SLOTS", 0)
+
+
+def _hold(lane, release, timeout=5):
+    """Take a slot (or wait for one) on a thread until ``release`` is set"""
+    entered = threading.Event()
+
+    def hold():
+        with admission.judge_slot(owner=f"user:{uuid.uuid4()}", lane=lane, max_queue=100, timeout=timeout):
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=hold, daemon=True)
+    thread.start()
+    return thread, entered
+
+
+def _waiting(lane):
+    with admission._transaction() as conn:
+        return conn.execute("SELECT COUNT(*) FROM slots WHERE state = 'waiting' AND lane = ?", (lane,)).fetchone()[0]
+
+
+def _until(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_waiting_runs_do_not_count_against_the_submit_queue(one_slot):
+    release = threading.Event()
+    holder, entered = _hold(admission.LANE_SUBMIT, release)
+    entered.wait(5)
+    run, _ = _hold(admission.LANE_RUN, release)
+    _until(lambda: _waiting(admission.LANE_RUN) == 1)
+    try:
+        # Admitted to the queue despite the waiting run, then times out behind it
+        with pytest.raises(admission.AdmissionRejected) as rejected:
+            with admission.judge_slot(owner="user:new", lane=admission.LANE_SUBMIT, max_queue=1, timeout=0.2):
+                pass
+        assert rejected.value.detail == "Judge is busy, retry later"
+    finally:
+        release.set()
+        holder.join()
+        run.join()
+
+
+def test_waiting_submissions_fill_the_submit_queue(one_slot):
+    release = threading.Event()
+    holder, entered = _hold(admission.LANE_SUBMIT, release)
+    entered.wait(5)
+    waiter, _ = _hold(admission.LANE_SUBMIT, release)
+    _until(lambda: _waiting(admission.LANE_SUBMIT) == 1)
+    try:
+        with pytest.raises(admission.AdmissionRejected) as rejected:
+            with admission.judge_slot(owner="user:new", lane=admission.LANE_SUBMIT, max_queue=1, timeout=0.2):
+                pass
+        assert rejected.value.detail == "Judge queue is full, retry later"
+    finally:
+        release.set()
+        holder.join()
+        waiter.join()
+
+
+def test_runs_never_spend_submission_tokens(monkeypatch):
+    monkeypatch.setattr(admission, "IP_BURST", 1)
+    ip = f"198.51.100.{uuid.uuid4().int % 250}"
+    for _ in range(3):
+        admission.check_run_rate(uuid.uuid4().int, ip)
+    admission.check_rate(uuid.uuid4().int, ip)
+    with pytest.raises(admission.AdmissionRejected) as rejected:
+        admission.check_rate(uuid.uuid4().int, ip)
+    assert rejected.value.status_code == 429
@@ -0,0 +1,44 @@
+import math
+
+import pytest
+
+from judge import complexity
+
+SIZES = [1000, 2000, 4000, 8000, 16000, 32000]
+
+
+def _samples(f, scale, startup_ms=20.0):
+    return [(n, startup_ms + scale * f(n)) for n in SIZES]
+
+
+@pytest.mark.parametrize("name, f, scale", [
+    ("n", lambda n: n, 0.01),
+    ("n log n", lambda n: n * math.log2(n), 0.002),
+    ("n^2", lambda n: n * n, 1e-6),
+])
+def test_fit_recovers_the_generating_class(name, f, scale):
+    assert complexity.fit(_samples(f, scale)) == name
+
+
+def test_fit_prefers_the_slowest_class_within_noise():
+    # Start-up dominates and the growth is inside timing noise
+    samples = [(n, 30.0 + (0.5 if i % 2 else -0.5)) for i, n in enumerate(SIZES)]
+    assert complexity.fit(samples) == "1"
+
+
+def test_fit_needs_three_distinct_sizes():
+    assert complexity.fit([(1000, 5.0), (1000, 6.0), (2000, 9.0)]) is None
+
+
+def test_normalize_class_accepts_common_spellings():
+    assert complexity.normalize_class("O(N log N)") == "n log n"
+    assert complexity.normalize_class("n**2") == "n^2"
+    assert complexity.normalize_class("nlogn") == "n log n"
+    assert complexity.normalize_class("n!") is None
+
+
+def test_bounded_caps_count_and_total(monkeypatch):
+    monkeypatch.setattr(complexity, "SCALING_MAX_SIZES", 4)
+    monkeypatch.setattr(complexity, "SCALING_MAX_TOTAL", 10000)
+    assert complexity.bounded((1000, 2000, 3000, 5000, 6000)) == (1000, 2000, 3000)
+    assert complexity.bounded(tuple(range(1, 10))) == (1, 2, 3, 4)
@@ -0,0 +1,117 @@
+import threading
+from datetime import datetime, timedelta
+
+from db import SessionLocal
+from models.submission import Submission
+from models.submission_result import SubmissionResult
+from judge import dispatch, runner
+
+
+def _pending(db, count=1):
+    rows = [
+        Submission(problem_id=1, user_id=1, source_hash="0" * 64, language="python", status="pending")
+        for _ in range(count)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return [row.id for row in rows]
+
+
+def _expire(db, submission_id):
+    db.query(Submission).filter(Submission.id == submission_id).update(
+        {Submission.lease_expires_at: datetime.utcnow() - timedelta(seconds=1)}
+    )
+    db.commit()
+
+
+def test_claim_leases_oldest_pending(db):
+    first, second = _pending(db, 2)
+    claimed = dispatch.claim(db, "worker-a")
+    assert claimed.id == first
+    assert claimed.status == "judging"
+    assert claimed.lease_owner == "worker-a"
+    assert claimed.judge_attempts == 1
+    assert dispatch.claim(db, "worker-b").id == second
+    assert dispatch.claim(db, "worker-c") is None
+
+
+def test_concurrent_claimers_never_share_a_row(db):
+    ids = set(_pending(db, 40))
+    claimed = {"a": [], "b": []}
+
+    def drain(name):
+        session = SessionLocal()
+        try:
+            while True:
+                submission = dispatch.claim(session, f"worker-{name}")
+                if submission is None:
+                    return
+                claimed[name].append(submission.id)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=drain, args=(name,)) for name in claimed]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not set(claimed["a"]) & set(claimed["b"])
+    assert set(claimed["a"]) | set(claimed["b"]) == ids
+    owners = {row.id: row.lease_owner for row in db.query(Submission)}
+    for name, taken in claimed.items():
+        assert all(owners[i] == f"worker-{name}" for i in taken)
+
+
+def test_live_lease_is_not_reclaimed(db):
+    _pending(db)
+    assert dispatch.claim(db, "worker-a") is not None
+    assert dispatch.claim(db, "worker-b") is None
+
+
+def test_expired_lease_is_reclaimed(db):
+    [submission_id] = _pending(db)
+    dispatch.claim(db, "worker-a")
+    _expire(db, submission_id)
+    reclaimed = dispatch.claim(db, "worker-b")
+    assert reclaimed.id == submission_id
+    assert reclaimed.lease_owner == "worker-b"
+    assert reclaimed.judge_attempts == 2
+
+
+def test_record_from_stale_owner_is_a_no_op(db):
+    [submission_id] = _pending(db)
+    dispatch.claim(db, "worker-a")
+    _expire(db, submission_id)
+    dispatch.claim(db, "worker-b")
+    result = runner.JudgeResult(status="passed", cases=[runner.CaseResult(1, "passed", 3.0)])
+
+    assert dispatch.record(db, submission_id, "worker-a", result, problem_id=1, language="python") is False
+    row = db.get(Submission, submission_id, populate_existing=True)
+    assert (row.status, row.lease_owner) == ("judging", "worker-b")
+    assert db.query(SubmissionResult).count() == 0
+
+    assert dispatch.record(db, submission_id, "worker-b", result, problem_id=1, language="python") is True
+    row = db.get(Submission, submission_id, populate_existing=True)
+    assert (row.status, row.lease_owner) == ("passed", None)
+    assert db.query(SubmissionResult).count() == 1
+
+
+def test_release_returns_the_row_without_counting_the_attempt(db):
+    [submission_id] = _pending(db)
+    dispatch.claim(db, "worker-a")
+    dispatch.release(db, submission_id, "worker-b")      # not the owner: ignored
+    assert db.get(Submission, submission_id, populate_existing=True).status == "judging"
+    dispatch.release(db, submission_id, "worker-a")
+    row = db.get(Submission, submission_id, populate_existing=True)
+    assert (row.status, row.lease_owner, row.judge_attempts) == ("pending", None, 0)
+
+
+def test_heartbeat_reports_a_lost_lease(db, monkeypatch):
+    monkeypatch.setattr(dispatch, "_HEARTBEAT_SECONDS", 0.02)
+    [submission_id] = _pending(db)
+    dispatch.claim(db, "worker-a")
+    with dispatch.heartbeat(submission_id, "worker-a") as lost:
+        assert not lost.wait(0.1)
+        _expire(db, submission_id)
+        dispatch.claim(db, "worker-b")
+        assert lost.wait(2)
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from judge import runner, scheduling
+from models import testcase_stats
+
+
+def _case(testcase_id, is_sample=False):
+    return SimpleNamespace(id=testcase_id, is_sample=is_sample)
+
+
+def test_priority_prefers_cases_that_fail_often_and_run_fast():
+    assert scheduling.priority(100, 50, 1000) > scheduling.priority(100, 5, 1000)
+    assert scheduling.priority(100, 50, 1000) > scheduling.priority(100, 50, 100000)
+
+
+def test_priority_of_an_unseen_case_is_the_prior():
+    assert scheduling.priority() == scheduling.PRIOR_FAIL_RATE / scheduling.PRIOR_MS
+
+
+def test_rank_puts_samples_first_in_id_order():
+    testcases = [_case(1), _case(2, is_sample=True), _case(3), _case(4, is_sample=True)]
+    stats = {1: (100, 90, 100), 3: (100, 0, 100)}
+    assert [tc.id for tc in scheduling.rank(testcases, stats)] == [2, 4, 1, 3]
+
+
+def test_rank_orders_the_rest_by_priority_and_keeps_ties_in_id_order():
+    testcases = [_case(i) for i in range(1, 6)]
+    stats = {
+        2: (100, 80, 2000),     # fails often but is slow
+        4: (100, 80, 200),      # fails often and is fast
+        5: (100, 0, 20000),     # never fails and is slow
+    }
+    # 1 and 3 have no statistics and tie on the prior
+    assert [tc.id for tc in scheduling.rank(testcases, stats)] == [4, 2, 1, 3, 5]
+
+
+def test_observe_adds_counts_in_its_own_transaction(db):
+    cases = [
+        runner.CaseResult(2, "time_limit_exceeded", 900.0, 800.0),
+        runner.CaseResult(1, "passed", 30.0, 20.0),
+    ]
+    scheduling.observe(7, cases)
+    scheduling.observe(7, cases[1:])
+    rows = {row.testcase_id: row for row in db.query(testcase_stats.TestCaseStats)}
+    assert (rows[1].runs, rows[1].failures, rows[1].total_ms) == (2, 0, 40)
+    assert (rows[2].runs, rows[2].failures, rows[2].timeouts, rows[2].total_ms) == (1, 1, 1, 800)
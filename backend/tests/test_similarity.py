@@ -0,0 +1,74 @@
+from models.similarity import SimilarityBucket, SimilaritySignature
+from models.submission import Submission
+import similarity
+
+SOLUTION = "import json\nprices = json.loads(input())\nlo = 10**9; best = 0\nfor p in prices:\n    lo = min(lo, p); best = max(best, p - lo)\nprint(best)\n"
+RENAMED = "import json\n# mine\narr = json.loads(input())\nmn = 10**9; ans = 0\nfor x in arr:\n    mn = min(mn, x); ans = max(ans, x - mn)\nprint(ans)\n"
+BRUTE = "import json\nprices = json.loads(input())\nbest = 0\nfor i in range(len(prices)):\n    for j in range(i + 1, len(prices)):\n        best = max(best, prices[j] - prices[i])\nprint(best)\n"
+
+
+def test_tokenize_normalises_names_literals_and_comments():
+    assert similarity.tokenize("total = 42 # note\nprint(total, 'x')", "python") == [
+        "ID", "=", "NUM", "print", "(", "ID", ",", "STR", ")",
+    ]
+
+
+def test_renaming_keeps_the_signature():
+    assert similarity.signature(SOLUTION, "python") == similarity.signature(RENAMED, "python")
+    assert similarity.estimate(similarity.signature(SOLUTION, "python"), similarity.signature(BRUTE, "python")) < 0.5
+
+
+def test_band_keys_match_only_on_equal_bands():
+    a = (0,) * similarity.NUM_PERM
+    b = (1,) * similarity.ROWS + (0,) * (similarity.NUM_PERM - similarity.ROWS)
+    keys_a, keys_b = similarity.band_keys(a), similarity.band_keys(b)
+    assert len(keys_a) == similarity.BANDS
+    assert keys_a[0] != keys_b[0]
+    assert keys_a[1:] == keys_b[1:]
+
+
+def _index(db, submission_id, user_id, sig):
+    db.add(Submission(id=submission_id, problem_id=1, user_id=user_id, source_hash="0" * 64, language="python", status="passed"))
+    db.add(SimilaritySignature(submission_id=submission_id, problem_id=1, signature=similarity._PACK.pack(*sig)))
+    db.add_all(
+        SimilarityBucket(problem_id=1, band=band, bucket=key, submission_id=submission_id)
+        for band, key in enumerate(similarity.band_keys(sig))
+    )
+    db.commit()
+
+
+def _differs_in(count):
+    return (1,) * count + (0,) * (similarity.NUM_PERM - count)
+
+
+def test_clusters_join_chains_of_similar_pairs(db):
+    # 1~2 and 2~3 clear the threshold; 1~3 alone would not
+    _index(db, 1, 10, _differs_in(0))
+    _index(db, 2, 20, _differs_in(12))
+    _index(db, 3, 30, _differs_in(24))
+    _index(db, 4, 40, (7,) * similarity.NUM_PERM)
+    assert similarity.clusters(db, 1, threshold=0.8) == [
+        {"submission_ids": [1, 2, 3], "user_ids": [10, 20, 30], "max_similarity": 0.812},
+    ]
+
+
+def test_clusters_skip_a_users_own_resubmissions(db):
+    _index(db, 1, 10, _differs_in(0))
+    _index(db, 2, 10, _differs_in(0))
+    assert similarity.clusters(db, 1, threshold=0.8) == []
+
+
+def test_clusters_compare_a_bucket_of_copies_once_per_member(db, monkeypatch):
+    compared = []
+    estimate = similarity.estimate
+    monkeypatch.setattr(similarity, "estimate", lambda a, b: compared.append(1) or estimate(a, b))
+    for submission_id in range(1, 201):
+        _index(db, submission_id, submission_id, _differs_in(0))
+    for submission_id in range(201, 221):
+        # Distinct only in the last band, so they share every other bucket with the copies
+        _index(db, submission_id, submission_id, _differs_in(0)[:-1] + (submission_id,))
+    [cluster] = similarity.clusters(db, 1, threshold=0.8)
+    assert cluster["submission_ids"] == list(range(1, 221))
+    assert cluster["max_similarity"] == 1.0
+    # Copies are joined by signature; each distinct one is then compared once
+    assert len(compared) == 20
@@ -0,0 +1,52 @@
+import pytest
+
+from judge import timeline
+
+
+def test_pack_round_trips_spans_relative_to_base():
+    timing = timeline.Timeline(base=1000.0)
+    timing.add(timeline.COMPILE, 1000.0, 1000.25)
+    timing.add(timeline.RUN, 1000.25, 1000.2505, ref=7)
+    base, spans = timeline.unpack(timing.pack(extra=[(timeline.RECORD, 0, 1000.5, 1000.501)]))
+    assert base == 1000.0
+    assert spans == [
+        {"stage": "compile", "testcase_id": None, "start_ms": 0.0, "duration_ms": 250.0},
+        {"stage": "run", "testcase_id": 7, "start_ms": 250.0, "duration_ms": 0.5},
+        {"stage": "record", "testcase_id": None, "start_ms": 500.0, "duration_ms": 1.0},
+    ]
+
+
+def test_pack_clamps_negative_and_oversized_durations():
+    timing = timeline.Timeline(base=10.0)
+    timing.add(timeline.RUN, 9.0, 8.0, ref=1)
+    timing.add(timeline.QUEUE, 10.0, 10.0 + 5000)
+    _, spans = timeline.unpack(timing.pack())
+    assert (spans[0]["start_ms"], spans[0]["duration_ms"]) == (0.0, 0.0)
+    assert spans[1]["duration_ms"] == round(((1 << 32) - 1) / 1000, 3)
+
+
+def test_pack_folds_spans_past_the_cap_and_keeps_stage_totals():
+    timing = timeline.Timeline(base=0.0)
+    cases = timeline.MAX_SPANS  # two spans each, so well past the cap
+    for ref in range(1, cases + 1):
+        start = ref * 0.01
+        timing.add(timeline.RUN, start, start + 0.004, ref=ref)
+        timing.add(timeline.COMPARE, start + 0.004, start + 0.005, ref=ref)
+    blob = timing.pack()
+    _, spans = timeline.unpack(blob)
+    assert len(spans) <= timeline.MAX_SPANS
+    assert len(blob) < 65535
+    folded = [span for span in spans if span["testcase_id"] is None]
+    assert sorted(span["stage"] for span in folded) == ["compare", "run"]
+    totals = timeline.stage_totals(spans)
+    assert totals["run"] == pytest.approx(cases * 4.0, abs=1)
+    assert totals["compare"] == pytest.approx(cases * 1.0, abs=1)
+
+
+def test_unpack_rejects_an_unknown_version():
+    with pytest.raises(ValueError):
+        timeline.unpack(b"\x02" + bytes(8))
+
+
+def test_percentiles_use_nearest_rank():
+    assert timeline.percentiles([5, 1, 4, 2, 3], points=(50, 90)) == {"p50": 3, "p90": 5, "max": 5}
@@ -0,0 +1,53 @@
+import pytest
+
+from judge import tracer
+
+
+def _apply(state, changed, patch, deleted):
+    state = {name: list(value) if isinstance(value, list) else value for name, value in state.items()}
+    for name in deleted:
+        del state[name]
+    for name, edits in patch.items():
+        for index, value in edits:
+            state[name][index] = value
+    state.update(changed)
+    return state
+
+
+def test_encode_keeps_small_values():
+    assert tracer.encode([1, "a", None, 2.5, True]) == [1, "a", None, 2.5, True]
+    assert tracer.encode((1, 2)) == {"tuple": [1, 2]}
+    assert tracer.encode({3, 1, 2}) == {"set": [1, 2, 3], "len": 3}
+    assert tracer.encode({"k": 1}) == {"dict": [["k", 1]], "len": 1}
+
+
+def test_encode_bounds_big_values():
+    assert tracer.encode(list(range(100))) == {"head": list(range(tracer.MAX_ITEMS)), "len": 100}
+    assert tracer.encode("x" * 100) == {"str": "x" * tracer.MAX_STRING, "len": 100}
+    assert tracer.encode(1 << 70) == {"int": str(1 << 70)}
+    assert tracer.encode(float("nan")) == {"float": "nan"}
+    assert tracer.encode([[[1]]]) == [[{"type": "list"}]]
+
+
+def test_diff_patches_a_list_with_few_changes():
+    before = {"arr": [1, 2, 3, 4], "lo": 0, "tmp": 5}
+    after = {"arr": [1, 9, 3, 4], "lo": 0, "hi": 3}
+    changed, patch, deleted = tracer.diff(before, after)
+    assert changed == {"hi": 3}
+    assert patch == {"arr": [[1, 9]]}
+    assert deleted == ["tmp"]
+
+
+def test_diff_replaces_a_list_that_mostly_changed():
+    changed, patch, _ = tracer.diff({"arr": [1, 2]}, {"arr": [3, 4]})
+    assert changed == {"arr": [3, 4]} and patch == {}
+
+
+@pytest.mark.parametrize("before, after", [
+    ({}, {"a": 1, "b": [1, 2]}),
+    ({"a": 1, "b": [1, 2, 3, 4, 5]}, {"a": 2, "b": [1, 2, 0, 4, 5]}),
+    ({"a": 1, "b": [1, 2]}, {"b": [1, 2, 3]}),
+    ({"s": "x", "n": None}, {"s": "y", "n": 0}),
+])
+def test_diff_round_trips(before, after):
+    assert _apply(before, *tracer.diff(before, after)) == after
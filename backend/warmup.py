@@ -0,0 +1,88 @@
+import logging
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from dotenv import load_dotenv
+from db import engine, SessionLocal
+from models.problem import Problem
+import cache
+from judge import sandbox
+from judge.languages import LANGUAGES
+from judge.runner import COMPILE_LIMITS
+
+load_dotenv()
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
+WARMUP_PROBLEM_LIMIT = int(os.getenv("WARMUP_PROBLEM_LIMIT", "100"))
+
+logger = logging.getLogger("algoengine.warmup")
+
+
+def warm_db_pool(connections: int = WARMUP_DB_CONNECTIONS) -> int:
+    """Open pooled connections concurrently so first requests skip the handshake"""
+    def ping(_):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            # Hold the connection briefly so the pool has to open distinct ones
+            time.sleep(0.05)
+
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(ping, range(connections)))
+    return connections
+
+
+def warm_caches(limit: int = WARMUP_PROBLEM_LIMIT) -> int:
+    """Load the hottest problems and their testcases into the in-process caches"""
+    db = SessionLocal()
+    try:
+        problem_ids = [
+            row.id
+            for row in db.query(Problem.id)
+            .order_by(Problem.is_daily_candidate.desc(), Problem.id)
+            .limit(limit)
+        ]
+        for problem_id in problem_ids:
+            cache.get_problem(db, problem_id)
+            cache.get_testcases(db, problem_id)
+        return len(problem_ids)
+    finally:
+        db.close()
+
+
+def warm_runners() -> list[str]:
+    """Start a sandbox spawner and touch each runner once so binaries are in the page cache"""
+    warmed = []
+    for language in LANGUAGES.values():
+        try:
+            if language.mode == "docker":
+                subprocess.run(["docker", "image", "inspect", language.docker_image], capture_output=True, timeout=10, check=True)
+            else:
+                if language.compile_cmd:
+                    result = sandbox.run([language.compile_cmd[0], "--version"], {}, COMPILE_LIMITS)
+                else:
+                    result = sandbox.run(
+                        language.run_cmd[:1] + ["-c", "import collections, heapq, bisect, itertools"], {},
+                        zygote=language.mode == "zygote",
+                    )
+                if result.exit_code != 0:
+                    raise RuntimeError(result.stderr)
+            warmed.append(language.name)
+        except (OSError, RuntimeError, subprocess.SubprocessError) as exc:
+            logger.warning("%s runner warm-up failed: %s", language.name, exc)
+    return warmed
+
+
+def run_all() -> dict:
+    """Run every warm-up step, returning per-step timings in milliseconds"""
+    report = {}
+    for name, step in (("db_pool", warm_db_pool), ("caches", warm_caches), ("runners", warm_runners)):
+        started = time.perf_counter()
+        try:
+            result = step()
+        except Exception as exc:
+            # A failed warm-up only costs latency; it must not keep the app down
+            logger.exception("warm-up step %s failed", name)
+            result = f"error: {exc}"
+        report[name] = {"result": result, "ms": round((time.perf_counter() - started) * 1000, 1)}
+    return report
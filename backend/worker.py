@@ -0,0 +1,86 @@
+"""judge-worker: claims pending submissions through a lease and judges them.
+
+Run any number of these, on any number of hosts, next to an API started with
+JUDGE_DISPATCH=queue:
+
+    python worker.py --threads 4
+"""
+import argparse
+import logging
+import os
+import random
+import signal
+import threading
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from db import SessionLocal
+# Every mapper must be registered before the first query resolves relationships
+from models import user, problem, testcase, submission, submission_result  # noqa: F401
+from judge import admission, dispatch
+import warmup
+
+load_dotenv()
+# One per slot a submission can get; the rest are reserved for runs
+JUDGE_WORKER_THREADS = int(
+    os.getenv("JUDGE_WORKER_THREADS", str(admission.JUDGE_MAX_CONCURRENCY - admission.JUDGE_RUN_RESERVED_SLOTS))
+)
+JUDGE_WORKER_POLL_SECONDS = float(os.getenv("JUDGE_WORKER_POLL_SECONDS", "1"))
+
+logger = logging.getLogger("algoengine.worker")
+
+
+def work(stop: threading.Event, poll_seconds: float) -> None:
+    owner = f"{dispatch.lease_owner()}:{threading.current_thread().name}"
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            submission = dispatch.claim(db, owner)
+            if submission is None:
+                # Jitter keeps idle workers from polling in lockstep
+                stop.wait(poll_seconds * random.uniform(0.5, 1.5))
+                continue
+            try:
+                with admission.judge_slot(owner=f"user:{submission.user_id}"):
+                    status = dispatch.judge_leased(db, submission, owner)
+            except HTTPException as exc:
+                # Host is saturated; let another worker (or a later poll) take it
+                logger.info("judge slot unavailable for submission %s: %s", submission.id, exc.detail)
+                dispatch.release(db, submission.id, owner)
+                stop.wait(poll_seconds)
+                continue
+            logger.info("submission %s: %s", submission.id, status or "lease lost")
+        except Exception:
+            logger.exception("judge-worker iteration failed")
+            db.rollback()
+            stop.wait(poll_seconds)
+        finally:
+            db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AlgoEngine judge-worker")
+    parser.add_argument("--threads", type=int, default=JUDGE_WORKER_THREADS)
+    parser.add_argument("--poll", type=float, default=JUDGE_WORKER_POLL_SECONDS, help="idle poll interval in seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    warmup.warm_runners()
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # Finish the submissions in hand, then exit
+        signal.signal(signum, lambda *_: stop.set())
+
+    threads = [
+        threading.Thread(target=work, args=(stop, args.poll), name=f"judge-{i}")
+        for i in range(max(1, args.threads))
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info("judge-worker %s started with %d threads", dispatch.lease_owner(), len(threads))
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,15 +10,13 @@ TIMEOUT=10
 TEMP_DIR=$(mktemp -d)
 cd "$TEMP_DIR"
 
-# Copy the user code from stdin to a file
-cat > solution.cpp
-
-# Create the input file from the first argument
-if [ $# -ge 1 ]; then
-    echo "$1" > input.txt
-else
-    echo "" > input.txt
-fi
+# stdin is "<code length in bytes>\n<code><input>"; input used to be an
+# argument, which capped it at the kernel's 128 KiB per-argument limit
+cat > payload
+CODE_BYTES=$(head -n 1 payload)
+HEADER_BYTES=$(( ${#CODE_BYTES} + 1 ))
+head -c $(( HEADER_BYTES + CODE_BYTES )) payload | tail -c +$(( HEADER_BYTES + 1 )) > solution.cpp
+tail -c +$(( HEADER_BYTES + CODE_BYTES + 1 )) payload > input.txt
 
 # Compile the C++ code
 if ! timeout 30 g++ -o solution solution.cpp -std=c++17 2> compile_error.txt; then
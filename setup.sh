@@ -44,6 +44,12 @@ echo "✅ Directories created"
 chmod +x runners/python-runner/run.sh 2>/dev/null || true
 chmod +x runners/cpp-runner/run.sh 2>/dev/null || true
 
+# Load the judge's AppArmor profile (docker-compose.yml refers to it by name)
+if command -v apparmor_parser &> /dev/null; then
+    echo "🛡️  Loading the judge AppArmor profile..."
+    sudo apparmor_parser -r -W security/apparmor-judge
+fi
+
 # Build and start services
 echo "🔨 Building and starting services..."
 echo "This may take a few minutes on first run..."